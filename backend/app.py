@@ -3,17 +3,28 @@ Aplicação Flask para classificação e resposta automática de emails.
 Backend da aplicação web full-stack.
 """
 
-from flask import Flask, request, jsonify, render_template
+import time
+_started = time.perf_counter()
+
+from flask import Flask, Request, Response, request, jsonify, render_template, current_app, g
 from flask_cors import CORS
+import gzip
+import io
 import os
 import logging
-from werkzeug.utils import secure_filename
-from datetime import datetime
+from tempfile import SpooledTemporaryFile
 
 # Importar utilitários personalizados
-from utils.text_processor import TextProcessor
-from utils.email_classifier import EmailClassifier
+from services import (
+    create_services, allowed_file as _allowed_file, build_classification_response,
+    parse_batch_items, build_batch_response, build_health_response, record_startup_time,
+    parse_response_fields, keywords_limit, create_job_queue, job_options, build_job_response
+)
 from config import config
+from utils.job_queue import JobQueueFull
+from utils.metrics import observe_stage, render_metrics
+
+record_startup_time('imports_ms', _started)
 
 # Configuração de logging
 logging.basicConfig(
@@ -22,6 +33,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class SpooledUploadRequest(Request):
+    """Request que mantém uploads pequenos em memória e só usa disco acima do limite configurado."""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        threshold = current_app.config.get('UPLOAD_SPOOL_THRESHOLD', 1024 * 1024)
+        return SpooledTemporaryFile(max_size=threshold, mode='rb+')
+
 def create_app(config_name='default'):
     """Factory function para criar a aplicação Flask."""
     app = Flask(__name__, template_folder='../frontend', static_folder='../frontend/static')
@@ -33,24 +51,60 @@ def create_app(config_name='default'):
     # Habilitar CORS
     CORS(app)
     
-    # Criar pasta de uploads se não existir
-    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    # Uploads são processados em memória (sem pasta de uploads; funciona em disco somente leitura)
+    app.request_class = SpooledUploadRequest
     
     # Inicializar processadores
-    app.text_processor = TextProcessor()
-    app.email_classifier = EmailClassifier(
-        openai_api_key=app.config.get('OPENAI_API_KEY'),
-        openai_model=app.config.get('OPENAI_MODEL')
-    )
+    app.text_processor, app.email_classifier = create_services(app.config)
+    
+    # Fila de jobs assíncronos (uploads grandes)
+    app.job_queue = create_job_queue(app.config, app.text_processor, app.email_classifier)
     
     return app
 
 # Criar instância da aplicação
 app = create_app(os.environ.get('FLASK_CONFIG', 'default'))
+record_startup_time('ready_ms', _started)
+
+# Endpoints cuja latência total é registrada como etapa nas métricas
+REQUEST_STAGES = {'classify_email': 'request_classify', 'classify_batch': 'request_classify_batch'}
+# Endpoints com respostas grandes (lotes e resultados de jobs), compactados com gzip
+GZIP_ENDPOINTS = {'classify_batch', 'get_job'}
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    stage = REQUEST_STAGES.get(request.endpoint)
+    if stage and 'request_started' in g:
+        observe_stage(stage, time.perf_counter() - g.request_started)
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Compacta com gzip as respostas grandes de lotes e jobs (GZIP_ENDPOINTS) quando o cliente aceita."""
+    min_bytes = app.config.get('RESPONSE_GZIP_MIN_BYTES', 1024)
+    if (not min_bytes or request.endpoint not in GZIP_ENDPOINTS or response.direct_passthrough
+            or 'Content-Encoding' in response.headers or not request.accept_encodings['gzip']):
+        return response
+    
+    data = response.get_data()
+    if len(data) < min_bytes:
+        return response
+    
+    response.set_data(gzip.compress(data, compresslevel=app.config.get('RESPONSE_GZIP_LEVEL', 6)))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+def fields_error(error):
+    return jsonify({'error': str(error), 'success': False}), 400
 
 def allowed_file(filename):
     """Verifica se o arquivo tem extensão permitida."""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
+    return _allowed_file(filename, app.config['ALLOWED_EXTENSIONS'])
 
 @app.route('/')
 def index():
@@ -59,7 +113,17 @@ def index():
 
 @app.route('/api/classify', methods=['POST'])
 def classify_email():
-    """Endpoint para classificação de emails."""
+    """
+    Endpoint para classificação de emails.
+    
+    ``?mode=lean`` ou ``?fields=classification,confidence`` limitam a resposta
+    aos campos pedidos; as palavras-chave só são extraídas se pedidas.
+    """
+    try:
+        fields = parse_response_fields(request.args.get('fields'), request.args.get('mode'))
+    except ValueError as e:
+        return fields_error(e)
+    
     try:
         text_content = ""
         
@@ -67,27 +131,8 @@ def classify_email():
         if 'file' in request.files:
             file = request.files['file']
             if file and file.filename != '' and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"{timestamp}_{filename}"
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(file_path)
-                
-                try:
-                    # Extrair texto baseado na extensão
-                    if filename.lower().endswith('.pdf'):
-                        text_content = app.text_processor.extract_text_from_pdf(file_path)
-                    elif filename.lower().endswith('.txt'):
-                        text_content = app.text_processor.extract_text_from_txt(file_path)
-                    
-                    # Remover arquivo após processamento
-                    os.remove(file_path)
-                    
-                except Exception as e:
-                    # Remover arquivo em caso de erro
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-                    raise e
+                # Extrair texto diretamente do stream do upload
+                text_content = app.text_processor.extract_text_from_upload(file.stream, file.filename)
         
         # Verificar se há texto manual
         elif 'text' in request.form:
@@ -104,30 +149,14 @@ def classify_email():
                 'success': False
             }), 400
         
-        # Pré-processar texto
-        processed_text = app.text_processor.preprocess_text(text_content)
+        # Pré-processar texto e extrair palavras-chave (parse único do spaCy)
+        analysis = app.text_processor.analyze(text_content, max_keywords=keywords_limit(fields))
         
         # Classificar com IA
-        classification_result = app.email_classifier.classify_email(processed_text)
-        
-        # Extrair palavras-chave
-        keywords = app.text_processor.extract_keywords(processed_text, max_keywords=5)
+        classification_result = app.email_classifier.classify_email(analysis['processed_text'])
         
         # Preparar resposta
-        response_data = {
-            'success': True,
-            'original_text': text_content[:500] + '...' if len(text_content) > 500 else text_content,
-            'processed_text': processed_text[:300] + '...' if len(processed_text) > 300 else processed_text,
-            'classification': classification_result['category'],
-            'confidence': classification_result['confidence'],
-            'suggested_response': classification_result['suggested_response'],
-            'keywords': keywords,
-            'metadata': classification_result.get('metadata', {}),
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        logger.info(f"Email classificado como: {classification_result['category']} (confiança: {classification_result['confidence']})")
-        return jsonify(response_data)
+        return jsonify(build_classification_response(text_content, analysis, classification_result, fields))
         
     except Exception as e:
         logger.error(f"Erro no processamento: {str(e)}")
@@ -136,22 +165,141 @@ def classify_email():
             'success': False
         }), 500
 
+@app.route('/api/classify/batch', methods=['POST'])
+def classify_batch():
+    """
+    Endpoint para classificação de emails em lote.
+    
+    Aceita um array JSON em que cada item é uma string ou um objeto
+    {"id": ..., "text": ...}. Retorna um resultado por item, na ordem de entrada.
+    Aceita os mesmos ``?mode=`` e ``?fields=`` de /api/classify.
+    """
+    try:
+        fields = parse_response_fields(request.args.get('fields'), request.args.get('mode'))
+    except ValueError as e:
+        return fields_error(e)
+    
+    try:
+        items = request.get_json(silent=True)
+        
+        if not isinstance(items, list):
+            return jsonify({
+                'error': 'O corpo da requisição deve ser um array JSON de emails.',
+                'success': False
+            }), 400
+        
+        max_items = app.config.get('BATCH_MAX_ITEMS', 500)
+        if len(items) > max_items:
+            return jsonify({
+                'error': f'O lote excede o limite de {max_items} emails.',
+                'success': False
+            }), 413
+        
+        results, valid_indexes, valid_texts = parse_batch_items(items)
+        
+        # Pré-processar o lote inteiro (nlp.pipe) antes de disparar as chamadas à IA
+        analyses = app.text_processor.preprocess_many(
+            valid_texts,
+            batch_size=app.config.get('NLP_BATCH_SIZE', 64),
+            n_process=app.config.get('NLP_N_PROCESS', 1),
+            max_keywords=keywords_limit(fields)
+        )
+        
+        # Classificar com chamadas concorrentes
+        classifications = app.email_classifier.classify_batch([analysis['processed_text'] for analysis in analyses])
+        
+        return jsonify(build_batch_response(results, valid_indexes, analyses, classifications, fields))
+        
+    except Exception as e:
+        logger.error(f"Erro no processamento do lote: {str(e)}")
+        return jsonify({
+            'error': f'Erro no processamento: {str(e)}',
+            'success': False
+        }), 500
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """
+    Enfileira uma classificação e retorna o ID do job imediatamente (202).
+    
+    Aceita o mesmo corpo de /api/classify (arquivo, texto ou JSON) e os mesmos
+    ``?mode=`` e ``?fields=``. O resultado é consultado em /api/jobs/<id>.
+    """
+    if app.job_queue is None:
+        return jsonify({'error': 'Jobs assíncronos desativados.', 'success': False}), 503
+    
+    try:
+        fields = parse_response_fields(request.args.get('fields'), request.args.get('mode'))
+    except ValueError as e:
+        return fields_error(e)
+    
+    try:
+        # O arquivo vai para a fila sem extração; texto é enfileirado como .txt
+        if 'file' in request.files:
+            file = request.files['file']
+            if not file or file.filename == '' or not allowed_file(file.filename):
+                return jsonify({'error': 'Arquivo ausente ou com extensão não permitida.', 'success': False}), 400
+            stream, filename = file.stream, file.filename
+        else:
+            text_content = ''
+            if 'text' in request.form:
+                text_content = request.form['text']
+            elif request.is_json:
+                data = request.get_json(silent=True)
+                text_content = data.get('text', '') if isinstance(data, dict) else ''
+            
+            if not isinstance(text_content, str) or not text_content.strip():
+                return jsonify({
+                    'error': 'Nenhum conteúdo de texto foi fornecido.',
+                    'success': False
+                }), 400
+            stream, filename = io.BytesIO(text_content.encode('utf-8')), 'text.txt'
+        
+        job = app.job_queue.submit(stream, filename, job_options(fields))
+        response = jsonify(build_job_response(job))
+        response.headers['Location'] = f"/api/jobs/{job['id']}"
+        return response, 202
+    
+    except JobQueueFull as e:
+        response = jsonify({'error': str(e), 'success': False})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    except Exception as e:
+        logger.error(f"Erro ao enfileirar job: {str(e)}")
+        return jsonify({
+            'error': f'Erro no processamento: {str(e)}',
+            'success': False
+        }), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Estado do job: queued, running, done (com o resultado) ou failed (com o erro)."""
+    job = app.job_queue.get(job_id) if app.job_queue is not None else None
+    if job is None:
+        return jsonify({'error': 'Job não encontrado ou expirado.', 'success': False}), 404
+    return jsonify(build_job_response(job))
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Endpoint de health check."""
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
-        'services': {
-            'text_processor': app.text_processor is not None,
-            'email_classifier': app.email_classifier is not None,
-            'spacy_model': app.text_processor.nlp is not None if app.text_processor else False
-        },
-        'version': '1.0.0'
-    })
+    return jsonify(build_health_response(app.text_processor, app.email_classifier, job_queue=app.job_queue))
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Métricas no formato de exposição do Prometheus (agregadas entre os workers)."""
+    body, content_type = render_metrics()
+    if body is None:
+        return jsonify({
+            'error': 'Métricas indisponíveis: prometheus_client não está instalado.',
+            'success': False
+        }), 503
+    return Response(body, content_type=content_type)
 
 if __name__ == '__main__':
     # Configuração para produção (Render) e desenvolvimento
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_CONFIG', 'development') == 'development'
+    # Com o reloader, só o processo filho (WERKZEUG_RUN_MAIN) atende requisições
+    if app.job_queue is not None and (not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+        app.job_queue.start()
     app.run(debug=debug, host='0.0.0.0', port=port)
@@ -0,0 +1,296 @@
+"""
+Ponto de entrada ASGI (modo assíncrono) da aplicação.
+
+Expõe a mesma API de app.py, mas as chamadas à OpenAI usam AsyncOpenAI: um
+único worker mantém dezenas de classificações em andamento enquanto espera a
+rede. O trabalho de CPU (spaCy, extração de PDF) roda em um pool de threads
+para não bloquear o event loop.
+
+Execução:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+    gunicorn -w 4 -k uvicorn.workers.UvicornWorker asgi:app
+"""
+
+import time
+_started = time.perf_counter()
+
+import asyncio
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial, wraps
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import FileResponse, JSONResponse, Response
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+
+from services import (
+    load_settings, create_services, allowed_file, build_classification_response,
+    parse_batch_items, build_batch_response, build_health_response, record_startup_time,
+    parse_response_fields, keywords_limit, create_job_queue, job_options, build_job_response
+)
+
+from utils.job_queue import JobQueueFull
+from utils.metrics import track_stage, render_metrics
+
+record_startup_time('imports_ms', _started)
+
+# Configuração de logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frontend')
+
+settings = load_settings(os.environ.get('FLASK_CONFIG', 'default'))
+text_processor, email_classifier = create_services(settings)
+job_queue = create_job_queue(settings, text_processor, email_classifier)
+
+# Pool para o trabalho de CPU (spaCy, PDF), fora do event loop
+cpu_executor = ThreadPoolExecutor(
+    max_workers=settings.get('ASYNC_CPU_WORKERS', 4),
+    thread_name_prefix='cpu'
+)
+
+async def run_cpu(function, *args, **kwargs):
+    """Executa uma função de CPU no pool sem bloquear o event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(cpu_executor, partial(function, *args, **kwargs))
+
+def timed(stage):
+    """Registra a latência total do endpoint como etapa nas métricas."""
+    def decorator(handler):
+        @wraps(handler)
+        async def wrapper(request):
+            with track_stage(stage):
+                return await handler(request)
+        return wrapper
+    return decorator
+
+def error_response(message, status_code):
+    return JSONResponse({'error': message, 'success': False}, status_code=status_code)
+
+async def content_too_large(request):
+    """
+    Lê o corpo contando bytes e verifica contra MAX_CONTENT_LENGTH, inclusive
+    em uploads chunked ou sem Content-Length. O corpo lido fica em cache para
+    ``request.form()`` e ``request.json()``.
+    """
+    max_length = settings.get('MAX_CONTENT_LENGTH')
+    if not max_length:
+        return False
+
+    content_length = request.headers.get('content-length')
+    if content_length and content_length.isdigit() and int(content_length) > max_length:
+        return True
+
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_length:
+            return True
+        chunks.append(chunk)
+    request._body = b''.join(chunks)
+    return False
+
+async def index(request):
+    """Página principal."""
+    return FileResponse(os.path.join(FRONTEND_DIR, 'index.html'))
+
+@timed('request_classify')
+async def classify_email(request):
+    """Endpoint para classificação de emails (aceita ``?mode=lean`` e ``?fields=``)."""
+    try:
+        fields = parse_response_fields(request.query_params.get('fields'), request.query_params.get('mode'))
+    except ValueError as e:
+        return error_response(str(e), 400)
+
+    try:
+        if await content_too_large(request):
+            return error_response('Arquivo muito grande.', 413)
+
+        text_content = ""
+        content_type = request.headers.get('content-type', '')
+
+        if content_type.startswith(('multipart/form-data', 'application/x-www-form-urlencoded')):
+            form = await request.form()
+            upload = form.get('file')
+
+            # Verificar se há arquivo no upload
+            if upload is not None and hasattr(upload, 'filename'):
+                if upload.filename and allowed_file(upload.filename, settings['ALLOWED_EXTENSIONS']):
+                    text_content = await run_cpu(text_processor.extract_text_from_upload, upload.file, upload.filename)
+            # Verificar se há texto manual
+            elif 'text' in form:
+                text_content = form['text']
+
+        # Verificar se há conteúdo JSON
+        elif 'json' in content_type:
+            data = await request.json()
+            text_content = data.get('text', '') if isinstance(data, dict) else ''
+
+        if not text_content.strip():
+            return error_response('Nenhum conteúdo de texto foi fornecido.', 400)
+
+        # Pré-processar texto e extrair palavras-chave no pool de CPU
+        analysis = await run_cpu(text_processor.analyze, text_content, max_keywords=keywords_limit(fields))
+
+        # Classificar com IA sem bloquear o worker
+        classification_result = await email_classifier.aclassify_email(analysis['processed_text'])
+
+        return JSONResponse(build_classification_response(text_content, analysis, classification_result, fields))
+
+    except Exception as e:
+        logger.error(f"Erro no processamento: {str(e)}")
+        return error_response(f'Erro no processamento: {str(e)}', 500)
+
+@timed('request_classify_batch')
+async def classify_batch(request):
+    """Endpoint para classificação de emails em lote (aceita ``?mode=lean`` e ``?fields=``)."""
+    try:
+        fields = parse_response_fields(request.query_params.get('fields'), request.query_params.get('mode'))
+    except ValueError as e:
+        return error_response(str(e), 400)
+
+    try:
+        if await content_too_large(request):
+            return error_response('Lote muito grande.', 413)
+
+        try:
+            items = await request.json()
+        except ValueError:
+            items = None
+
+        if not isinstance(items, list):
+            return error_response('O corpo da requisição deve ser um array JSON de emails.', 400)
+
+        max_items = settings.get('BATCH_MAX_ITEMS', 500)
+        if len(items) > max_items:
+            return error_response(f'O lote excede o limite de {max_items} emails.', 413)
+
+        results, valid_indexes, valid_texts = parse_batch_items(items)
+
+        analyses = await run_cpu(
+            text_processor.preprocess_many,
+            valid_texts,
+            batch_size=settings.get('NLP_BATCH_SIZE', 64),
+            n_process=settings.get('NLP_N_PROCESS', 1),
+            max_keywords=keywords_limit(fields)
+        )
+
+        classifications = await email_classifier.aclassify_batch([analysis['processed_text'] for analysis in analyses])
+
+        return JSONResponse(build_batch_response(results, valid_indexes, analyses, classifications, fields))
+
+    except Exception as e:
+        logger.error(f"Erro no processamento do lote: {str(e)}")
+        return error_response(f'Erro no processamento: {str(e)}', 500)
+
+async def submit_job(request):
+    """Enfileira uma classificação e retorna o ID do job imediatamente (202)."""
+    if job_queue is None:
+        return error_response('Jobs assíncronos desativados.', 503)
+
+    try:
+        fields = parse_response_fields(request.query_params.get('fields'), request.query_params.get('mode'))
+    except ValueError as e:
+        return error_response(str(e), 400)
+
+    try:
+        if await content_too_large(request):
+            return error_response('Arquivo muito grande.', 413)
+
+        stream = filename = None
+        text_content = ''
+        content_type = request.headers.get('content-type', '')
+
+        if content_type.startswith(('multipart/form-data', 'application/x-www-form-urlencoded')):
+            form = await request.form()
+            upload = form.get('file')
+
+            # O arquivo vai para a fila sem extração
+            if upload is not None and hasattr(upload, 'filename'):
+                if not upload.filename or not allowed_file(upload.filename, settings['ALLOWED_EXTENSIONS']):
+                    return error_response('Arquivo ausente ou com extensão não permitida.', 400)
+                stream, filename = upload.file, upload.filename
+            elif 'text' in form:
+                text_content = form['text']
+
+        elif 'json' in content_type:
+            data = await request.json()
+            text_content = data.get('text', '') if isinstance(data, dict) else ''
+
+        if stream is None:
+            if not isinstance(text_content, str) or not text_content.strip():
+                return error_response('Nenhum conteúdo de texto foi fornecido.', 400)
+            stream, filename = io.BytesIO(text_content.encode('utf-8')), 'text.txt'
+
+        # Cópia do payload e gravação no SQLite fora do event loop
+        job = await run_cpu(job_queue.submit, stream, filename, job_options(fields))
+        return JSONResponse(build_job_response(job), status_code=202, headers={'Location': f"/api/jobs/{job['id']}"})
+
+    except JobQueueFull as e:
+        return JSONResponse({'error': str(e), 'success': False}, status_code=503, headers={'Retry-After': '30'})
+    except Exception as e:
+        logger.error(f"Erro ao enfileirar job: {str(e)}")
+        return error_response(f'Erro no processamento: {str(e)}', 500)
+
+async def get_job(request):
+    """Estado do job: queued, running, done (com o resultado) ou failed (com o erro)."""
+    job = await run_cpu(job_queue.get, request.path_params['job_id']) if job_queue is not None else None
+    if job is None:
+        return error_response('Job não encontrado ou expirado.', 404)
+    return JSONResponse(build_job_response(job))
+
+async def health_check(request):
+    """Endpoint de health check."""
+    return JSONResponse(build_health_response(text_processor, email_classifier, mode='asgi', job_queue=job_queue))
+
+async def metrics(request):
+    """Métricas no formato de exposição do Prometheus."""
+    body, content_type = render_metrics()
+    if body is None:
+        return error_response('Métricas indisponíveis: prometheus_client não está instalado.', 503)
+    return Response(body, headers={'Content-Type': content_type})
+
+@asynccontextmanager
+async def lifespan(app):
+    """Inicia as threads da fila de jobs no processo que atende as requisições."""
+    if job_queue is not None:
+        job_queue.start()
+    yield
+
+middleware = [Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])]
+
+# Compacta as respostas de lotes e jobs quando o cliente envia Accept-Encoding: gzip
+gzip_middleware = []
+if settings.get('RESPONSE_GZIP_MIN_BYTES', 1024):
+    gzip_middleware.append(Middleware(
+        GZipMiddleware,
+        minimum_size=settings['RESPONSE_GZIP_MIN_BYTES'],
+        compresslevel=settings.get('RESPONSE_GZIP_LEVEL', 6)
+    ))
+
+app = Starlette(
+    routes=[
+        Route('/', index),
+        Route('/api/classify', classify_email, methods=['POST']),
+        Route('/api/classify/batch', classify_batch, methods=['POST'], middleware=gzip_middleware),
+        Route('/api/jobs', submit_job, methods=['POST']),
+        Route('/api/jobs/{job_id}', get_job, methods=['GET'], middleware=gzip_middleware),
+        Route('/api/health', health_check, methods=['GET']),
+        Route('/api/metrics', metrics, methods=['GET']),
+        Mount('/static', app=StaticFiles(directory=os.path.join(FRONTEND_DIR, 'static')), name='static'),
+    ],
+    middleware=middleware,
+    lifespan=lifespan
+)
+record_startup_time('ready_ms', _started)
@@ -15,14 +15,100 @@ class Config:
     UPLOAD_FOLDER = 'uploads'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
     ALLOWED_EXTENSIONS = {'txt', 'pdf'}
+    UPLOAD_SPOOL_THRESHOLD = 1024 * 1024  # Uploads maiores vão para um arquivo temporário
+    
+    # Configurações de extração de PDF
+    PDF_PARALLEL_WORKERS = 2  # Processos para extração paralela (0 ou 1 = sequencial)
+    PDF_PARALLEL_MIN_PAGES = 16  # PDFs menores são extraídos sem o pool
+    PDF_MAX_PAGES = 500  # Páginas além do limite são ignoradas
+    PDF_EXTRACTION_TIMEOUT = 30  # Segundos; após o limite retorna o texto parcial
     
     # Configurações da API OpenAI
     # Substitua pela sua chave API real da OpenAI
     OPENAI_API_KEY = 'your-openai-api-key'
     OPENAI_MODEL = 'gpt-3.5-turbo'  # ou gpt-4 se preferir
+    OPENAI_BASE_URL = None  # Endpoint alternativo compatível (ex.: servidor fake de testes)
+    OPENAI_MAX_CONCURRENCY = 8  # Chamadas simultâneas no lote
+    
+    # Formato da resposta: 'json' (JSON no texto), 'schema' (structured outputs, JSON Schema estrito)
+    # ou 'label' (uma letra por email, confiança pelos logprobs; 1 token gerado)
+    OPENAI_OUTPUT_MODE = 'json'
+    OPENAI_REASONING = True  # Pede a justificativa (json/schema)
+    
+    # Orçamento de tokens do email no prompt (início + fim do email; contagem pelo tiktoken, se instalado)
+    OPENAI_INPUT_TOKEN_BUDGET = 512  # 0 desativa
+    OPENAI_INPUT_TOKEN_BUDGETS = {}  # Orçamentos por modelo, ex.: {'gpt-4o-mini': 1024}
+    OPENAI_INPUT_HEAD_RATIO = 0.6  # Fração do orçamento para o início
+    
+    # Resiliência das chamadas à OpenAI (ao falhar, a classificação usa o classificador local)
+    OPENAI_TIMEOUT = 10  # Prazo (s) por classificação, incluindo novas tentativas
+    OPENAI_MAX_RETRIES = 1  # Novas tentativas após erro transitório (429, 5xx, rede)
+    OPENAI_RETRY_BUDGET = 0.1  # Fração máxima de chamadas extras (retries + hedges)
+    OPENAI_HEDGE_DELAY = 0  # Segundos até duplicar uma chamada lenta (0 desativa)
+    CIRCUIT_BREAKER_ENABLED = True
+    CIRCUIT_BREAKER_ERROR_RATE = 0.5  # Taxa de erros que abre o circuito
+    CIRCUIT_BREAKER_MIN_REQUESTS = 10  # Chamadas mínimas na janela
+    CIRCUIT_BREAKER_WINDOW = 30  # Janela deslizante (s)
+    CIRCUIT_BREAKER_COOLDOWN = 30  # Tempo aberto (s) antes da chamada de teste
+    
+    # Configurações de classificação em lote
+    BATCH_MAX_ITEMS = 500
+    
+    OPENAI_PACK_SIZE = 1  # Emails por chamada no lote (1 desativa o modo em pacote)
+    OPENAI_PACK_MAX_CHARS = 1000  # Emails maiores vão em chamada própria
+    
+    # Compressão gzip das respostas (lotes e jobs), se o cliente enviar Accept-Encoding: gzip
+    RESPONSE_GZIP_MIN_BYTES = 1024  # Respostas menores não são compactadas (0 desativa)
+    RESPONSE_GZIP_LEVEL = 6  # 1 (rápido) a 9 (menor)
+    
+    # Modo de classificação: 'llm' (sempre a IA) ou 'cascade' (local primeiro, IA só quando incerto)
+    CLASSIFIER_MODE = 'llm'
+    CASCADE_THRESHOLD = 0.8  # Confiança mínima para aceitar a resposta local
+    
+    # Configurações do cache de classificações
+    CACHE_ENABLED = True
+    CACHE_MAX_ENTRIES = 10000  # Entradas em memória por worker
+    CACHE_TTL_SECONDS = 24 * 60 * 60
+    CACHE_DB_PATH = '/tmp/email_classifier_cache.sqlite3'  # Compartilhado entre workers; None para apenas memória
+    
+    # Índice de quase duplicatas (MinHash/LSH): reaproveita o rótulo de emails quase idênticos
+    NEAR_DUPLICATE_ENABLED = False
+    NEAR_DUPLICATE_THRESHOLD = 0.9  # Similaridade de Jaccard mínima
+    NEAR_DUPLICATE_MAX_ENTRIES = 10000  # Emails indexados por worker (LRU)
+    NEAR_DUPLICATE_NUM_PERM = 128  # Tamanho da assinatura MinHash
+    NEAR_DUPLICATE_BANDS = 16  # Bandas do LSH (divisor de NUM_PERM)
+    NEAR_DUPLICATE_SHINGLE_SIZE = 2  # Palavras por shingle
+    
+    # Jobs assíncronos (POST /api/jobs, GET /api/jobs/<id>): fila em SQLite, payloads em disco local
+    JOBS_ENABLED = True
+    JOBS_DB_PATH = '/tmp/email_classifier_jobs.sqlite3'  # Compartilhado entre workers
+    JOBS_SPOOL_DIR = '/tmp/email_classifier_jobs'  # Arquivos enviados, removidos ao fim do job
+    JOBS_WORKERS = 2  # Threads por processo que executam os jobs
+    JOBS_MAX_PENDING = 100  # Jobs na fila ou em execução; acima disso 503
+    JOBS_TTL_SECONDS = 60 * 60  # Jobs concluídos são removidos após o prazo
+    JOBS_TIMEOUT = 600  # Jobs em execução há mais tempo são marcados como falhos
+    JOBS_MAX_ATTEMPTS = 2  # Tentativas (worker encerrado no meio) antes de marcar o job como falho
+    
+    # Modelo estatístico local (fallback offline)
+    LOCAL_MODEL_PATH = None  # ex.: 'models/local_model.npy' (gerado por train_local_model.py)
+    
+    # Inicialização
+    LAZY_LOAD_MODELS = False  # spaCy/NLTK/OpenAI no primeiro uso (boot rápido)
+    NLTK_DATA_DIR = 'nltk_data'  # Dados do NLTK gerados no build: python -m nltk.downloader -d nltk_data punkt stopwords
+    NLTK_DOWNLOAD_ON_STARTUP = False  # Padrão: sem rede no boot
     
     # Configurações de NLP
     SPACY_MODEL = 'pt_core_news_sm'
+    TOKENIZER = 'fast'  # 'fast' (regex, sem punkt) ou 'nltk' (word_tokenize)
+    STRIP_REPLIES = False  # Remove histórico citado, avisos legais e assinatura antes da limpeza
+    SPACY_DISABLED_COMPONENTS = ['parser']  # Componentes do pipeline que não são carregados
+    
+    # Processamento NLP em lote (nlp.pipe)
+    NLP_BATCH_SIZE = 64
+    NLP_N_PROCESS = 1  # Processos do spaCy no pré-processamento em lote
+    
+    # Modo assíncrono (asgi.py)
+    ASYNC_CPU_WORKERS = 4  # Threads para spaCy/PDF fora do event loop
     
     # Configurações de logging
     LOG_LEVEL = 'INFO'
@@ -0,0 +1,49 @@
+"""
+Configuração do Gunicorn.
+
+Com ``preload_app`` a aplicação (spaCy, stopwords, cliente OpenAI, modelo local)
+é carregada uma única vez no processo mestre e os workers são criados por fork,
+compartilhando essas páginas de memória em copy-on-write. O boot de N workers
+custa um carregamento em vez de N.
+
+Execução:
+    gunicorn -c gunicorn.conf.py app:app
+"""
+
+import gc
+import glob
+import os
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+# Carregar a aplicação no mestre antes do fork (desative com GUNICORN_PRELOAD=false)
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Métricas do Prometheus agregadas entre os workers: cada processo grava em arquivos
+# nesta pasta e /api/metrics soma todos. Definida antes de carregar a aplicação.
+if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    for stale_file in glob.glob(os.path.join(os.environ['PROMETHEUS_MULTIPROC_DIR'], '*.db')):
+        os.remove(stale_file)
+else:
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='email_classifier_metrics_')
+
+def when_ready(server):
+    # Objetos já carregados vão para a geração permanente do GC: as coletas nos
+    # workers não tocam essas páginas, preservando o compartilhamento copy-on-write
+    if preload_app:
+        gc.freeze()
+
+def post_fork(server, worker):
+    # As threads da fila de jobs só existem nos workers: com preload a fila é
+    # criada no mestre, e threads anteriores ao fork não passam para o filho
+    job_queue = getattr(server.app.wsgi(), 'job_queue', None)
+    if job_queue is not None:
+        job_queue.start()
+
+def child_exit(server, worker):
+    # Descarta as métricas de processo (gauges) do worker encerrado
+    from utils.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -0,0 +1,361 @@
+"""
+Serviços compartilhados entre os modos de execução WSGI (app.py) e ASGI (asgi.py).
+Constrói os processadores a partir da configuração e monta as respostas da API.
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from functools import partial
+
+from utils.text_processor import TextProcessor
+from utils.email_classifier import EmailClassifier
+from utils.classification_cache import ClassificationCache
+from utils.near_duplicate import NUMPY_AVAILABLE, NearDuplicateIndex
+from utils.prompt_budget import PromptBudget
+from utils.pdf_extractor import PdfExtractor
+from utils.resilience import CircuitBreaker, DeadlineExceeded, RetryBudget
+from utils.job_queue import JobQueue
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Tempos de inicialização deste processo (ms), expostos em /api/health
+startup_timings = {}
+
+# Campos opcionais das respostas de classificação (?fields=...); success, index, id e error sempre vêm
+RESPONSE_FIELDS = (
+    'original_text', 'processed_text', 'classification', 'confidence', 'suggested_response',
+    'method', 'keywords', 'metadata', 'timestamp'
+)
+RESPONSE_MODES = ('full', 'lean')
+# Campos do modo enxuto (?mode=lean), para clientes que só precisam do rótulo
+LEAN_FIELDS = ('classification', 'confidence')
+# Palavras-chave extraídas por email quando o campo keywords é pedido
+MAX_KEYWORDS = 5
+
+def record_startup_time(name, started):
+    """Registra o tempo decorrido desde ``started`` (time.perf_counter) em ms."""
+    startup_timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+def load_settings(config_name='default'):
+    """Retorna as configurações (atributos em maiúsculas) como dicionário."""
+    config_class = config[config_name]
+    return {key: getattr(config_class, key) for key in dir(config_class) if key.isupper()}
+
+def create_services(settings):
+    """Cria o TextProcessor e o EmailClassifier a partir das configurações."""
+    started = time.perf_counter()
+    lazy_load = settings.get('LAZY_LOAD_MODELS', False)
+
+    # Inicializar cache de classificações
+    classification_cache = None
+    if settings.get('CACHE_ENABLED'):
+        classification_cache = ClassificationCache(
+            max_entries=settings.get('CACHE_MAX_ENTRIES', 10000),
+            ttl_seconds=settings.get('CACHE_TTL_SECONDS', 86400),
+            db_path=settings.get('CACHE_DB_PATH')
+        )
+
+    # Índice de quase duplicatas
+    near_duplicates = None
+    if settings.get('NEAR_DUPLICATE_ENABLED'):
+        if NUMPY_AVAILABLE:
+            near_duplicates = NearDuplicateIndex(
+                threshold=settings.get('NEAR_DUPLICATE_THRESHOLD', 0.9),
+                num_perm=settings.get('NEAR_DUPLICATE_NUM_PERM', 128),
+                bands=settings.get('NEAR_DUPLICATE_BANDS', 16),
+                shingle_size=settings.get('NEAR_DUPLICATE_SHINGLE_SIZE', 2),
+                max_entries=settings.get('NEAR_DUPLICATE_MAX_ENTRIES', 10000)
+            )
+        else:
+            logger.warning("NumPy não está instalado. Índice de quase duplicatas desativado.")
+
+    # Orçamento de tokens do email no prompt (por modelo)
+    openai_model = settings.get('OPENAI_MODEL')
+    prompt_budget = PromptBudget(
+        model=openai_model,
+        max_tokens=(settings.get('OPENAI_INPUT_TOKEN_BUDGETS') or {}).get(
+            openai_model, settings.get('OPENAI_INPUT_TOKEN_BUDGET', 512)
+        ),
+        head_ratio=settings.get('OPENAI_INPUT_HEAD_RATIO', 0.6),
+        lazy_load=lazy_load
+    )
+
+    # Circuit breaker das chamadas à OpenAI
+    circuit_breaker = None
+    if settings.get('CIRCUIT_BREAKER_ENABLED', True):
+        circuit_breaker = CircuitBreaker(
+            error_rate=settings.get('CIRCUIT_BREAKER_ERROR_RATE', 0.5),
+            min_requests=settings.get('CIRCUIT_BREAKER_MIN_REQUESTS', 10),
+            window=settings.get('CIRCUIT_BREAKER_WINDOW', 30),
+            cooldown=settings.get('CIRCUIT_BREAKER_COOLDOWN', 30)
+        )
+
+    # Inicializar processadores
+    text_processor = TextProcessor(
+        spacy_model=settings.get('SPACY_MODEL', 'pt_core_news_sm'),
+        spacy_disabled_components=settings.get('SPACY_DISABLED_COMPONENTS'),
+        pdf_extractor=PdfExtractor(
+            max_workers=settings.get('PDF_PARALLEL_WORKERS', 2),
+            max_pages=settings.get('PDF_MAX_PAGES', 500),
+            timeout=settings.get('PDF_EXTRACTION_TIMEOUT', 30),
+            parallel_min_pages=settings.get('PDF_PARALLEL_MIN_PAGES', 16)
+        ),
+        lazy_load=lazy_load,
+        nltk_data_dir=settings.get('NLTK_DATA_DIR'),
+        nltk_download=settings.get('NLTK_DOWNLOAD_ON_STARTUP', False),
+        tokenizer=settings.get('TOKENIZER', 'fast'),
+        strip_replies=settings.get('STRIP_REPLIES', False)
+    )
+    email_classifier = EmailClassifier(
+        openai_api_key=settings.get('OPENAI_API_KEY'),
+        openai_model=openai_model,
+        openai_base_url=settings.get('OPENAI_BASE_URL'),
+        max_concurrency=settings.get('OPENAI_MAX_CONCURRENCY', 8),
+        pack_size=settings.get('OPENAI_PACK_SIZE', 1),
+        pack_max_chars=settings.get('OPENAI_PACK_MAX_CHARS', 1000),
+        mode=settings.get('CLASSIFIER_MODE', 'llm'),
+        cascade_threshold=settings.get('CASCADE_THRESHOLD', 0.8),
+        cache=classification_cache,
+        local_model_path=settings.get('LOCAL_MODEL_PATH'),
+        lazy_load=lazy_load,
+        timeout=settings.get('OPENAI_TIMEOUT', 10),
+        max_retries=settings.get('OPENAI_MAX_RETRIES', 1),
+        hedge_delay=settings.get('OPENAI_HEDGE_DELAY', 0),
+        circuit_breaker=circuit_breaker,
+        retry_budget=RetryBudget(ratio=settings.get('OPENAI_RETRY_BUDGET', 0.1)),
+        near_duplicates=near_duplicates,
+        prompt_budget=prompt_budget,
+        output_mode=settings.get('OPENAI_OUTPUT_MODE', 'json'),
+        reasoning=settings.get('OPENAI_REASONING', True)
+    )
+
+    record_startup_time('services_ms', started)
+    logger.info(f"Serviços inicializados em {startup_timings['services_ms']} ms (lazy_load={lazy_load})")
+
+    return text_processor, email_classifier
+
+def create_job_queue(settings, text_processor, email_classifier):
+    """Cria a fila de jobs assíncronos (None se desativada)."""
+    if not settings.get('JOBS_ENABLED', True):
+        return None
+    try:
+        return JobQueue(
+            db_path=settings['JOBS_DB_PATH'],
+            spool_dir=settings['JOBS_SPOOL_DIR'],
+            handler=partial(run_classification_job, text_processor, email_classifier),
+            max_workers=settings.get('JOBS_WORKERS', 2),
+            max_pending=settings.get('JOBS_MAX_PENDING', 100),
+            ttl_seconds=settings.get('JOBS_TTL_SECONDS', 3600),
+            job_timeout=settings.get('JOBS_TIMEOUT', 600),
+            max_attempts=settings.get('JOBS_MAX_ATTEMPTS', 2)
+        )
+    except (sqlite3.Error, OSError) as e:
+        logger.error(f"Erro ao inicializar a fila de jobs: {str(e)}. Jobs assíncronos desativados.")
+        return None
+
+def _check_deadline(deadline):
+    if deadline is not None and deadline.expired():
+        raise DeadlineExceeded('Tempo limite do job excedido.')
+
+def run_classification_job(text_processor, email_classifier, path, filename, options, deadline=None):
+    """
+    Executa um job: extrai o texto do arquivo, analisa e classifica (resposta de /api/classify).
+
+    ``deadline`` limita a extração do PDF e é conferido antes de cada etapa
+    (DeadlineExceeded); a chamada à OpenAI tem o próprio prazo (OPENAI_TIMEOUT).
+    """
+    fields = frozenset(options['fields']) if options.get('fields') else None
+
+    with open(path, 'rb') as stream:
+        text_content = text_processor.extract_text_from_upload(
+            stream, filename, timeout=deadline.remaining() if deadline is not None else None
+        )
+    _check_deadline(deadline)
+    if not text_content.strip():
+        raise ValueError('Nenhum conteúdo de texto foi extraído do arquivo.')
+
+    analysis = text_processor.analyze(text_content, max_keywords=keywords_limit(fields))
+    _check_deadline(deadline)
+    classification_result = email_classifier.classify_email(analysis['processed_text'])
+    return build_classification_response(text_content, analysis, classification_result, fields)
+
+def job_options(fields):
+    """Opções gravadas com o job (campos pedidos em ``?fields`` / ``?mode``)."""
+    return {'fields': sorted(fields) if fields is not None else None}
+
+def parse_response_fields(fields=None, mode=None):
+    """
+    Interpreta ``?fields=a,b`` e ``?mode=lean|full``.
+
+    Retorna o conjunto de campos pedidos, ou None para a resposta completa.
+    Levanta ValueError para campos ou modos desconhecidos.
+    """
+    mode = (mode or 'full').lower()
+    if mode not in RESPONSE_MODES:
+        raise ValueError(f"Modo de resposta desconhecido: {mode}. Use 'full' ou 'lean'.")
+
+    requested = set(LEAN_FIELDS) if mode == 'lean' else set()
+    if fields:
+        names = {name.strip() for name in fields.split(',') if name.strip()}
+        unknown = sorted(names - set(RESPONSE_FIELDS))
+        if unknown:
+            raise ValueError(f"Campo(s) desconhecido(s) em fields: {', '.join(unknown)}.")
+        requested |= names
+
+    return frozenset(requested) if requested else None
+
+def wants_field(fields, name):
+    """Indica se o campo deve ser calculado (``fields`` None = todos)."""
+    return fields is None or name in fields
+
+def keywords_limit(fields):
+    """max_keywords da análise: 0 (não extrair) se as palavras-chave não foram pedidas."""
+    return MAX_KEYWORDS if wants_field(fields, 'keywords') else 0
+
+def select_fields(response, fields, always=('success',)):
+    """Mantém apenas os campos pedidos (e os de ``always``)."""
+    if fields is None:
+        return response
+    return {key: value for key, value in response.items() if key in fields or key in always}
+
+def allowed_file(filename, allowed_extensions):
+    """Verifica se o arquivo tem extensão permitida."""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions
+
+def build_classification_response(text_content, analysis, classification_result, fields=None):
+    """Monta a resposta de /api/classify (só com ``fields``, se informado)."""
+    processed_text = analysis['processed_text']
+
+    metadata = dict(classification_result.get('metadata', {}))
+    metadata['spacy_cpu_ms'] = analysis['spacy_cpu_ms']
+    metadata['spacy_cpu_saved_ms'] = analysis['spacy_cpu_saved_ms']
+    metadata['stripped_bytes'] = analysis.get('stripped_bytes', 0)
+
+    logger.info(f"Email classificado como: {classification_result['category']} (confiança: {classification_result['confidence']})")
+
+    return select_fields({
+        'success': True,
+        'original_text': text_content[:500] + '...' if len(text_content) > 500 else text_content,
+        'processed_text': processed_text[:300] + '...' if len(processed_text) > 300 else processed_text,
+        'classification': classification_result['category'],
+        'confidence': classification_result['confidence'],
+        'suggested_response': classification_result['suggested_response'],
+        'keywords': analysis['keywords'],
+        'metadata': metadata,
+        'timestamp': datetime.now().isoformat()
+    }, fields)
+
+def parse_batch_items(items):
+    """
+    Valida os itens de um lote.
+
+    Retorna (resultados parciais, índices válidos, textos válidos); itens sem
+    texto já recebem seu erro no resultado parcial.
+    """
+    results = [None] * len(items)
+    valid_indexes = []
+    valid_texts = []
+
+    for index, item in enumerate(items):
+        item_id = item.get('id') if isinstance(item, dict) else None
+        text_content = item.get('text', '') if isinstance(item, dict) else item
+
+        result = {'index': index}
+        if item_id is not None:
+            result['id'] = item_id
+        results[index] = result
+
+        if not isinstance(text_content, str) or not text_content.strip():
+            result.update({'success': False, 'error': 'Nenhum conteúdo de texto foi fornecido.'})
+            continue
+
+        valid_indexes.append(index)
+        valid_texts.append(text_content)
+
+    return results, valid_indexes, valid_texts
+
+def build_batch_response(results, valid_indexes, analyses, classifications, fields=None):
+    """
+    Preenche os resultados do lote e monta a resposta de /api/classify/batch.
+
+    Com ``fields``, cada item traz só os campos pedidos (além de index, id, success e error).
+    """
+    for index, analysis, classification_result in zip(valid_indexes, analyses, classifications):
+        result = results[index]
+        if classification_result['category'] == 'Erro':
+            result.update({
+                'success': False,
+                'error': classification_result.get('metadata', {}).get('error', 'Erro na classificação.')
+            })
+            continue
+
+        result['success'] = True
+        result.update(select_fields({
+            'classification': classification_result['category'],
+            'confidence': classification_result['confidence'],
+            'suggested_response': classification_result['suggested_response'],
+            'method': classification_result.get('method', 'unknown'),
+            'keywords': analysis['keywords'],
+            'metadata': {
+                **classification_result.get('metadata', {}),
+                'stripped_bytes': analysis.get('stripped_bytes', 0)
+            }
+        }, fields, always=()))
+
+    succeeded = sum(1 for result in results if result.get('success'))
+    logger.info(f"Lote classificado: {succeeded}/{len(results)} emails com sucesso")
+
+    return {
+        'success': True,
+        'count': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'results': results,
+        'timestamp': datetime.now().isoformat()
+    }
+
+def build_job_response(job):
+    """Monta a resposta de /api/jobs (estado do job e, ao concluir, o resultado ou o erro)."""
+    response = {
+        'success': job['status'] != 'failed',
+        'job_id': job['id'],
+        'status': job['status'],
+        'status_url': f"/api/jobs/{job['id']}"
+    }
+    for key in ('created_at', 'started_at', 'finished_at'):
+        if job.get(key):
+            response[key] = datetime.fromtimestamp(job[key]).isoformat()
+    for key in ('position', 'attempts', 'result', 'error'):
+        if key in job:
+            response[key] = job[key]
+    return response
+
+def build_health_response(text_processor, email_classifier, mode='wsgi', job_queue=None):
+    """Monta a resposta de /api/health."""
+    return {
+        'status': 'healthy',
+        'timestamp': datetime.now().isoformat(),
+        'mode': mode,
+        'services': {
+            'text_processor': text_processor is not None,
+            'email_classifier': email_classifier is not None,
+            'spacy_model': text_processor.spacy_model_loaded if text_processor else False
+        },
+        'startup': {
+            **startup_timings,
+            'lazy_load': text_processor.lazy_load if text_processor else None,
+            'spacy_load_ms': text_processor.spacy_load_ms if text_processor else None,
+            'pid': os.getpid()
+        },
+        'classifier': email_classifier.tier_stats() if email_classifier else None,
+        'openai': email_classifier.resilience_stats() if email_classifier else None,
+        'cache': email_classifier.cache.stats() if email_classifier and email_classifier.cache else None,
+        'near_duplicates': (email_classifier.near_duplicates.stats()
+                            if email_classifier and email_classifier.near_duplicates else None),
+        'jobs': job_queue.stats() if job_queue else None,
+        'version': '1.0.0'
+    }
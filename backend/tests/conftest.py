@@ -0,0 +1,14 @@
+"""
+Configuração do pytest: os testes importam os módulos como a aplicação,
+a partir de backend/ (``from utils.x import ...``).
+
+Execução:
+    cd backend && python -m pytest
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
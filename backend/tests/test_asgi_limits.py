@@ -0,0 +1,48 @@
+"""
+Limite de MAX_CONTENT_LENGTH no app ASGI: uploads chunked ou sem
+Content-Length também recebem 413.
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip('starlette')
+pytest.importorskip('httpx')
+
+from starlette.testclient import TestClient
+
+import asgi
+
+LIMIT = 1024
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(asgi.settings, 'MAX_CONTENT_LENGTH', LIMIT)
+    return TestClient(asgi.app)
+
+def chunked(payload, size=256):
+    for start in range(0, len(payload), size):
+        yield payload[start:start + size]
+
+def test_chunked_upload_over_limit(client):
+    payload = json.dumps({'text': 'x' * (4 * LIMIT)}).encode('utf-8')
+
+    response = client.post('/api/classify', content=chunked(payload),
+                           headers={'Content-Type': 'application/json'})
+
+    assert response.status_code == 413
+
+def test_content_length_over_limit(client):
+    response = client.post('/api/classify', json={'text': 'x' * (4 * LIMIT)})
+
+    assert response.status_code == 413
+
+def test_chunked_body_under_limit_is_parsed(client):
+    payload = json.dumps({'text': '   '}).encode('utf-8')
+
+    response = client.post('/api/classify', content=chunked(payload, size=4),
+                           headers={'Content-Type': 'application/json'})
+
+    assert response.status_code == 400
+    assert response.json()['error'] == 'Nenhum conteúdo de texto foi fornecido.'
@@ -0,0 +1,71 @@
+"""
+Remoção de histórico citado, assinaturas e avisos legais (utils/email_stripper.py).
+"""
+
+import pytest
+
+from utils.email_stripper import strip_email
+from utils.text_processor import TextProcessor
+
+# Despedidas e cabeçalhos no meio do texto: nada pode ser cortado
+KEEP = [
+    'Oi João,\nObrigado!\nPreciso do relatório do projeto até sexta.\nPodemos marcar reunião amanhã?',
+    'Bom dia\nThanks\nPlease send the contract draft…',
+    'Olá,\nBest\nwishes for the launch, can you confirm the date?',
+    'Olá,\nEm anexo o relatório.\nOn Monday the client wrote: we need changes\n\nPrecisamos revisar o escopo.',
+    'Segue o pedido.\n\nThis email may contain a disclaimer about formatting.',
+    'Segue o pedido.\n-------- Original Message --------\nmas ainda preciso da aprovação.',
+]
+
+@pytest.mark.parametrize('text', KEEP)
+def test_keeps_content(text):
+    assert strip_email(text) == (text, {})
+
+def test_reply_header_mid_line_keeps_body():
+    text = 'Olá,\nEm anexo o relatório.\nOn Monday the client wrote: we need changes\n\nabs'
+
+    body, dropped = strip_email(text)
+
+    assert body == 'Olá,\nEm anexo o relatório.\nOn Monday the client wrote: we need changes'
+    assert set(dropped) == {'signature'}
+
+@pytest.mark.parametrize('text, expected, part', [
+    ('Pode revisar o contrato?\n\nEm seg., 3 de jun. de 2024 às 10:00, Ana <ana@x.com> escreveu:\n'
+     '> Segue o contrato.\n> Abs', 'Pode revisar o contrato?', 'quote'),
+    ('Can you review it?\n\nOn Mon, Jun 3, 2024 at 10:00 AM Ana <ana@x.com>\nwrote:\n\n> Here it is.',
+     'Can you review it?', 'quote'),
+    ('Pode revisar?\n\n-----Original Message-----\nFrom: Ana\nSent: Monday\nSubject: x\n\ntexto antigo',
+     'Pode revisar?', 'quote'),
+    ('Pode revisar?\n\nDe: Ana <ana@x.com>\nEnviado: segunda-feira\nPara: Bob\n\ntexto antigo',
+     'Pode revisar?', 'quote'),
+    ('Segue o pedido.\n---------- Forwarded message ---------\nDe: Ana\nDate: ontem\n\nantigo',
+     'Segue o pedido.', 'quote'),
+    ('Olá,\nSegue o relatório revisado.\n\nAtenciosamente,\nMaria Souza\nGerente de Projetos | ACME Ltda.\n'
+     'Tel: (11) 98765-4321\nmaria@acme.com.br', 'Olá,\nSegue o relatório revisado.', 'signature'),
+    ('Preciso do acesso ao sistema.\n\nObrigado,\nCarlos', 'Preciso do acesso ao sistema.', 'signature'),
+    ('Preciso do acesso ao sistema.\n\nAbs\n\nEnviado do meu iPhone', 'Preciso do acesso ao sistema.', 'signature'),
+    ('Preciso do acesso.\n\n-- \nCarlos Lima\nSuporte', 'Preciso do acesso.', 'signature'),
+    ('Segue o pedido.\n\nEsta mensagem é confidencial e destinada apenas ao destinatário.',
+     'Segue o pedido.', 'disclaimer'),
+])
+def test_strips_boilerplate(text, expected, part):
+    body, dropped = strip_email(text)
+
+    assert body == expected
+    assert part in dropped
+
+def test_forward_without_comment_keeps_original():
+    text = '---------- Forwarded message ---------\nFrom: Ana\nDate: ontem\n\nConteúdo encaminhado.'
+
+    assert strip_email(text) == (text, {})
+
+def test_preprocess_many_without_strip():
+    processor = TextProcessor(lazy_load=True, strip_replies=True)
+    text = 'Preciso do acesso ao sistema.\n\nObrigado,\nCarlos'
+
+    stripped = processor.preprocess_many([text], max_keywords=0)
+    unstripped = processor.preprocess_many([text], max_keywords=0, strip=False)
+
+    assert stripped[0]['stripped_bytes'] > 0
+    assert unstripped[0]['stripped_bytes'] == 0
+    assert 'carlos' in unstripped[0]['processed_text']
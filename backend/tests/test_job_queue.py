@@ -0,0 +1,132 @@
+"""
+Fila de jobs (utils/job_queue.py): jobs lentos não são executados duas vezes e
+jobs de processos encerrados voltam para a fila.
+"""
+
+import io
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from utils.job_queue import JobQueue
+from utils.resilience import DeadlineExceeded
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+@pytest.fixture
+def make_queue(tmp_path):
+    def make(handler, **kwargs):
+        kwargs.setdefault('poll_interval', 0.05)
+        return JobQueue(str(tmp_path / 'jobs.sqlite3'), str(tmp_path / 'spool'), handler, **kwargs)
+    return make
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+def test_start_processes_queued_jobs_without_requests(make_queue):
+    queue = make_queue(lambda path, filename, options, deadline: {'ok': True})
+    queue._connection().execute(
+        "INSERT INTO jobs (id, status, filename, options, created_at) VALUES ('j1', 'queued', 'a.txt', '{}', ?)",
+        (time.time(),)
+    )
+
+    queue.start()
+
+    assert wait_for(lambda: queue._connection().execute(
+        "SELECT status FROM jobs WHERE id = 'j1'").fetchone()[0] == 'done')
+
+def test_slow_job_with_live_owner_is_not_requeued(make_queue):
+    release = threading.Event()
+    calls = []
+
+    def handler(path, filename, options, deadline):
+        calls.append(filename)
+        release.wait(5)
+        return {'ok': True}
+
+    queue = make_queue(handler, job_timeout=0.1)
+    job = queue.submit(io.BytesIO(b'texto'), 'a.txt')
+    assert wait_for(lambda: calls)
+
+    time.sleep(0.2)
+    queue.purge()
+    release.set()
+
+    assert wait_for(lambda: queue.get(job['id'])['status'] == 'failed')
+    time.sleep(0.3)
+    job = queue.get(job['id'])
+    assert calls == ['a.txt']
+    assert job['status'] == 'failed'
+    assert job['error'] == 'Tempo limite do job excedido.'
+
+def test_timed_out_job_frees_worker(make_queue):
+    def handler(path, filename, options, deadline):
+        if filename == 'lento.txt':
+            while not deadline.expired():
+                time.sleep(0.01)
+            raise DeadlineExceeded('Tempo limite do job excedido.')
+        return {'ok': True}
+
+    queue = make_queue(handler, max_workers=1, job_timeout=0.3)
+    slow = queue.submit(io.BytesIO(b'texto'), 'lento.txt')
+    fast = queue.submit(io.BytesIO(b'texto'), 'a.txt')
+
+    assert wait_for(lambda: queue.get(fast['id'])['status'] == 'done')
+    assert queue.get(slow['id'])['status'] == 'failed'
+    assert queue.get(slow['id'])['error'] == 'Tempo limite do job excedido.'
+
+def test_job_of_dead_owner_is_requeued(make_queue):
+    queue = make_queue(lambda path, filename, options, deadline: {'ok': True})
+    now = time.time()
+    queue._connection().execute(
+        "INSERT INTO jobs (id, status, filename, options, attempts, created_at, started_at, owner_pid, heartbeat_at)"
+        " VALUES ('j1', 'running', 'a.txt', '{}', 1, ?, ?, ?, ?)",
+        (now, now, dead_pid(), now)
+    )
+
+    queue.purge()
+    assert queue._connection().execute("SELECT status FROM jobs WHERE id = 'j1'").fetchone()[0] == 'queued'
+
+    queue.start()
+    assert wait_for(lambda: queue.get('j1')['status'] == 'done')
+    assert queue.get('j1')['attempts'] == 2
+
+def test_job_of_dead_owner_fails_after_max_attempts(make_queue):
+    queue = make_queue(lambda path, filename, options, deadline: {'ok': True}, max_attempts=1)
+    now = time.time()
+    queue._connection().execute(
+        "INSERT INTO jobs (id, status, filename, options, attempts, created_at, started_at, owner_pid, heartbeat_at)"
+        " VALUES ('j1', 'running', 'a.txt', '{}', 1, ?, ?, ?, ?)",
+        (now, now, dead_pid(), now)
+    )
+
+    queue.purge()
+
+    assert queue.get('j1')['status'] == 'failed'
+
+def test_migrates_old_schema(tmp_path):
+    db_path = str(tmp_path / 'jobs.sqlite3')
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        'CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, filename TEXT NOT NULL, path TEXT,'
+        ' options TEXT NOT NULL, result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0,'
+        ' created_at REAL NOT NULL, started_at REAL, finished_at REAL)'
+    )
+    conn.close()
+
+    queue = JobQueue(db_path, str(tmp_path / 'spool'), lambda path, filename, options, deadline: None)
+
+    columns = {row[1] for row in queue._connection().execute('PRAGMA table_info(jobs)')}
+    assert {'owner_pid', 'heartbeat_at'} <= columns
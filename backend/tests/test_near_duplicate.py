@@ -0,0 +1,79 @@
+"""
+Índice de quase duplicatas: emails com a mesma estrutura e intenção diferente
+não podem reaproveitar o rótulo um do outro.
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from utils.email_classifier import EmailClassifier
+from utils.near_duplicate import NearDuplicateIndex
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'benchmarks')
+
+TEMPLATE = ('bom dia equipe {name} preciso que vocês {action} o pedido número {order} referente ao '
+            'contrato de manutenção dos servidores ainda esta semana obrigado pela atenção')
+
+CANCEL = TEMPLATE.format(name='joão', action='cancelem', order='48213')
+# Mesma estrutura, intenção diferente
+NEAR_MISSES = [
+    TEMPLATE.format(name='joão', action='confirmem', order='48213'),
+    TEMPLATE.format(name='joão', action='cancelem', order='48213').replace(
+        'preciso que vocês cancelem o pedido número 48213', 'podem me enviar a segunda via do boleto'),
+]
+# Só o número do pedido muda (tokens com dígitos são normalizados)
+SAME_INTENT = TEMPLATE.format(name='joão', action='cancelem', order='77031')
+
+LABEL = {'category': 'Produtivo', 'confidence': 0.9, 'method': 'openai'}
+
+@pytest.mark.parametrize('text', NEAR_MISSES)
+def test_lookup_does_not_merge_different_intent(text):
+    index = NearDuplicateIndex()
+    index.add(CANCEL, LABEL)
+
+    assert index.lookup(text) is None
+
+def test_lookup_reuses_same_intent():
+    index = NearDuplicateIndex()
+    index.add(CANCEL, LABEL)
+
+    classification = index.lookup(SAME_INTENT)
+
+    assert classification['category'] == 'Produtivo'
+    assert classification['near_duplicate_similarity'] >= index.threshold
+
+def test_group_keeps_different_intent_apart():
+    index = NearDuplicateIndex()
+
+    leaders = index.group([CANCEL] + NEAR_MISSES + [SAME_INTENT])
+
+    assert [leader for leader, _ in leaders] == [0, 1, 2, 0]
+
+@pytest.fixture
+def classifier():
+    pytest.importorskip('openai')
+    sys.path.insert(0, BENCHMARKS_DIR)
+    try:
+        from fake_openai_server import start_in_thread
+    finally:
+        sys.path.remove(BENCHMARKS_DIR)
+
+    server = start_in_thread(latency=0.0)
+    yield EmailClassifier(openai_api_key='test', openai_base_url=server.base_url,
+                          near_duplicates=NearDuplicateIndex())
+    server.shutdown()
+
+def test_classifier_sends_near_misses_to_llm(classifier):
+    results = classifier.classify_batch([CANCEL] + NEAR_MISSES + [SAME_INTENT])
+
+    assert [result['metadata']['tier'] for result in results] == ['llm', 'llm', 'llm', 'near_duplicate']
+    assert [result['metadata']['near_duplicate'] for result in results] == [False, False, False, True]
+    assert results[3]['metadata']['near_duplicate_similarity'] == 1.0
+
+    result = classifier.classify_email(NEAR_MISSES[0].replace('semana', 'quinzena'))
+    assert result['metadata']['tier'] == 'llm'
+    assert 'near_duplicate_similarity' not in result['metadata']
@@ -0,0 +1,50 @@
+"""
+Extração de PDF (utils/pdf_extractor.py): o fallback do PyPDF2 respeita o prazo.
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('pdfplumber')
+PyPDF2 = pytest.importorskip('PyPDF2')
+
+from utils import pdf_extractor
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'benchmarks')
+
+def make_pdf(pages):
+    sys.path.insert(0, BENCHMARKS_DIR)
+    try:
+        from corpus import make_pdf
+    finally:
+        sys.path.remove(BENCHMARKS_DIR)
+    return make_pdf(pages)
+
+def test_pypdf2_fallback_stops_at_deadline(monkeypatch):
+    # Relógio que só avança nas páginas extraídas pelo PyPDF2
+    now = [1000.0]
+    calls = []
+
+    def extract_text(page, *args, **kwargs):
+        calls.append(1)
+        now[0] += 1.0
+        return ''
+
+    monkeypatch.setattr(pdf_extractor, 'time', SimpleNamespace(time=lambda: now[0]))
+    monkeypatch.setattr(PyPDF2.PageObject, 'extract_text', extract_text)
+
+    texts = pdf_extractor._extract_pages(make_pdf([''] * 10), 0, 10, deadline=1002.5)
+
+    assert len(texts) == 10
+    assert len(calls) == 3
+
+def test_pypdf2_fallback_without_deadline(monkeypatch):
+    calls = []
+    monkeypatch.setattr(PyPDF2.PageObject, 'extract_text', lambda page, *args, **kwargs: calls.append(1) or '')
+
+    pdf_extractor._extract_pages(make_pdf([''] * 4), 0, 4)
+
+    assert len(calls) == 4
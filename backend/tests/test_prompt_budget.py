@@ -0,0 +1,49 @@
+"""
+Orçamento de tokens (utils/prompt_budget.py): a codificação do tiktoken é
+carregada na criação dos serviços, não na primeira requisição.
+"""
+
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from utils import prompt_budget
+from utils.prompt_budget import PromptBudget
+
+@pytest.fixture
+def loads(monkeypatch):
+    calls = []
+    encoding = SimpleNamespace(name='cl100k_base', encode=lambda text, disallowed_special=(): text.split(),
+                               decode=' '.join)
+
+    def encoding_for_model(model):
+        calls.append(model)
+        return encoding
+
+    monkeypatch.setitem(sys.modules, 'tiktoken', SimpleNamespace(encoding_for_model=encoding_for_model))
+    monkeypatch.setattr(prompt_budget, 'TIKTOKEN_AVAILABLE', True)
+    return calls
+
+def test_encoding_loaded_on_creation(loads):
+    budget = PromptBudget('gpt-4o-mini', max_tokens=3)
+
+    assert loads == ['gpt-4o-mini']
+    assert budget.stats()['tokenizer'] == 'cl100k_base'
+    assert budget.fit('um dois três quatro cinco') == 'um [...] cinco'
+    assert loads == ['gpt-4o-mini']
+
+def test_lazy_load_defers_encoding(loads):
+    budget = PromptBudget('gpt-4o-mini', max_tokens=3, lazy_load=True)
+
+    assert loads == []
+    assert budget.stats()['tokenizer'] == 'not_loaded'
+    budget.count('um dois')
+    assert loads == ['gpt-4o-mini']
+
+def test_estimate_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(prompt_budget, 'TIKTOKEN_AVAILABLE', False)
+    budget = PromptBudget(max_tokens=2)
+
+    assert budget.tokenizer == 'estimate'
+    assert budget.count('a' * 7) == 2
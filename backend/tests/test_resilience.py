@@ -0,0 +1,89 @@
+"""
+Circuit breaker nas chamadas à OpenAI: a chamada de teste do estado meio
+aberto nunca fica presa quando nenhuma chamada é feita.
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils.email_classifier import EmailClassifier
+from utils.resilience import CircuitBreaker, RetryBudget
+
+class ServerError(Exception):
+    status_code = 500
+
+def half_open_breaker():
+    breaker = CircuitBreaker(min_requests=1, cooldown=0.0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    return breaker
+
+def make_classifier(create, **kwargs):
+    classifier = EmailClassifier(**kwargs)
+    classifier._openai_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    classifier._openai_client_ready = True
+    return classifier
+
+def test_release_probe():
+    breaker = half_open_breaker()
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.release_probe()
+
+    assert breaker.allow()
+
+def test_retry_refused_by_budget_does_not_hold_probe():
+    def create(**kwargs):
+        raise ServerError('erro 500')
+
+    breaker = half_open_breaker()
+    classifier = make_classifier(create, circuit_breaker=breaker, max_retries=1,
+                                 retry_budget=RetryBudget(ratio=0.0, max_tokens=0.0))
+
+    with pytest.raises(ServerError):
+        classifier._create_completion('openai_request', model='m', messages=[])
+
+    assert breaker.allow()
+
+def test_cancelled_async_probe_is_released():
+    async def create(**kwargs):
+        await asyncio.sleep(10)
+
+    breaker = half_open_breaker()
+    classifier = EmailClassifier(circuit_breaker=breaker)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    async def run():
+        task = asyncio.ensure_future(classifier._acreate_completion(client, 'openai_request', model='m', messages=[]))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+@pytest.mark.parametrize('breaker, expected_calls', [(None, 2), (half_open_breaker(), 1)])
+def test_no_hedge_while_half_open(breaker, expected_calls):
+    calls = []
+    lock = threading.Lock()
+
+    def create(**kwargs):
+        with lock:
+            calls.append(1)
+        time.sleep(0.2)
+        return SimpleNamespace(usage=None, choices=[])
+
+    classifier = make_classifier(create, circuit_breaker=breaker, hedge_delay=0.05, timeout=2.0)
+
+    classifier._create_completion('openai_request', model='m', messages=[])
+    time.sleep(0.3)
+
+    assert len(calls) == expected_calls
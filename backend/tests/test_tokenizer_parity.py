@@ -0,0 +1,83 @@
+"""
+Paridade do tokenizador 'fast' (TOKEN_RE) com o tokenizador 'nltk' usado antes
+em produção (word_tokenize em português, com o punkt).
+
+Os dois são aplicados à saída de ``clean_text``, a entrada real de
+``remove_stopwords``. Sem os dados do punkt o teste é pulado: a referência é
+sempre o caminho de produção, nunca um substituto.
+"""
+
+import os
+import sys
+
+import pytest
+
+from utils.text_processor import TextProcessor
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'benchmarks')
+NLTK_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'nltk_data')
+
+# Casos escritos à mão: acentos, números, '_', URLs, HTML, espaços e quebras de linha
+FIXED_CORPUS = [
+    'Olá João, a reunião do projeto foi remarcada para sexta-feira às 14h30.',
+    'PROMOÇÃO IMPERDÍVEL!!! Ganhe 50% de desconto em www.loja-exemplo.com.br/oferta?id=123',
+    'Segue em anexo o relatório_final_v2.pdf com as análises técnicas (ver seção 3.1).',
+    'Prezados,\n\n\tConforme combinado, o contrato nº 2024/0456 será assinado amanhã.\r\n',
+    '<p>Clique <a href="http://exemplo.com">aqui</a> para confirmar seu cadastro.</p>',
+    'E-mail: fulano.silva@empresa.com.br — tel.: (11) 98765-4321; CNPJ 12.345.678/0001-90',
+    'Ação, coração, informação, pão, maçã, órgão, açúcar, Über e naïve.',
+    'O cliente perguntou: "vocês entregam até 3/10?" — respondi que sim... talvez.',
+    '   espaços    múltiplos   e\ttabs\te quebras\n\n\nde linha   ',
+    'Orçamento: R$ 1.234,56 (mil duzentos e trinta e quatro reais e cinquenta e seis centavos).',
+]
+
+def _synthetic_corpus():
+    """Corpus sintético com semente fixa (o mesmo dos benchmarks)."""
+    sys.path.insert(0, BENCHMARKS_DIR)
+    try:
+        from corpus import generate_corpus
+    finally:
+        sys.path.remove(BENCHMARKS_DIR)
+    return [item['text'] for item in generate_corpus(per_kind=20, seed=42)]
+
+@pytest.fixture(scope='module')
+def processors():
+    fast = TextProcessor(lazy_load=True, tokenizer='fast', nltk_data_dir=NLTK_DATA_DIR)
+    baseline = TextProcessor(lazy_load=True, tokenizer='nltk', nltk_data_dir=NLTK_DATA_DIR)
+    # Carrega os dados do NLTK (e acrescenta NLTK_DATA_DIR ao caminho de busca)
+    baseline.stop_words
+    if baseline.tokenizer != 'nltk':
+        pytest.skip('NLTK não está instalado: sem o tokenizador de referência.')
+    try:
+        baseline._tokenize('teste')
+    except LookupError:
+        pytest.skip('Dados do punkt ausentes: python -m nltk.downloader -d nltk_data punkt')
+    return fast, baseline
+
+@pytest.mark.parametrize('corpus', ['fixed', 'synthetic'])
+def test_fast_tokenizer_matches_nltk_baseline(processors, corpus):
+    fast, baseline = processors
+    texts = FIXED_CORPUS if corpus == 'fixed' else _synthetic_corpus()
+
+    for text in fast.clean_many(texts):
+        assert fast._tokenize(text) == baseline._tokenize(text), text
+
+def test_remove_stopwords_matches_nltk_baseline(processors):
+    fast, baseline = processors
+
+    for text in fast.clean_many(FIXED_CORPUS):
+        assert fast.remove_stopwords(text) == baseline.remove_stopwords(text)
+
+@pytest.mark.xfail(reason="Diferença conhecida: o NLTK aplica contrações do inglês ('cannot', 'gonna')", strict=True)
+def test_english_contractions_differ(processors):
+    fast, baseline = processors
+    text = fast.clean_text('We cannot attend, gonna reschedule.')
+
+    assert fast._tokenize(text) == baseline._tokenize(text)
+
+def test_fast_tokenizer_tokens():
+    """Tokens do modo 'fast' sobre o texto limpo (roda sem o NLTK)."""
+    processor = TextProcessor(lazy_load=True, tokenizer='fast')
+    text = processor.clean_text('Relatório_final  v2: ação nº 3!\nFim.')
+
+    assert processor._tokenize(text) == ['relatório_final', 'v2', 'ação', 'nº', '3', 'fim']
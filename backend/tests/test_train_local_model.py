@@ -0,0 +1,43 @@
+"""
+Separação treino/validação do train_local_model.py: --holdout fora de [0, 1)
+ou um conjunto de treino sem as duas categorias falham com mensagem clara.
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip('numpy')
+
+import train_local_model
+
+EXAMPLES = [
+    ('preciso do relatório do projeto', 'Produtivo'),
+    ('feliz natal a todos', 'Improdutivo'),
+    ('qual o status do chamado', 'Produtivo'),
+    ('obrigado pela mensagem', 'Improdutivo'),
+]
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / 'rotulados.jsonl'
+    path.write_text(''.join(json.dumps({'text': text, 'category': label}) + '\n' for text, label in EXAMPLES),
+                    encoding='utf-8')
+    return path
+
+def run(dataset, tmp_path, holdout):
+    return train_local_model.main(['--input', str(dataset), '--output', str(tmp_path / 'model.npy'),
+                                   '--no-preprocess', '--holdout', holdout])
+
+@pytest.mark.parametrize('holdout', ['1', '1.5', '-0.1'])
+def test_holdout_out_of_range(dataset, tmp_path, holdout):
+    with pytest.raises(SystemExit):
+        run(dataset, tmp_path, holdout)
+
+def test_empty_training_split(dataset, tmp_path):
+    assert run(dataset, tmp_path, '0.9') == 1
+    assert not (tmp_path / 'model.npy').exists()
+
+def test_without_holdout(dataset, tmp_path):
+    assert run(dataset, tmp_path, '0') == 0
+    assert (tmp_path / 'model.npy').exists()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Treina o classificador estatístico local a partir de emails rotulados.
+
+Entrada: arquivo JSONL (um objeto {"text": ..., "category": ...} por linha) ou
+CSV com as colunas "text" e "category" (ou "label"). Rótulos gerados pela
+OpenAI em classificações anteriores podem ser usados diretamente.
+
+Exemplo:
+    python train_local_model.py --input rotulados.jsonl --output models/local_model.npy
+"""
+
+import argparse
+import csv
+import json
+import logging
+import sys
+import time
+
+from utils.local_model import LocalModel, normalize_label
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def load_examples(path):
+    """Lê pares (texto, rótulo) de um arquivo JSONL ou CSV."""
+    examples = []
+    skipped = 0
+
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        if path.lower().endswith('.csv'):
+            rows = csv.DictReader(file)
+        else:
+            rows = (json.loads(line) for line in file if line.strip())
+
+        for row in rows:
+            text = row.get('text') or ''
+            label = normalize_label(row.get('category') or row.get('label') or row.get('classification') or '')
+            if not text.strip() or label is None:
+                skipped += 1
+                continue
+            examples.append((text, label))
+
+    if skipped:
+        logger.warning(f"{skipped} linhas ignoradas (texto vazio ou rótulo inválido).")
+    return examples
+
+def accuracy(model, texts, labels):
+    """Calcula a acurácia do modelo em um conjunto de textos."""
+    if not texts:
+        return None
+    predictions = model.classify_many(texts)
+    hits = sum(1 for prediction, label in zip(predictions, labels) if prediction['category'] == label)
+    return hits / len(texts)
+
+def holdout_fraction(value):
+    """Tipo do argparse para --holdout: fração em [0, 1)."""
+    fraction = float(value)
+    if not 0 <= fraction < 1:
+        raise argparse.ArgumentTypeError(f"deve estar entre 0 e 1 (exclusivo), recebido {value}")
+    return fraction
+
+def main(argv=None):
+    """Função principal."""
+    parser = argparse.ArgumentParser(description='Treina o classificador estatístico local.')
+    parser.add_argument('--input', required=True, help='Arquivo JSONL ou CSV com emails rotulados')
+    parser.add_argument('--output', default='models/local_model.npy', help='Caminho do arquivo de pesos (.npy)')
+    parser.add_argument('--n-features', type=int, default=2 ** 18, help='Dimensão do espaço de hashing')
+    parser.add_argument('--ngram-max', type=int, default=2, help='Maior n-grama usado como feature')
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--learning-rate', type=float, default=0.5)
+    parser.add_argument('--l2', type=float, default=1e-5)
+    parser.add_argument('--holdout', type=holdout_fraction, default=0.1, help='Fração reservada para validação')
+    parser.add_argument('--no-preprocess', action='store_true',
+                        help='Não aplica o TextProcessor (textos já pré-processados)')
+    args = parser.parse_args(argv)
+
+    examples = load_examples(args.input)
+    if len(examples) < 2 or len({label for _, label in examples}) < 2:
+        logger.error("São necessários exemplos das duas categorias para o treino.")
+        return 1
+
+    texts = [text for text, _ in examples]
+    labels = [label for _, label in examples]
+
+    # O classificador recebe o texto pré-processado na aplicação; treinar no mesmo formato
+    if not args.no_preprocess:
+        from utils.text_processor import TextProcessor
+        processor = TextProcessor()
+        started = time.perf_counter()
+        texts = [processor.preprocess_text(text) for text in texts]
+        logger.info(f"Pré-processamento de {len(texts)} textos em {time.perf_counter() - started:.1f}s")
+
+    # Separação determinística treino/validação
+    holdout_every = int(round(1 / args.holdout)) if args.holdout > 0 else 0
+    train_texts, train_labels, test_texts, test_labels = [], [], [], []
+    for index, (text, label) in enumerate(zip(texts, labels)):
+        if holdout_every and index % holdout_every == 0:
+            test_texts.append(text)
+            test_labels.append(label)
+        else:
+            train_texts.append(text)
+            train_labels.append(label)
+
+    if len(set(train_labels)) < 2:
+        logger.error(f"O conjunto de treino ({len(train_texts)} exemplos) não tem as duas categorias; "
+                     f"reduza --holdout (atual: {args.holdout}).")
+        return 1
+
+    started = time.perf_counter()
+    model = LocalModel.train(
+        train_texts, train_labels,
+        n_features=args.n_features,
+        ngram_max=args.ngram_max,
+        epochs=args.epochs,
+        learning_rate=args.learning_rate,
+        l2=args.l2
+    )
+    logger.info(f"Treino com {len(train_texts)} exemplos em {time.perf_counter() - started:.1f}s")
+
+    train_accuracy = accuracy(model, train_texts, train_labels)
+    test_accuracy = accuracy(model, test_texts, test_labels)
+    model.metadata.update({
+        'source': args.input,
+        'preprocessed': not args.no_preprocess,
+        'train_accuracy': round(train_accuracy, 4) if train_accuracy is not None else None,
+        'holdout_accuracy': round(test_accuracy, 4) if test_accuracy is not None else None,
+        'holdout_examples': len(test_texts)
+    })
+
+    model.save(args.output)
+    logger.info(f"Acurácia treino: {train_accuracy:.3f}" +
+                (f" | validação: {test_accuracy:.3f}" if test_accuracy is not None else ""))
+    logger.info(f"Modelo salvo em {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
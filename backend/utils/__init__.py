@@ -4,6 +4,15 @@ Pacote de utilitários para processamento de texto e classificação de emails.
 
 from .text_processor import TextProcessor
 from .email_classifier import EmailClassifier
+from .classification_cache import ClassificationCache
+from .local_model import LocalModel
+from .pdf_extractor import PdfExtractor
+from .resilience import CircuitBreaker, RetryBudget
+from .near_duplicate import NearDuplicateIndex
+from .prompt_budget import PromptBudget
+from .job_queue import JobQueue, JobQueueFull
 
-__all__ = ['TextProcessor', 'EmailClassifier']
+__all__ = ['TextProcessor', 'EmailClassifier', 'ClassificationCache', 'LocalModel', 'PdfExtractor',
+           'CircuitBreaker', 'RetryBudget', 'NearDuplicateIndex', 'PromptBudget',
+           'JobQueue', 'JobQueueFull']
 
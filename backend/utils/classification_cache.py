@@ -0,0 +1,184 @@
+"""
+Cache de classificações indexado pelo hash do conteúdo do email.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class ClassificationCache:
+    """
+    Cache em dois níveis para resultados de classificação.
+
+    O primeiro nível é um LRU em memória com TTL, local ao processo. O segundo
+    é um banco SQLite em disco (modo WAL), compartilhado por todos os workers
+    do gunicorn na mesma máquina.
+    """
+
+    # Intervalo (em escritas) entre limpezas de entradas expiradas no disco
+    PURGE_INTERVAL = 1000
+
+    def __init__(self, max_entries=10000, ttl_seconds=86400, db_path=None, db_max_entries=200000):
+        """Inicializa o cache."""
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.db_path = db_path
+        self.db_max_entries = int(db_max_entries)
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes_since_purge = 0
+
+        self._counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'errors': 0
+        }
+
+        if self.db_path:
+            try:
+                self._init_db()
+            except sqlite3.Error as e:
+                logger.error(f"Erro ao inicializar cache em disco: {str(e)}. Usando apenas memória.")
+                self.db_path = None
+
+    @staticmethod
+    def make_key(text: str, model: str, prompt_version: str) -> str:
+        """Gera a chave do cache a partir do texto normalizado, modelo e versão do prompt."""
+        normalized = ' '.join(text.lower().split())
+        payload = f"{model}\x00{prompt_version}\x00{normalized}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _connection(self):
+        """Retorna a conexão SQLite da thread atual (recriada após fork)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_db(self):
+        """Cria a tabela do cache em disco se necessário."""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS classification_cache ('
+            ' key TEXT PRIMARY KEY,'
+            ' value TEXT NOT NULL,'
+            ' expires_at REAL NOT NULL)'
+        )
+
+    def _increment(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _memory_get(self, key, now):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _memory_set(self, key, value, expires_at):
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Busca um resultado no cache (memória e depois disco)."""
+        now = time.time()
+
+        value = self._memory_get(key, now)
+        if value is not None:
+            self._increment('memory_hits')
+            return dict(value)
+
+        if self.db_path:
+            try:
+                row = self._connection().execute(
+                    'SELECT value, expires_at FROM classification_cache WHERE key = ? AND expires_at > ?',
+                    (key, now)
+                ).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._memory_set(key, value, row[1])
+                    self._increment('disk_hits')
+                    return dict(value)
+            except (sqlite3.Error, ValueError) as e:
+                logger.error(f"Erro ao ler cache em disco: {str(e)}")
+                self._increment('errors')
+
+        self._increment('misses')
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Armazena um resultado nos dois níveis do cache."""
+        expires_at = time.time() + self.ttl_seconds
+        self._memory_set(key, dict(value), expires_at)
+        self._increment('writes')
+
+        if not self.db_path:
+            return
+
+        try:
+            conn = self._connection()
+            conn.execute(
+                'INSERT OR REPLACE INTO classification_cache (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value, ensure_ascii=False), expires_at)
+            )
+
+            with self._lock:
+                self._writes_since_purge += 1
+                should_purge = self._writes_since_purge >= self.PURGE_INTERVAL
+                if should_purge:
+                    self._writes_since_purge = 0
+
+            if should_purge:
+                self._purge(conn)
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao gravar cache em disco: {str(e)}")
+            self._increment('errors')
+
+    def _purge(self, conn):
+        """Remove entradas expiradas e limita o tamanho do cache em disco."""
+        conn.execute('DELETE FROM classification_cache WHERE expires_at <= ?', (time.time(),))
+        conn.execute(
+            'DELETE FROM classification_cache WHERE key IN ('
+            ' SELECT key FROM classification_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+            (self.db_max_entries,)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna os contadores de acerto/erro do cache deste processo."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['memory_entries'] = len(self._memory)
+
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        stats['disk_enabled'] = bool(self.db_path)
+        stats['pid'] = os.getpid()
+        return stats
@@ -2,40 +2,200 @@
 Classificador de emails usando IA (OpenAI GPT).
 """
 
+import asyncio
+import importlib.util
 import logging
 import json
+import math
 import random
-from typing import Dict, Any
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Tuple
 
-# Importação da biblioteca OpenAI
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OpenAI = None
-    OPENAI_AVAILABLE = False
+from .keyword_scorer import KeywordScorer
+from .local_model import LocalModel
+from .prompt_budget import PromptBudget
+from .metrics import (
+    track_stage, record_openai_response, record_openai_error, record_extra_call, record_fallback,
+    record_classification
+)
+from .resilience import CircuitBreaker, CircuitOpenError, Deadline, DeadlineExceeded, RetryBudget, is_retryable
+
+# A biblioteca OpenAI é importada sob demanda, na criação do cliente (a importação leva quase um segundo)
+OPENAI_AVAILABLE = importlib.util.find_spec('openai') is not None
 
 logger = logging.getLogger(__name__)
 
+# Versão do prompt de classificação; altere ao modificar o prompt para invalidar o cache
+PROMPT_VERSION = '1'
+
+# Modos de classificação: 'llm' (sempre a IA) ou 'cascade' (local primeiro, IA só se incerto)
+CLASSIFIER_MODES = ('llm', 'cascade')
+
+# Camadas que podem responder uma classificação
+CLASSIFICATION_TIERS = ('local', 'cache', 'near_duplicate', 'llm', 'fallback', 'error')
+
+# Formato da resposta da IA: 'json' (JSON no texto), 'schema' (structured outputs com JSON Schema
+# estrito) ou 'label' (uma letra, P ou I, com a confiança calculada pelos logprobs)
+OUTPUT_MODES = ('json', 'schema', 'label')
+
+# Letra respondida no modo 'label' -> categoria
+LABEL_TOKENS = {'P': 'Produtivo', 'I': 'Improdutivo'}
+
+# Categoria citada em texto livre, como palavra inteira ('improdutivo' contém 'produtivo')
+CATEGORY_WORD_RE = re.compile(r'\b(improdutivo|unproductive|produtivo|productive)\b', re.IGNORECASE)
+CATEGORY_WORDS = {
+    'improdutivo': 'Improdutivo', 'unproductive': 'Improdutivo',
+    'produtivo': 'Produtivo', 'productive': 'Produtivo'
+}
+
+# Confiança atribuída quando a resposta não traz uma (texto livre ou rótulo sem logprobs)
+TEXT_FALLBACK_CONFIDENCE = 0.7
+
+# Espera base (s) antes de repetir uma chamada que falhou; dobra a cada tentativa
+RETRY_BACKOFF = 0.2
+
+# Definição das categorias, compartilhada pelos prompts individual e em pacote
+CATEGORY_DEFINITIONS = """PRODUTIVO: Emails relacionados a trabalho, projetos, negócios, reuniões, contratos, propostas, prazos, clientes, desenvolvimento, feedback profissional, relatórios, análises técnicas, documentação oficial.
+
+IMPRODUTIVO: Emails de spam, promoções comerciais, newsletters não solicitados, propaganda, ofertas comerciais, sorteios, phishing, malware, conteúdo irrelevante para o trabalho."""
+
+# Prompt otimizado para classificação de emails
+SYSTEM_PROMPT = f"""Você é um especialista em classificação de emails. Analise o conteúdo do email e classifique-o como:
+
+{CATEGORY_DEFINITIONS}
+
+Responda APENAS com um JSON no formato:
+{{
+  "category": "Produtivo" ou "Improdutivo",
+  "confidence": número entre 0.0 e 1.0,
+  "reasoning": "breve explicação da classificação"
+}}"""
+
+# Mesmo prompt, sem a justificativa: menos tokens gerados por chamada
+SYSTEM_PROMPT_NO_REASONING = f"""Você é um especialista em classificação de emails. Analise o conteúdo do email e classifique-o como:
+
+{CATEGORY_DEFINITIONS}
+
+Responda APENAS com um JSON no formato:
+{{
+  "category": "Produtivo" ou "Improdutivo",
+  "confidence": número entre 0.0 e 1.0
+}}"""
+
+# Prompt do modo 'label': a resposta é um único token
+LABEL_SYSTEM_PROMPT = f"""Você é um especialista em classificação de emails. Classifique o email como:
+
+{CATEGORY_DEFINITIONS}
+
+Responda APENAS com uma letra: P para Produtivo ou I para Improdutivo."""
+
+def classification_response_format(reasoning=True):
+    """response_format do modo 'schema': JSON Schema estrito (a categoria é um enum)."""
+    properties = {
+        "category": {"type": "string", "enum": ["Produtivo", "Improdutivo"]},
+        "confidence": {"type": "number"}
+    }
+    if reasoning:
+        properties["reasoning"] = {"type": "string"}
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "email_classification",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": properties,
+                "required": list(properties),
+                "additionalProperties": False
+            }
+        }
+    }
+
+# Prompt para vários emails em uma única chamada (modo em pacote)
+PACKED_SYSTEM_PROMPT = f"""Você é um especialista em classificação de emails. Você receberá vários emails, cada um delimitado por <email id="...">. Classifique cada um como:
+
+{CATEGORY_DEFINITIONS}
+
+Responda APENAS com um array JSON contendo um objeto por email, no formato:
+[
+  {{"id": id do email, "category": "Produtivo" ou "Improdutivo", "confidence": número entre 0.0 e 1.0}}
+]"""
+
 class EmailClassifier:
     """Classificador de emails usando IA."""
     
-    def __init__(self, openai_api_key=None, openai_model='gpt-3.5-turbo'):
-        """Inicializa o classificador."""
+    def __init__(self, openai_api_key=None, openai_model='gpt-3.5-turbo', max_concurrency=8, cache=None,
+                 local_model_path=None, openai_base_url=None, pack_size=1, pack_max_chars=1000,
+                 mode='llm', cascade_threshold=0.8, lazy_load=False, timeout=10.0, max_retries=1,
+                 hedge_delay=0.0, circuit_breaker=None, retry_budget=None, near_duplicates=None,
+                 prompt_budget=None, output_mode='json', reasoning=True):
+        """
+        Inicializa o classificador.
+        
+        Com ``lazy_load`` o cliente OpenAI só é criado (e a biblioteca importada)
+        na primeira classificação. ``timeout`` é o prazo (s) de cada chamada à
+        OpenAI, incluindo novas tentativas; ``hedge_delay`` > 0 envia uma cópia
+        da chamada que não respondeu nesse tempo. ``circuit_breaker`` (opcional)
+        suspende as chamadas enquanto a taxa de erros estiver alta.
+        ``near_duplicates`` (NearDuplicateIndex, opcional) reaproveita o rótulo
+        de emails quase idênticos a outros já classificados pela IA.
+        ``prompt_budget`` (PromptBudget) limita os tokens do email enviado à IA.
+        ``output_mode`` define o formato da resposta (ver ``OUTPUT_MODES``);
+        sem ``reasoning`` a IA não gera a justificativa.
+        """
         self.openai_api_key = openai_api_key
         self.openai_model = openai_model
+        self.openai_base_url = openai_base_url or None
+        self.max_concurrency = max(1, int(max_concurrency or 1))
+        self.cache = cache
+        self.near_duplicates = near_duplicates
+        self.prompt_budget = prompt_budget or PromptBudget(openai_model, lazy_load=lazy_load)
+        
+        # Formato da resposta da IA
+        if output_mode not in OUTPUT_MODES:
+            logger.warning(f"Formato de resposta desconhecido '{output_mode}'. Usando 'json'.")
+            output_mode = 'json'
+        self.output_mode = output_mode
+        self.reasoning = bool(reasoning) and output_mode != 'label'
+        # A confiança muda de significado entre os formatos: cada um tem suas entradas no cache
+        self.prompt_version = PROMPT_VERSION if output_mode == 'json' else f'{PROMPT_VERSION}-{output_mode}'
+        
+        # Resiliência das chamadas à OpenAI
+        self.timeout = float(timeout)
+        self.max_retries = max(0, int(max_retries))
+        self.hedge_delay = max(0.0, float(hedge_delay or 0))
+        self.circuit_breaker = circuit_breaker
+        self.retry_budget = retry_budget or RetryBudget()
+        self._hedge_executor = None
+        
+        # Modo em pacote: até pack_size emails curtos por chamada (1 desativa)
+        self.pack_size = max(1, int(pack_size or 1))
+        self.pack_max_chars = max(1, int(pack_max_chars or 1))
+        
+        # Modo cascata: o classificador local responde quando está confiante; só o resto vai à IA
+        if mode not in CLASSIFIER_MODES:
+            logger.warning(f"Modo de classificação desconhecido '{mode}'. Usando 'llm'.")
+            mode = 'llm'
+        self.mode = mode
+        self.cascade_threshold = float(cascade_threshold)
+        
+        # Contadores de qual camada respondeu cada email (por processo)
+        self._tier_counts = {tier: 0 for tier in CLASSIFICATION_TIERS}
+        self._tier_lock = threading.Lock()
         
         # Inicializar cliente OpenAI se disponível
-        self.openai_client = None
+        self._openai_client = None
+        self._openai_client_ready = not (OPENAI_AVAILABLE and openai_api_key)
+        self._async_openai_client = None
+        self._async_openai_loop = None
+        self._client_lock = threading.Lock()
         if OPENAI_AVAILABLE and openai_api_key:
-            try:
-                # Inicialização simples e compatível
-                self.openai_client = OpenAI(api_key=openai_api_key)
-                logger.info("Cliente OpenAI inicializado com sucesso.")
-            except Exception as e:
-                logger.error(f"Erro ao inicializar cliente OpenAI: {str(e)}")
-                logger.info("Usando classificação local como fallback.")
-                self.openai_client = None
+            if not lazy_load:
+                # Criar o cliente agora
+                self.openai_client
         elif not OPENAI_AVAILABLE:
             logger.warning("Biblioteca OpenAI não está instalada. Usando classificação local.")
         elif not openai_api_key:
@@ -57,6 +217,18 @@ class EmailClassifier:
             'vírus', 'malware', 'phishing', 'golpe', 'fraude'
         ]
         
+        # Matcher compilado com todas as palavras-chave (varredura única do texto)
+        self.keyword_scorer = KeywordScorer(self.productive_keywords, self.unproductive_keywords)
+        
+        # Modelo estatístico local opcional (usado no lugar das palavras-chave quando disponível)
+        self.local_model = None
+        if local_model_path:
+            try:
+                self.local_model = LocalModel.load(local_model_path)
+                logger.info(f"Modelo local carregado de {local_model_path}.")
+            except Exception as e:
+                logger.error(f"Erro ao carregar modelo local: {str(e)}. Usando palavras-chave.")
+        
         # Templates de resposta
         self.productive_responses = [
             "Obrigado pelo seu email. Analisarei as informações e retornarei em breve com uma resposta detalhada.",
@@ -74,6 +246,367 @@ class EmailClassifier:
             "Conteúdo classificado como não relevante para análise manual."
         ]
     
+    @property
+    def openai_client(self):
+        """Cliente OpenAI síncrono (criado no primeiro acesso; None se indisponível)."""
+        if not self._openai_client_ready:
+            with self._client_lock:
+                if not self._openai_client_ready:
+                    try:
+                        from openai import OpenAI
+                        
+                        # Inicialização simples e compatível
+                        # Novas tentativas ficam a cargo do classificador (orçamento global)
+                        self._openai_client = OpenAI(api_key=self.openai_api_key, base_url=self.openai_base_url,
+                                                     timeout=self.timeout, max_retries=0)
+                        logger.info("Cliente OpenAI inicializado com sucesso.")
+                    except Exception as e:
+                        logger.error(f"Erro ao inicializar cliente OpenAI: {str(e)}")
+                        logger.info("Usando classificação local como fallback.")
+                        self._openai_client = None
+                    self._openai_client_ready = True
+        return self._openai_client
+    
+    def _record_attempt(self, ok: bool):
+        """Registra o resultado de uma tentativa no circuit breaker."""
+        if self.circuit_breaker is not None:
+            if ok:
+                self.circuit_breaker.record_success()
+            else:
+                self.circuit_breaker.record_failure()
+    
+    def _check_circuit(self):
+        if self.circuit_breaker is not None and not self.circuit_breaker.allow():
+            raise CircuitOpenError("Circuito da OpenAI aberto; chamada não realizada.")
+    
+    def _release_probe(self):
+        """Libera a chamada de teste do circuito reservada para uma chamada que não foi feita."""
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.release_probe()
+    
+    def _can_hedge(self) -> bool:
+        """Hedge só com o circuito fechado: meio aberto, apenas a chamada de teste passa."""
+        if self.circuit_breaker is not None and self.circuit_breaker.state != CircuitBreaker.CLOSED:
+            return False
+        return self.retry_budget.withdraw()
+    
+    def _retry_delay(self, error: Exception, attempt: int, deadline: Deadline):
+        """Espera antes da próxima tentativa, ou None se a chamada não deve ser repetida."""
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+        
+        # Prazo e orçamento antes do circuito: allow() reserva a chamada de teste
+        delay = RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.0)
+        if delay >= deadline.remaining() or not self.retry_budget.withdraw():
+            return None
+        if self.circuit_breaker is not None and not self.circuit_breaker.allow():
+            return None
+        record_extra_call("retry")
+        return delay
+    
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        with self._client_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency * 2, thread_name_prefix='openai-hedge'
+                )
+        return self._hedge_executor
+    
+    def _single_completion(self, stage: str, timeout: float, **kwargs):
+        """Uma tentativa de chamada à API da OpenAI, registrando latência, tokens e falhas."""
+        try:
+            with track_stage(stage):
+                response = self.openai_client.chat.completions.create(timeout=timeout, **kwargs)
+        except Exception:
+            record_openai_error()
+            self._record_attempt(False)
+            raise
+        record_openai_response(response)
+        self._record_attempt(True)
+        return response
+    
+    def _hedged_completion(self, stage: str, deadline: Deadline, kwargs: Dict[str, Any]):
+        """Tentativa com hedge: se não houver resposta em ``hedge_delay``, envia uma cópia e usa a primeira."""
+        if deadline.expired():
+            self._release_probe()
+            raise DeadlineExceeded(f"Prazo de {deadline.seconds}s esgotado.")
+        if not self.hedge_delay or self.hedge_delay >= deadline.remaining():
+            return self._single_completion(stage, deadline.remaining(), **kwargs)
+        
+        executor = self._get_hedge_executor()
+        futures = [executor.submit(self._single_completion, stage, deadline.remaining(), **kwargs)]
+        done, _ = wait(futures, timeout=self.hedge_delay)
+        if not done and self._can_hedge():
+            record_extra_call("hedge")
+            futures.append(executor.submit(self._single_completion, stage, deadline.remaining(), **kwargs))
+        
+        # A chamada perdedora termina sozinha (seu timeout é limitado pelo prazo)
+        pending, error = set(futures), None
+        while pending:
+            done, pending = wait(pending, timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        if error is not None and not pending:
+            raise error
+        raise DeadlineExceeded(f"Prazo de {deadline.seconds}s esgotado.")
+    
+    def _create_completion(self, stage: str, **kwargs):
+        """
+        Chama a API da OpenAI dentro do prazo ``self.timeout``.
+        
+        Recusa a chamada com o circuito aberto (CircuitOpenError) e levanta
+        DeadlineExceeded quando o prazo termina. Erros transitórios são repetidos
+        até ``max_retries`` vezes, dentro do orçamento global de novas tentativas.
+        """
+        self._check_circuit()
+        deadline = Deadline(self.timeout)
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                return self._hedged_completion(stage, deadline, kwargs)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                if deadline.expired():
+                    raise DeadlineExceeded(f"Prazo de {deadline.seconds}s esgotado.") from e
+                delay = self._retry_delay(e, attempt, deadline)
+                if delay is None:
+                    raise
+                attempt += 1
+                logger.warning(f"Erro transitório na OpenAI ({str(e)}). Nova tentativa {attempt}/{self.max_retries}.")
+                time.sleep(delay)
+    
+    async def _asingle_completion(self, client, stage: str, timeout: float, **kwargs):
+        """
+        Versão assíncrona de ``_single_completion``. Cancelada (cliente
+        desconectado, hedge perdedor), a chamada não tem resultado: a chamada
+        de teste do circuito é liberada.
+        """
+        try:
+            with track_stage(stage):
+                response = await client.chat.completions.create(timeout=timeout, **kwargs)
+        except asyncio.CancelledError:
+            self._release_probe()
+            raise
+        except Exception:
+            record_openai_error()
+            self._record_attempt(False)
+            raise
+        record_openai_response(response)
+        self._record_attempt(True)
+        return response
+    
+    async def _ahedged_completion(self, client, stage: str, deadline: Deadline, kwargs: Dict[str, Any]):
+        """Versão assíncrona de ``_hedged_completion``; a chamada perdedora é cancelada."""
+        if deadline.expired():
+            self._release_probe()
+            raise DeadlineExceeded(f"Prazo de {deadline.seconds}s esgotado.")
+        if not self.hedge_delay or self.hedge_delay >= deadline.remaining():
+            return await self._asingle_completion(client, stage, deadline.remaining(), **kwargs)
+        
+        tasks = [asyncio.ensure_future(self._asingle_completion(client, stage, deadline.remaining(), **kwargs))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay)
+            if not done and self._can_hedge():
+                record_extra_call("hedge")
+                tasks.append(asyncio.ensure_future(
+                    self._asingle_completion(client, stage, deadline.remaining(), **kwargs)
+                ))
+            
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            if error is not None and not pending:
+                raise error
+            # As chamadas pendentes serão canceladas: contar o prazo esgotado como falha
+            self._record_attempt(False)
+            raise DeadlineExceeded(f"Prazo de {deadline.seconds}s esgotado.")
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    async def _acreate_completion(self, client, stage: str, **kwargs):
+        """Versão assíncrona de ``_create_completion``."""
+        self._check_circuit()
+        deadline = Deadline(self.timeout)
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                return await self._ahedged_completion(client, stage, deadline, kwargs)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                if deadline.expired():
+                    raise DeadlineExceeded(f"Prazo de {deadline.seconds}s esgotado.") from e
+                delay = self._retry_delay(e, attempt, deadline)
+                if delay is None:
+                    raise
+                attempt += 1
+                logger.warning(f"Erro transitório na OpenAI ({str(e)}). Nova tentativa {attempt}/{self.max_retries}.")
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    self._release_probe()
+                    raise
+    
+    @staticmethod
+    def _fallback_reason(error: Exception) -> str:
+        """Motivo do fallback local registrado nas métricas."""
+        if isinstance(error, CircuitOpenError):
+            return "circuit_open"
+        if isinstance(error, DeadlineExceeded):
+            return "deadline"
+        return "error"
+    
+    def resilience_stats(self) -> Dict[str, Any]:
+        """Configuração e estado das proteções das chamadas à OpenAI (por processo)."""
+        return {
+            "timeout_s": self.timeout,
+            "max_retries": self.max_retries,
+            "hedge_delay_s": self.hedge_delay or None,
+            "circuit_breaker": self.circuit_breaker.stats() if self.circuit_breaker is not None else None,
+            "retry_budget": self.retry_budget.stats(),
+            "output_mode": self.output_mode,
+            "reasoning": self.reasoning,
+            "prompt_budget": self.prompt_budget.stats()
+        }
+    
+    def _completion_kwargs(self, text: str) -> Dict[str, Any]:
+        """Monta os parâmetros da chamada de chat completion para um email."""
+        user_prompt = f"Classifique este email:\n\n{self.prompt_budget.fit(text)}"
+        
+        if self.output_mode == 'label':
+            # Um único token; a confiança vem das probabilidades de P e I
+            return {
+                "model": self.openai_model,
+                "messages": [
+                    {"role": "system", "content": LABEL_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt}
+                ],
+                "max_tokens": 1,
+                "temperature": 0,
+                "logprobs": True,
+                "top_logprobs": 5
+            }
+        
+        kwargs = {
+            "model": self.openai_model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT if self.reasoning else SYSTEM_PROMPT_NO_REASONING},
+                {"role": "user", "content": user_prompt}
+            ],
+            "max_tokens": 200 if self.reasoning else 40,
+            "temperature": 0.1  # Baixa temperatura para maior consistência
+        }
+        if self.output_mode == 'schema':
+            kwargs["response_format"] = classification_response_format(self.reasoning)
+        return kwargs
+    
+    def _parse_openai_response(self, response, text: str) -> Dict[str, Any]:
+        """Interpreta a resposta da chamada individual conforme ``output_mode``."""
+        choice = response.choices[0]
+        content = (choice.message.content or "").strip()
+        if self.output_mode == 'label':
+            return self._parse_label(choice, content, text)
+        return self._parse_openai_content(content, text)
+    
+    @staticmethod
+    def _category_from_text(content: str):
+        """Primeira categoria citada como palavra inteira no texto, ou None."""
+        match = CATEGORY_WORD_RE.search(content)
+        return CATEGORY_WORDS[match.group(1).lower()] if match else None
+    
+    def _text_fallback(self, content: str, text: str) -> Dict[str, Any]:
+        """Resposta fora do formato: categoria citada no texto ou, sem ela, classificação local."""
+        category = self._category_from_text(content)
+        if category is None:
+            record_fallback("parse_error")
+            return self._classify_local(text)
+        return {
+            "category": category,
+            "confidence": TEXT_FALLBACK_CONFIDENCE,
+            "method": "openai_text_fallback"
+        }
+    
+    def _parse_openai_content(self, content: str, text: str) -> Dict[str, Any]:
+        """Interpreta a resposta da OpenAI (JSON esperado, com fallback textual)."""
+        try:
+            result = json.loads(content)
+            
+            # Validar campos obrigatórios
+            category = CATEGORY_WORDS.get(str(result.get("category", "")).strip().lower(), "Incerto")
+            confidence = float(result.get("confidence", 0.5))
+            
+            # Garantir que a confiança está no range correto
+            classification = {
+                "category": category,
+                "confidence": max(0.0, min(1.0, confidence)),
+                "method": "openai_schema" if self.output_mode == 'schema' else "openai_gpt"
+            }
+            if result.get("reasoning"):
+                classification["reasoning"] = result["reasoning"]
+            return classification
+            
+        except (ValueError, AttributeError, TypeError):
+            # JSON inválido, que não é um objeto ou com confiança não numérica
+            logger.error(f"Erro ao fazer parse da resposta OpenAI: {content}")
+            return self._text_fallback(content, text)
+    
+    def _parse_label(self, choice, content: str, text: str) -> Dict[str, Any]:
+        """
+        Interpreta a resposta do modo 'label'.
+        
+        A confiança é P(rótulo escolhido) / (P(P) + P(I)), com as probabilidades
+        dos tokens alternativos (top_logprobs) do primeiro token gerado.
+        """
+        category = LABEL_TOKENS.get(content.upper())
+        if category is None:
+            logger.error(f"Rótulo inesperado na resposta OpenAI: {content}")
+            return self._text_fallback(content, text)
+        
+        probabilities = self._label_probabilities(choice)
+        total = sum(probabilities.values())
+        confidence = probabilities.get(category, 0.0) / total if total else TEXT_FALLBACK_CONFIDENCE
+        
+        return {
+            "category": category,
+            "confidence": max(0.0, min(1.0, confidence)),
+            "method": "openai_label"
+        }
+    
+    @staticmethod
+    def _label_probabilities(choice) -> Dict[str, float]:
+        """Soma das probabilidades dos tokens de cada rótulo (ex.: 'P' e ' P') no primeiro token."""
+        logprobs = getattr(choice, "logprobs", None)
+        tokens = getattr(logprobs, "content", None) or []
+        if not tokens:
+            return {}
+        
+        first = tokens[0]
+        token_probabilities = {first.token: math.exp(first.logprob)}
+        for alternative in getattr(first, "top_logprobs", None) or []:
+            token_probabilities[alternative.token] = math.exp(alternative.logprob)
+        
+        probabilities = {}
+        for token, probability in token_probabilities.items():
+            category = LABEL_TOKENS.get(token.strip().upper())
+            if category is not None:
+                probabilities[category] = probabilities.get(category, 0.0) + probability
+        return probabilities
+    
     def classify_with_openai(self, text: str) -> Dict[str, Any]:
         """
         Classifica email usando a API da OpenAI GPT.
@@ -81,144 +614,198 @@ class EmailClassifier:
         try:
             if not self.openai_client:
                 logger.warning("Cliente OpenAI não configurado. Usando classificação local.")
+                record_fallback("not_configured")
                 return self._classify_local(text)
             
-            # Prompt otimizado para classificação de emails
-            system_prompt = """Você é um especialista em classificação de emails. Analise o conteúdo do email e classifique-o como:
-
-PRODUTIVO: Emails relacionados a trabalho, projetos, negócios, reuniões, contratos, propostas, prazos, clientes, desenvolvimento, feedback profissional, relatórios, análises técnicas, documentação oficial.
-
-IMPRODUTIVO: Emails de spam, promoções comerciais, newsletters não solicitados, propaganda, ofertas comerciais, sorteios, phishing, malware, conteúdo irrelevante para o trabalho.
-
-Responda APENAS com um JSON no formato:
-{
-  "category": "Produtivo" ou "Improdutivo",
-  "confidence": número entre 0.0 e 1.0,
-  "reasoning": "breve explicação da classificação"
-}"""
-
-            user_prompt = f"Classifique este email:\n\n{text[:2000]}" 
-            
             # Fazer requisição para a API OpenAI
-            response = self.openai_client.chat.completions.create(
-                model=self.openai_model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=200,
-                temperature=0.1  # Baixa temperatura para maior consistência
-            )
+            response = self._create_completion("openai_call", **self._completion_kwargs(text))
+            return self._parse_openai_response(response, text)
+                
+        except CircuitOpenError:
+            record_fallback("circuit_open")
+            return self._classify_local(text)
+        except Exception as e:
+            logger.error(f"Erro na classificação com OpenAI: {str(e)}")
+            record_fallback(self._fallback_reason(e))
+            return self._classify_local(text)
+    
+    def _get_async_client(self):
+        """
+        Retorna o cliente AsyncOpenAI do event loop atual (criado sob demanda).
+        
+        As conexões do cliente ficam presas ao loop em que foram abertas; um novo
+        loop (ex.: outro worker ou um cliente de testes) recebe um cliente próprio.
+        """
+        if self.openai_client is None:
+            return None
+        
+        loop = asyncio.get_running_loop()
+        if self._async_openai_client is None or self._async_openai_loop is not loop:
+            from openai import AsyncOpenAI
             
-            # Extrair resposta
-            content = response.choices[0].message.content.strip()
+            self._async_openai_client = AsyncOpenAI(api_key=self.openai_api_key, base_url=self.openai_base_url,
+                                                    timeout=self.timeout, max_retries=0)
+            self._async_openai_loop = loop
+        return self._async_openai_client
+    
+    async def aclassify_with_openai(self, text: str) -> Dict[str, Any]:
+        """
+        Versão assíncrona de ``classify_with_openai`` (AsyncOpenAI).
+        
+        A espera pela OpenAI não bloqueia o worker: um único event loop mantém
+        dezenas de chamadas em andamento.
+        """
+        try:
+            client = self._get_async_client()
+            if not client:
+                logger.warning("Cliente OpenAI não configurado. Usando classificação local.")
+                record_fallback("not_configured")
+                return self._classify_local(text)
             
-            # Tentar fazer parse do JSON
-            try:
-                result = json.loads(content)
-                
-                # Validar campos obrigatórios
-                category = result.get("category", "Incerto")
-                confidence = float(result.get("confidence", 0.5))
-                reasoning = result.get("reasoning", "")
-                
-                # Normalizar categoria
-                if category.lower() in ['produtivo', 'productive']:
-                    category = "Produtivo"
-                elif category.lower() in ['improdutivo', 'unproductive']:
-                    category = "Improdutivo"
-                else:
-                    category = "Incerto"
-                
-                # Garantir que a confiança está no range correto
-                confidence = max(0.0, min(1.0, confidence))
-                
-                return {
-                    "category": category,
-                    "confidence": confidence,
-                    "method": "openai_gpt",
-                    "reasoning": reasoning
-                }
-                
-            except json.JSONDecodeError:
-                logger.error(f"Erro ao fazer parse da resposta OpenAI: {content}")
-                # Fallback: tentar extrair categoria da resposta de texto
-                content_lower = content.lower()
-                if "produtivo" in content_lower:
-                    return {
-                        "category": "Produtivo",
-                        "confidence": 0.7,
-                        "method": "openai_text_fallback"
-                    }
-                elif "improdutivo" in content_lower:
-                    return {
-                        "category": "Improdutivo",
-                        "confidence": 0.7,
-                        "method": "openai_text_fallback"
-                    }
-                else:
-                    return self._classify_local(text)
+            response = await self._acreate_completion(client, "openai_call", **self._completion_kwargs(text))
+            return self._parse_openai_response(response, text)
                 
+        except CircuitOpenError:
+            record_fallback("circuit_open")
+            return self._classify_local(text)
         except Exception as e:
             logger.error(f"Erro na classificação com OpenAI: {str(e)}")
+            record_fallback(self._fallback_reason(e))
             return self._classify_local(text)
     
-    def _classify_local(self, text: str) -> Dict[str, Any]:
-        """Classificação local usando palavras-chave (fallback)."""
+    def _packed_completion_kwargs(self, texts: List[str]) -> Dict[str, Any]:
+        """Monta os parâmetros da chamada de chat completion para vários emails."""
+        emails = "\n\n".join(
+            f'<email id="{index}">\n{text[:self.pack_max_chars]}\n</email>'
+            for index, text in enumerate(texts)
+        )
+        user_prompt = f"Classifique estes {len(texts)} emails:\n\n{emails}"
+        
+        return {
+            "model": self.openai_model,
+            "messages": [
+                {"role": "system", "content": PACKED_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            # Cerca de 30 tokens por objeto do array, com folga
+            "max_tokens": 40 * len(texts) + 20,
+            "temperature": 0.1
+        }
+    
+    def _parse_packed_content(self, content: str, count: int) -> Dict[int, Dict[str, Any]]:
+        """
+        Interpreta a resposta em pacote (array JSON de {id, category, confidence}).
+        
+        Retorna apenas os itens válidos, indexados pelo id; itens ausentes ou
+        malformados ficam de fora para serem reclassificados individualmente.
+        """
+        # Tolerar texto ou cercas de código em volta do array
+        start, end = content.find('['), content.rfind(']')
+        if start == -1 or end <= start:
+            logger.error(f"Resposta em pacote sem array JSON: {content[:200]}")
+            return {}
+        
         try:
-            text_lower = text.lower()
-            
-            # Contar ocorrências de palavras-chave
-            productive_score = sum(
-                1 for keyword in self.productive_keywords 
-                if keyword in text_lower
-            )
-            
-            unproductive_score = sum(
-                1 for keyword in self.unproductive_keywords 
-                if keyword in text_lower
-            )
-            
-            # Análise adicional baseada em padrões
-            # Emails com muitos links ou palavras em maiúscula são suspeitos
-            links_count = text.count('http') + text.count('www.')
-            caps_ratio = sum(1 for c in text if c.isupper()) / len(text) if text else 0
-            
-            if links_count > 3:
-                unproductive_score += 2
-            
-            if caps_ratio > 0.3:
-                unproductive_score += 1
-            
-            # Emails muito curtos ou muito longos podem ser suspeitos
-            word_count = len(text.split())
-            if word_count < 10 or word_count > 1000:
-                unproductive_score += 1
+            items = json.loads(content[start:end + 1])
+        except json.JSONDecodeError:
+            logger.error(f"Erro ao fazer parse da resposta em pacote: {content[:200]}")
+            return {}
+        
+        classifications = {}
+        for item in items:
+            try:
+                index = int(item["id"])
+                category = str(item["category"]).lower()
+                confidence = max(0.0, min(1.0, float(item["confidence"])))
+            except (TypeError, KeyError, ValueError):
+                continue
             
-            # Determinar categoria
-            if productive_score > unproductive_score:
+            if category in ['produtivo', 'productive']:
                 category = "Produtivo"
-                confidence = min(0.85, 0.6 + (productive_score * 0.05))
-            elif unproductive_score > productive_score:
+            elif category in ['improdutivo', 'unproductive']:
                 category = "Improdutivo"
-                confidence = min(0.85, 0.6 + (unproductive_score * 0.05))
             else:
-                # Critério de desempate baseado no comprimento e estrutura
-                if 50 <= word_count <= 500:
-                    category = "Produtivo"
-                    confidence = 0.6
-                else:
-                    category = "Improdutivo"
-                    confidence = 0.6
-            
-            return {
-                "category": category,
-                "confidence": confidence,
-                "method": "local_keywords",
-                "productive_score": productive_score,
-                "unproductive_score": unproductive_score
-            }
+                continue
             
+            if 0 <= index < count and index not in classifications:
+                classifications[index] = {
+                    "category": category,
+                    "confidence": confidence,
+                    "method": "openai_packed"
+                }
+        
+        return classifications
+    
+    def classify_packed(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Classifica vários emails curtos em uma única chamada à OpenAI.
+        
+        O prompt de sistema é enviado uma vez por pacote em vez de uma vez por
+        email. Itens ausentes ou malformados na resposta são reclassificados
+        individualmente com ``classify_with_openai``.
+        """
+        if len(texts) <= 1 or not self.openai_client:
+            return [self.classify_with_openai(text) for text in texts]
+        
+        classifications = {}
+        try:
+            response = self._create_completion("openai_packed_call", **self._packed_completion_kwargs(texts))
+            content = response.choices[0].message.content.strip()
+            classifications = self._parse_packed_content(content, len(texts))
+        except (CircuitOpenError, DeadlineExceeded) as e:
+            # Sem reclassificação individual: a OpenAI não responderia a tempo
+            return self._packed_local_fallback(texts, e)
+        except Exception as e:
+            logger.error(f"Erro na classificação em pacote com OpenAI: {str(e)}")
+        
+        missing = [index for index in range(len(texts)) if index not in classifications]
+        if missing:
+            logger.warning(f"{len(missing)}/{len(texts)} emails do pacote serão reclassificados individualmente.")
+            for index in missing:
+                classifications[index] = self.classify_with_openai(texts[index])
+        
+        return [classifications[index] for index in range(len(texts))]
+    
+    def _packed_local_fallback(self, texts: List[str], error: Exception) -> List[Dict[str, Any]]:
+        """Classifica localmente um pacote inteiro quando a OpenAI está indisponível."""
+        logger.warning(f"OpenAI indisponível para o pacote ({str(error)}). Usando classificação local.")
+        reason = self._fallback_reason(error)
+        for _ in texts:
+            record_fallback(reason)
+        return self.classify_local_batch(texts)
+    
+    async def aclassify_packed(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Versão assíncrona de ``classify_packed``."""
+        client = self._get_async_client()
+        if len(texts) <= 1 or not client:
+            return list(await asyncio.gather(*(self.aclassify_with_openai(text) for text in texts)))
+        
+        classifications = {}
+        try:
+            response = await self._acreate_completion(client, "openai_packed_call", **self._packed_completion_kwargs(texts))
+            content = response.choices[0].message.content.strip()
+            classifications = self._parse_packed_content(content, len(texts))
+        except (CircuitOpenError, DeadlineExceeded) as e:
+            # Sem reclassificação individual: a OpenAI não responderia a tempo
+            return self._packed_local_fallback(texts, e)
+        except Exception as e:
+            logger.error(f"Erro na classificação em pacote com OpenAI: {str(e)}")
+        
+        missing = [index for index in range(len(texts)) if index not in classifications]
+        if missing:
+            logger.warning(f"{len(missing)}/{len(texts)} emails do pacote serão reclassificados individualmente.")
+            retried = await asyncio.gather(*(self.aclassify_with_openai(texts[index]) for index in missing))
+            classifications.update(zip(missing, retried))
+        
+        return [classifications[index] for index in range(len(texts))]
+    
+    def _classify_local(self, text: str) -> Dict[str, Any]:
+        """Classificação local usando o modelo estatístico ou palavras-chave (fallback)."""
+        try:
+            with track_stage('local_classify'):
+                if self.local_model is not None:
+                    return self.local_model.classify_many([text])[0]
+                return self._score_local(self.keyword_scorer.features(text))
         except Exception as e:
             logger.error(f"Erro na classificação local: {str(e)}")
             return {
@@ -227,6 +814,59 @@ Responda APENAS com um JSON no formato:
                 "method": "error_fallback"
             }
     
+    def classify_local_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Classificação local de uma lista de textos em uma única chamada vetorizada."""
+        try:
+            with track_stage('local_classify_batch'):
+                if self.local_model is not None:
+                    return self.local_model.classify_many(texts)
+                return [self._score_local(features) for features in self.keyword_scorer.features_many(texts)]
+        except Exception as e:
+            logger.error(f"Erro na classificação local em lote: {str(e)}")
+            return [self._classify_local(text) for text in texts]
+    
+    def _score_local(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Converte as features extraídas pelo KeywordScorer em uma classificação."""
+        productive_score = features["productive_score"]
+        unproductive_score = features["unproductive_score"]
+        
+        # Análise adicional baseada em padrões
+        # Emails com muitos links ou palavras em maiúscula são suspeitos
+        if features["links_count"] > 3:
+            unproductive_score += 2
+        
+        if features["caps_ratio"] > 0.3:
+            unproductive_score += 1
+        
+        # Emails muito curtos ou muito longos podem ser suspeitos
+        word_count = features["word_count"]
+        if word_count < 10 or word_count > 1000:
+            unproductive_score += 1
+        
+        # Determinar categoria
+        if productive_score > unproductive_score:
+            category = "Produtivo"
+            confidence = min(0.85, 0.6 + (productive_score * 0.05))
+        elif unproductive_score > productive_score:
+            category = "Improdutivo"
+            confidence = min(0.85, 0.6 + (unproductive_score * 0.05))
+        else:
+            # Critério de desempate baseado no comprimento e estrutura
+            if 50 <= word_count <= 500:
+                category = "Produtivo"
+                confidence = 0.6
+            else:
+                category = "Improdutivo"
+                confidence = 0.6
+        
+        return {
+            "category": category,
+            "confidence": confidence,
+            "method": "local_keywords",
+            "productive_score": productive_score,
+            "unproductive_score": unproductive_score
+        }
+    
     def generate_response(self, category: str, original_text: str = "") -> str:
         """Gera resposta automática baseada na categoria."""
         try:
@@ -244,37 +884,398 @@ Responda APENAS com um JSON no formato:
             logger.error(f"Erro na geração de resposta: {str(e)}")
             return "Email recebido e será processado adequadamente."
     
-    def classify_email(self, text: str) -> Dict[str, Any]:
-        """Pipeline completo de classificação de email."""
+    def _count_tier(self, tier: str):
+        with self._tier_lock:
+            self._tier_counts[tier] = self._tier_counts.get(tier, 0) + 1
+    
+    def tier_stats(self) -> Dict[str, Any]:
+        """Quantos emails cada camada respondeu neste processo."""
+        with self._tier_lock:
+            counts = dict(self._tier_counts)
+        
+        total = sum(counts.values())
+        return {
+            "mode": self.mode,
+            "cascade_threshold": self.cascade_threshold if self.mode == 'cascade' else None,
+            "tiers": counts,
+            "llm_calls_avoided_rate": round(
+                (counts.get("local", 0) + counts.get("cache", 0) + counts.get("near_duplicate", 0)) / total, 4
+            ) if total else 0.0
+        }
+    
+    @staticmethod
+    def _llm_tier(classification: Dict[str, Any]) -> str:
+        """Camada de uma classificação que passou pela IA: 'llm' ou 'fallback' (local após falha)."""
+        return "llm" if classification.get("method", "").startswith("openai") else "fallback"
+    
+    def _is_confident(self, classification: Dict[str, Any]) -> bool:
+        """Indica se a classificação local pode ser aceita sem consultar a IA."""
+        return (classification.get("method") != "error_fallback"
+                and classification["category"] in ("Produtivo", "Improdutivo")
+                and classification["confidence"] >= self.cascade_threshold)
+    
+    def _cache_lookup(self, text: str):
+        """Consulta o cache; retorna (chave, classificação ou None)."""
+        if self.cache is None:
+            return None, None
+        cache_key = self.cache.make_key(text, self.openai_model, self.prompt_version)
+        return cache_key, self.cache.get(cache_key)
+    
+    def _reuse_lookup(self, text: str):
+        """
+        Procura uma classificação já feita: cache exato e, em seguida, o índice de
+        quase duplicatas. Retorna (chave do cache, classificação ou None, camada).
+        """
+        cache_key, classification = self._cache_lookup(text)
+        if classification is not None:
+            return cache_key, classification, "cache"
+        if self.near_duplicates is not None:
+            classification = self.near_duplicates.lookup(text)
+            if classification is not None:
+                return cache_key, classification, "near_duplicate"
+        return cache_key, None, None
+    
+    def _cache_store(self, cache_key, classification: Dict[str, Any], text: str = None):
+        """Armazena apenas respostas da IA; o fallback local é barato e transitório."""
+        if not classification.get("method", "").startswith("openai"):
+            return
+        if cache_key:
+            self.cache.set(cache_key, classification)
+        if text is not None and self.near_duplicates is not None:
+            self.near_duplicates.add(text, classification)
+    
+    def _build_result(self, text: str, classification: Dict[str, Any], tier: str) -> Dict[str, Any]:
+        """Monta o resultado final do pipeline a partir da classificação."""
+        self._count_tier(tier)
+        record_classification(classification.get("method", "unknown"), tier)
+        
+        # Gerar resposta
+        response = self.generate_response(
+            classification["category"], 
+            text
+        )
+        
+        metadata = {
+            "text_length": len(text),
+            "word_count": len(text.split()),
+            "productive_score": classification.get("productive_score", 0),
+            "unproductive_score": classification.get("unproductive_score", 0),
+            "cache_hit": tier == "cache",
+            "near_duplicate": tier == "near_duplicate",
+            "tier": tier
+        }
+        if tier == "near_duplicate":
+            metadata["near_duplicate_similarity"] = classification.get("near_duplicate_similarity")
+        
+        return {
+            "category": classification["category"],
+            "confidence": round(classification["confidence"], 2),
+            "suggested_response": response,
+            "method": classification.get("method", "unknown"),
+            "metadata": metadata
+        }
+    
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        """Resultado padrão quando o pipeline de classificação falha."""
+        logger.error(f"Erro no pipeline de classificação: {str(error)}")
+        self._count_tier("error")
+        record_classification("error", "error")
+        return {
+            "category": "Erro",
+            "confidence": 0.0,
+            "suggested_response": "Não foi possível classificar este email devido a um erro interno.",
+            "method": "error",
+            "metadata": {"error": str(error)}
+        }
+    
+    def _classify_email_llm(self, text: str) -> Dict[str, Any]:
+        """Classificação pela IA, consultando o cache antes."""
         try:
+            # Consultar o cache e as quase duplicatas antes de chamar a IA
+            cache_key, classification, tier = self._reuse_lookup(text)
+            if classification is not None:
+                return self._build_result(text, classification, tier)
+            
             # Classificar usando IA
             classification = self.classify_with_openai(text)
+            self._cache_store(cache_key, classification, text)
             
-            # Gerar resposta
-            response = self.generate_response(
-                classification["category"], 
-                text
-            )
+            return self._build_result(text, classification, self._llm_tier(classification))
             
-            return {
-                "category": classification["category"],
-                "confidence": round(classification["confidence"], 2),
-                "suggested_response": response,
-                "method": classification.get("method", "unknown"),
-                "metadata": {
-                    "text_length": len(text),
-                    "word_count": len(text.split()),
-                    "productive_score": classification.get("productive_score", 0),
-                    "unproductive_score": classification.get("unproductive_score", 0)
-                }
-            }
+        except Exception as e:
+            return self._error_result(e)
+    
+    async def _aclassify_email_llm(self, text: str) -> Dict[str, Any]:
+        """Versão assíncrona de ``_classify_email_llm``."""
+        try:
+            cache_key, classification, tier = self._reuse_lookup(text)
+            if classification is not None:
+                return self._build_result(text, classification, tier)
+            
+            classification = await self.aclassify_with_openai(text)
+            self._cache_store(cache_key, classification, text)
+            
+            return self._build_result(text, classification, self._llm_tier(classification))
             
         except Exception as e:
-            logger.error(f"Erro no pipeline de classificação: {str(e)}")
-            return {
-                "category": "Erro",
-                "confidence": 0.0,
-                "suggested_response": "Não foi possível classificar este email devido a um erro interno.",
-                "method": "error",
-                "metadata": {"error": str(e)}
+            return self._error_result(e)
+    
+    def _cascade_local(self, texts: List[str], results: List[Any]) -> List[int]:
+        """
+        Primeira camada do modo cascata: classificação local vetorizada.
+        
+        Preenche ``results`` com as classificações confiantes e retorna os índices
+        que ainda precisam da IA.
+        """
+        try:
+            classifications = self.classify_local_batch(texts)
+        except Exception as e:
+            logger.error(f"Erro na camada local da cascata: {str(e)}")
+            return list(range(len(texts)))
+        
+        pending = []
+        for index, classification in enumerate(classifications):
+            if self._is_confident(classification):
+                results[index] = self._build_result(texts[index], classification, "local")
+            else:
+                pending.append(index)
+        return pending
+    
+    def classify_email(self, text: str) -> Dict[str, Any]:
+        """Pipeline completo de classificação de email."""
+        if self.mode == 'cascade':
+            results = [None]
+            if not self._cascade_local([text], results):
+                return results[0]
+        
+        return self._classify_email_llm(text)
+    
+    async def aclassify_email(self, text: str) -> Dict[str, Any]:
+        """Versão assíncrona de ``classify_email``."""
+        if self.mode == 'cascade':
+            results = [None]
+            if not self._cascade_local([text], results):
+                return results[0]
+        
+        return await self._aclassify_email_llm(text)
+    
+    def _plan_packs(self, texts: List[str]):
+        """
+        Consulta o cache (e as quase duplicatas) e agrupa os emails restantes em pacotes.
+        
+        Retorna (chaves de cache, (classificação, camada) reaproveitada ou None,
+        pacotes), onde cada pacote é uma lista de índices. Emails longos vão sozinhos.
+        """
+        cache_keys = [None] * len(texts)
+        cached = [None] * len(texts)
+        packs = []
+        current = []
+        
+        for index, text in enumerate(texts):
+            try:
+                cache_keys[index], classification, tier = self._reuse_lookup(text)
+                if classification is not None:
+                    cached[index] = (classification, tier)
+            except Exception as e:
+                logger.error(f"Erro na consulta ao cache: {str(e)}")
+            if cached[index] is not None:
+                continue
+            
+            if len(text) > self.pack_max_chars:
+                packs.append([index])
+                continue
+            
+            current.append(index)
+            if len(current) == self.pack_size:
+                packs.append(current)
+                current = []
+        
+        if current:
+            packs.append(current)
+        
+        return cache_keys, cached, packs
+    
+    def _finish_packed_batch(self, texts, cache_keys, cached, packs, pack_results) -> List[Dict[str, Any]]:
+        """Junta as classificações reaproveitadas e as dos pacotes nos resultados finais, na ordem da entrada."""
+        results = [None] * len(texts)
+        
+        for index, reused in enumerate(cached):
+            if reused is not None:
+                results[index] = self._build_result(texts[index], *reused)
+        
+        for pack, classifications in zip(packs, pack_results):
+            for index, classification in zip(pack, classifications):
+                try:
+                    if isinstance(classification, Exception):
+                        raise classification
+                    self._cache_store(cache_keys[index], classification, texts[index])
+                    results[index] = self._build_result(texts[index], classification, self._llm_tier(classification))
+                except Exception as e:
+                    results[index] = self._error_result(e)
+        
+        return results
+    
+    def _classify_pack(self, texts: List[str], pack: List[int]) -> List[Any]:
+        """Classifica um pacote de índices; erros viram o resultado de cada item."""
+        try:
+            return self.classify_packed([texts[index] for index in pack])
+        except Exception as e:
+            return [e] * len(pack)
+    
+    async def _aclassify_pack(self, texts: List[str], pack: List[int]) -> List[Any]:
+        """Versão assíncrona de ``_classify_pack``."""
+        try:
+            return await self.aclassify_packed([texts[index] for index in pack])
+        except Exception as e:
+            return [e] * len(pack)
+    
+    def classify_batch(self, texts: List[str], max_concurrency: int = None) -> List[Dict[str, Any]]:
+        """
+        Classifica uma lista de emails com chamadas concorrentes à OpenAI.
+        
+        Os resultados são retornados na mesma ordem da entrada. Erros em um item
+        não interrompem os demais: cada item recebe seu próprio resultado. Com
+        ``pack_size`` > 1, emails curtos são agrupados em uma chamada por pacote.
+        No modo cascata, só os emails incertos para o classificador local vão à IA.
+        """
+        results = [None] * len(texts)
+        pending = list(range(len(texts)))
+        if self.mode == 'cascade' and texts:
+            pending = self._cascade_local(texts, results)
+        
+        if pending:
+            llm_results = self._classify_batch_llm([texts[index] for index in pending], max_concurrency)
+            for index, result in zip(pending, llm_results):
+                results[index] = result
+        
+        return results
+    
+    def _split_near_duplicates(self, texts: List[str]):
+        """
+        Separa as quase duplicatas do próprio lote: só o primeiro email de cada
+        grupo (o líder) vai à IA. Retorna (índices dos líderes,
+        {seguidor: (líder, similaridade)}).
+        """
+        if self.near_duplicates is None or len(texts) < 2:
+            return list(range(len(texts))), {}
+        
+        try:
+            leaders_of = self.near_duplicates.group(texts)
+        except Exception as e:
+            logger.error(f"Erro ao agrupar quase duplicatas: {str(e)}")
+            return list(range(len(texts))), {}
+        
+        leaders = [index for index, (leader, _) in enumerate(leaders_of) if leader == index]
+        followers = {index: group for index, group in enumerate(leaders_of) if group[0] != index}
+        return leaders, followers
+    
+    def _reuse_leader_results(self, texts: List[str], results: List[Any],
+                              followers: Dict[int, Tuple[int, float]]) -> List[int]:
+        """
+        Copia para cada seguidor o rótulo que a IA deu ao seu líder. Retorna os
+        seguidores cujo líder não foi classificado pela IA (fallback ou erro).
+        """
+        pending = []
+        for index, (leader, similarity) in followers.items():
+            leader_result = results[leader]
+            if not leader_result.get("method", "").startswith("openai"):
+                pending.append(index)
+                continue
+            classification = {
+                "category": leader_result["category"],
+                "confidence": leader_result["confidence"],
+                "method": leader_result["method"],
+                "near_duplicate_similarity": similarity
             }
+            self.near_duplicates.record_reuse()
+            results[index] = self._build_result(texts[index], classification, "near_duplicate")
+        return pending
+    
+    def _classify_batch_llm(self, texts: List[str], max_concurrency: int = None) -> List[Dict[str, Any]]:
+        """Classificação em lote pela IA; quase duplicatas do lote reaproveitam o rótulo do líder."""
+        if not texts:
+            return []
+        
+        # Sem cliente OpenAI a classificação é local e rápida; evita criar threads
+        if not self.openai_client:
+            return [self._classify_email_llm(text) for text in texts]
+        
+        leaders, followers = self._split_near_duplicates(texts)
+        results = [None] * len(texts)
+        leader_results = self._classify_unique_llm([texts[index] for index in leaders], max_concurrency)
+        for index, result in zip(leaders, leader_results):
+            results[index] = result
+        
+        for index in self._reuse_leader_results(texts, results, followers):
+            results[index] = self._classify_email_llm(texts[index])
+        return results
+    
+    def _classify_unique_llm(self, texts: List[str], max_concurrency: int = None) -> List[Dict[str, Any]]:
+        """Classificação em lote pela IA (threads ou pacotes)."""
+        workers = min(max_concurrency or self.max_concurrency, len(texts))
+        
+        if self.pack_size > 1:
+            cache_keys, cached, packs = self._plan_packs(texts)
+            workers = min(workers, len(packs))
+            if workers <= 1:
+                pack_results = [self._classify_pack(texts, pack) for pack in packs]
+            else:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='openai-batch') as executor:
+                    pack_results = list(executor.map(lambda pack: self._classify_pack(texts, pack), packs))
+            return self._finish_packed_batch(texts, cache_keys, cached, packs, pack_results)
+        
+        if workers <= 1:
+            return [self._classify_email_llm(text) for text in texts]
+        
+        # O cliente OpenAI é thread-safe; cada thread mantém uma requisição em andamento
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='openai-batch') as executor:
+            return list(executor.map(self._classify_email_llm, texts))
+    
+    async def aclassify_batch(self, texts: List[str], max_concurrency: int = None) -> List[Dict[str, Any]]:
+        """Versão assíncrona de ``classify_batch``: chamadas concorrentes limitadas por semáforo."""
+        results = [None] * len(texts)
+        pending = list(range(len(texts)))
+        if self.mode == 'cascade' and texts:
+            pending = self._cascade_local(texts, results)
+        
+        if pending:
+            llm_results = await self._aclassify_batch_llm([texts[index] for index in pending], max_concurrency)
+            for index, result in zip(pending, llm_results):
+                results[index] = result
+        
+        return results
+    
+    async def _aclassify_batch_llm(self, texts: List[str], max_concurrency: int = None) -> List[Dict[str, Any]]:
+        """Versão assíncrona de ``_classify_batch_llm``."""
+        if not texts:
+            return []
+        
+        leaders, followers = self._split_near_duplicates(texts)
+        results = [None] * len(texts)
+        leader_results = await self._aclassify_unique_llm([texts[index] for index in leaders], max_concurrency)
+        for index, result in zip(leaders, leader_results):
+            results[index] = result
+        
+        for index in self._reuse_leader_results(texts, results, followers):
+            results[index] = await self._aclassify_email_llm(texts[index])
+        return results
+    
+    async def _aclassify_unique_llm(self, texts: List[str], max_concurrency: int = None) -> List[Dict[str, Any]]:
+        """Versão assíncrona de ``_classify_unique_llm``."""
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        
+        if self.pack_size > 1 and self._get_async_client():
+            cache_keys, cached, packs = self._plan_packs(texts)
+            
+            async def classify_pack(pack):
+                async with semaphore:
+                    return await self._aclassify_pack(texts, pack)
+            
+            pack_results = await asyncio.gather(*(classify_pack(pack) for pack in packs))
+            return self._finish_packed_batch(texts, cache_keys, cached, packs, pack_results)
+        
+        async def classify_one(text):
+            async with semaphore:
+                return await self._aclassify_email_llm(text)
+        
+        return list(await asyncio.gather(*(classify_one(text) for text in texts)))
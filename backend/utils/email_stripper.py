@@ -0,0 +1,149 @@
+"""
+Remoção de histórico citado, assinaturas e avisos legais de emails.
+
+Em threads longas, a mensagem nova é uma fração do texto: o resto é o
+histórico citado (linhas com ``>``, cabeçalhos "Em ... escreveu:" / "On ...
+wrote:", mensagens encaminhadas), a assinatura e avisos de confidencialidade.
+``strip_email`` remove essas partes antes da limpeza, para que spaCy e IA
+processem só o conteúdo novo. Rodapés de descadastro são mantidos: eles
+ajudam a identificar newsletters e promoções.
+"""
+
+import re
+
+# Início do histórico: tudo a partir do primeiro cabeçalho é descartado. O
+# cabeçalho ocupa a(s) linha(s) inteira(s) e só conta se vier seguido do
+# conteúdo citado (linhas com ">") ou de um bloco de cabeçalhos (De:/From:...).
+_QUOTE_FOLLOWS = r'[ \t]*\n(?:[ \t]*\n)*[ \t]*>'
+_HEADER_BLOCK_FOLLOWS = (r'[ \t]*\n(?:[ \t]*\n)*[ \t]*'
+                         r'(?:De|From|Para|To|Enviad[ao]|Sent|Data|Date|Assunto|Subject)[ \t]*:')
+REPLY_HEADER_RE = re.compile(
+    r'\n[ \t]*(?:'
+    # Gmail/Apple Mail; a linha pode quebrar antes do endereço
+    r'(?:(?:Em|On|Le|El)\b[^\n]{0,200}\b|(?:Em|On|Le|El)\b[^\n]{0,200}\n[^\n]{0,200}\b)'
+    r'(?:escreveu|wrote|a écrit|escribió)[ \t]*:(?=' + _QUOTE_FOLLOWS + r')'
+    r'|(?:-{2,}[ \t]*(?:Original Message|Mensagem original|Mensaje original)[ \t]*-{2,}'
+    r'|-{2,}[ \t]*(?:Forwarded message|Mensagem encaminhada|Mensaje reenviado)[ \t]*-{2,}'
+    r'|Begin forwarded message:|Início da mensagem encaminhada:)(?=' + _HEADER_BLOCK_FOLLOWS + r')'
+    # Outlook: bloco De:/From: seguido de Enviado/Sent/Data/Date
+    r'|(?:De|From)[ \t]*:[^\n]*\n[ \t]*(?:Enviad[ao](?:[ \t]+em)?|Sent|Data|Date)[ \t]*:'
+    r')',
+    re.IGNORECASE
+)
+
+# Linhas citadas que sobram no corpo (respostas intercaladas). Os padrões de
+# linha começam com '\n' literal (o texto recebe um '\n' no início), o que é
+# bem mais rápido que '^' com MULTILINE em textos longos.
+QUOTED_LINE_RE = re.compile(r'\n[ \t]*>[^\n]*')
+
+# Separador padrão de assinatura ("-- ") e assinaturas de aplicativos móveis
+SIGNATURE_DELIMITER_RE = re.compile(r'\n-- ?(?=\n|$)')
+MOBILE_SIGNATURE_RE = re.compile(
+    r'^[ \t]*(?:Enviado do meu|Enviado de meu|Sent from my|Get Outlook for|Obter o Outlook para)\b[^\n]*(?:\n|$)',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Despedida em linha própria; só vale se o que vem depois for nome, cargo ou contato
+SIGNOFF_RE = re.compile(
+    r'^[ \t]*(?:atenciosamente|att|atte|abraços|abraço|abs|cordialmente|saudações|grato|grata'
+    r'|(?:muito )?obrigad[oa]|best regards|kind regards|regards|best|thanks|thank you|cheers)'
+    r'[ \t]*[,.!]?[ \t]*$',
+    re.IGNORECASE | re.MULTILINE
+)
+# Linhas não vazias toleradas depois da despedida (acima disso não é assinatura)
+SIGNATURE_MAX_LINES = 6
+# Linhas de contato (email, site, telefone) e limite de palavras de nome ou cargo
+CONTACT_LINE_RE = re.compile(
+    r'@|https?://|www\.|(?:\d[\s().+-]*){8,}|^[ \t]*(?:tel|fone|telefone|cel|celular|phone|mobile|fax)\b',
+    re.IGNORECASE
+)
+SIGNATURE_LINE_MAX_WORDS = 6
+# Frase: '?' ou '!', ou fim com pontuação após palavra minúscula ("... até sexta.")
+SENTENCE_RE = re.compile(r'[?!]|(?:\b[a-zà-öø-ÿ]{3,}[.…]+|[:;…])[ \t]*$')
+# Linhas finais em que despedidas e assinaturas móveis são procuradas
+SIGNATURE_TAIL_LINES = 3 * SIGNATURE_MAX_LINES
+
+# Parágrafos de aviso legal e rodapés corporativos
+DISCLAIMER_RE = re.compile(
+    r'(?:esta (?:mensagem|comunicação)|este e-?mail|this (?:e-?mail|message|communication))'
+    r'[^\n]{0,200}(?:confidencial|confidential|privilegiad|privileged|destinatário|intended)'
+    r'|aviso (?:de confidencialidade|legal)|confidentiality notice'
+    r'|antes de imprimir|before printing',
+    re.IGNORECASE
+)
+PARAGRAPH_BREAK_RE = re.compile(r'(\n[ \t]*\n)')
+
+def _dropped(before, after):
+    """Bytes (UTF-8) removidos entre duas versões do texto; sem codificar se nada mudou."""
+    if len(before) == len(after):
+        return 0
+    return len(before.encode('utf-8')) - len(after.encode('utf-8'))
+
+def _strip_disclaimers(body):
+    """Remove os parágrafos finais que são avisos legais."""
+    # Com o grupo de captura, os separadores ficam nas posições ímpares
+    parts = PARAGRAPH_BREAK_RE.split(body)
+    keep = len(parts)
+    while keep > 1 and (not parts[keep - 1].strip() or DISCLAIMER_RE.search(parts[keep - 1])):
+        keep -= 2
+    return ''.join(parts[:keep])
+
+def _is_signature_line(line):
+    """Nome, cargo ou contato: linha curta ou de contato, sem conteúdo de frase."""
+    if CONTACT_LINE_RE.search(line):
+        return True
+    return len(line.split()) <= SIGNATURE_LINE_MAX_WORDS and not SENTENCE_RE.search(line)
+
+def _strip_signature(body):
+    """Corta a assinatura: separador "-- ", linha de aplicativo móvel ou despedida perto do fim."""
+    match = SIGNATURE_DELIMITER_RE.search('\n' + body)
+    if match is not None and body[:match.start()].strip():
+        return body[:match.start()]
+
+    # Despedidas e assinaturas móveis só interessam nas últimas linhas
+    lines = body.rsplit('\n', SIGNATURE_TAIL_LINES)
+    head = '\n'.join(lines[:-SIGNATURE_TAIL_LINES]) if len(lines) > SIGNATURE_TAIL_LINES else ''
+    tail = MOBILE_SIGNATURE_RE.sub('', '\n'.join(lines[-SIGNATURE_TAIL_LINES:]))
+    tail_offset = len(head) + 1 if head else 0
+    body = f'{head}\n{tail}' if head else tail
+
+    for match in reversed(list(SIGNOFF_RE.finditer(tail))):
+        trailing = [line for line in tail[match.end():].splitlines() if line.strip()]
+        if len(trailing) > SIGNATURE_MAX_LINES:
+            break
+        # "Obrigado!" seguido do pedido não é despedida
+        if not all(_is_signature_line(line) for line in trailing):
+            continue
+        if body[:tail_offset + match.start()].strip():
+            return body[:tail_offset + match.start()]
+    return body
+
+def strip_email(text):
+    """
+    Remove histórico citado, avisos legais e assinatura.
+
+    Retorna (texto restante, {parte: bytes removidos}). Se nada de conteúdo
+    sobrar (ex.: um encaminhamento sem comentário), o texto original é mantido.
+    """
+    original = text.rstrip()
+    dropped = {}
+
+    body = original
+    match = REPLY_HEADER_RE.search('\n' + body)
+    if match is not None:
+        body = body[:match.start()]
+    if '>' in body:
+        body = QUOTED_LINE_RE.sub('', '\n' + body)
+        body = body[1:] if body.startswith('\n') else body
+    body = body.rstrip()
+    dropped['quote'] = _dropped(original, body)
+
+    stripped = _strip_disclaimers(body).rstrip()
+    dropped['disclaimer'] = _dropped(body, stripped)
+
+    body = _strip_signature(stripped).rstrip()
+    dropped['signature'] = _dropped(stripped, body)
+
+    if not body.strip():
+        return text, {}
+    return body, {part: count for part, count in dropped.items() if count}
@@ -0,0 +1,400 @@
+"""
+Fila de jobs assíncronos para uploads grandes, sem serviços externos.
+
+O arquivo enviado é gravado em uma pasta local e o job em um banco SQLite
+(modo WAL) compartilhado pelos workers do gunicorn na mesma máquina. Cada
+processo roda ``max_workers`` threads que retiram jobs da fila, executam o
+``handler`` (extração, análise e classificação) e gravam o resultado, que o
+cliente consulta em /api/jobs/<id>.
+
+Cada job em execução guarda o PID do processo dono e um heartbeat. Só jobs
+cujo dono morreu (ou parou de atualizar o heartbeat) voltam para a fila:
+um job lento nunca é executado duas vezes ao mesmo tempo.
+"""
+
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional
+
+from .metrics import record_job
+from .resilience import Deadline, DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed')
+
+class JobQueueFull(Exception):
+    """A fila já tem o número máximo de jobs pendentes."""
+
+class JobQueue:
+    """
+    Fila de jobs persistida em SQLite, com payloads em ``spool_dir``.
+
+    ``handler(path, filename, options, deadline)`` processa um job e retorna o
+    resultado (serializável em JSON); ``deadline`` (Deadline de ``job_timeout``
+    segundos) limita a extração e é conferido entre as etapas, levantando
+    DeadlineExceeded, para que a thread fique livre logo após o prazo.
+    ``max_pending`` limita os jobs na fila ou em execução (todos os
+    processos); jobs concluídos são removidos após ``ttl_seconds``. Jobs de um
+    worker encerrado no meio voltam para a fila até ``max_attempts``
+    tentativas; jobs em execução há mais de ``job_timeout`` são marcados como
+    falhos e o resultado tardio é descartado.
+
+    As threads são iniciadas por ``start()`` em cada processo, depois do fork
+    (hook ``post_fork`` do gunicorn ou evento de startup do ASGI); ``submit`` e
+    ``get`` as iniciam se isso ainda não ocorreu.
+    """
+
+    # Intervalo (s) entre limpezas de jobs expirados e abandonados
+    PURGE_INTERVAL = 60
+    # Intervalo (s) entre heartbeats dos jobs em execução e prazo sem heartbeat para o dono ser dado como morto
+    HEARTBEAT_INTERVAL = 10
+    HEARTBEAT_TIMEOUT = 60
+
+    def __init__(self, db_path, spool_dir, handler, max_workers=2, max_pending=100, ttl_seconds=3600,
+                 job_timeout=600, max_attempts=2, poll_interval=0.5):
+        self.db_path = db_path
+        self.spool_dir = spool_dir
+        self.handler = handler
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(1, int(max_pending))
+        self.ttl_seconds = float(ttl_seconds)
+        self.job_timeout = float(job_timeout)
+        self.max_attempts = max(1, int(max_attempts))
+        self.poll_interval = float(poll_interval)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._workers_pid = None
+        self._last_purge = 0.0
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._init_db()
+
+    def _connection(self):
+        """Retorna a conexão SQLite da thread atual (recriada após fork)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=10.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_db(self):
+        """Cria a tabela de jobs se necessário."""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            ' id TEXT PRIMARY KEY,'
+            ' status TEXT NOT NULL,'
+            ' filename TEXT NOT NULL,'
+            ' path TEXT,'
+            ' options TEXT NOT NULL,'
+            ' result TEXT,'
+            ' error TEXT,'
+            ' attempts INTEGER NOT NULL DEFAULT 0,'
+            ' created_at REAL NOT NULL,'
+            ' started_at REAL,'
+            ' finished_at REAL,'
+            ' owner_pid INTEGER,'
+            ' heartbeat_at REAL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)')
+
+        # Bancos criados antes do heartbeat
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(jobs)')}
+        for column, column_type in (('owner_pid', 'INTEGER'), ('heartbeat_at', 'REAL')):
+            if column not in columns:
+                conn.execute(f'ALTER TABLE jobs ADD COLUMN {column} {column_type}')
+
+    def start(self):
+        """Inicia as threads de execução e de heartbeat deste processo (uma vez por processo)."""
+        if self._workers_pid == os.getpid():
+            return
+        with self._lock:
+            if self._workers_pid == os.getpid():
+                return
+            self._wakeup = threading.Event()
+            for number in range(self.max_workers):
+                threading.Thread(target=self._work, name=f'job-worker-{number}', daemon=True).start()
+            threading.Thread(target=self._heartbeat, name='job-heartbeat', daemon=True).start()
+            self._workers_pid = os.getpid()
+
+    def submit(self, stream, filename, options=None) -> Dict[str, Any]:
+        """
+        Grava o payload e enfileira um job.
+
+        Levanta JobQueueFull se já houver ``max_pending`` jobs pendentes.
+        """
+        self.start()
+        job_id = uuid.uuid4().hex
+        extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else 'bin'
+        path = os.path.join(self.spool_dir, f'{job_id}.{extension}')
+
+        stream.seek(0)
+        with open(path, 'wb') as file:
+            shutil.copyfileobj(stream, file)
+
+        now = time.time()
+        conn = self._connection()
+        try:
+            # BEGIN IMMEDIATE: a contagem e a inserção não se intercalam com outros processos
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                pending = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+                ).fetchone()[0]
+                if pending >= self.max_pending:
+                    raise JobQueueFull(f'A fila de jobs está cheia ({self.max_pending} pendentes).')
+                conn.execute(
+                    'INSERT INTO jobs (id, status, filename, path, options, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                    (job_id, 'queued', filename, path, json.dumps(options or {}), now)
+                )
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        except JobQueueFull:
+            self._remove_file(path)
+            record_job('rejected')
+            raise
+        except BaseException:
+            self._remove_file(path)
+            raise
+
+        record_job('queued')
+        self._wakeup.set()
+        return {'id': job_id, 'status': 'queued', 'created_at': now}
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Estado do job (e resultado ou erro, se concluído), ou None se não existir."""
+        self.start()
+        row = self._connection().execute(
+            'SELECT id, status, filename, result, error, attempts, created_at, started_at, finished_at'
+            ' FROM jobs WHERE id = ?',
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        job = {
+            'id': row[0],
+            'status': row[1],
+            'filename': row[2],
+            'attempts': row[5],
+            'created_at': row[6],
+            'started_at': row[7],
+            'finished_at': row[8]
+        }
+        if row[1] == 'done':
+            job['result'] = json.loads(row[3])
+        elif row[1] == 'failed':
+            job['error'] = row[4]
+        elif row[1] == 'queued':
+            job['position'] = self._connection().execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at <= ?", (row[6],)
+            ).fetchone()[0]
+        return job
+
+    def _claim(self):
+        """
+        Retira o job mais antigo da fila, marcando-o como em execução por este
+        processo. Retorna (id, filename, path, options, tentativa) ou None.
+        """
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                "SELECT id, filename, path, options, attempts FROM jobs WHERE status = 'queued'"
+                " ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                now = time.time()
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, heartbeat_at = ?, owner_pid = ?,"
+                    " attempts = attempts + 1 WHERE id = ?",
+                    (now, now, os.getpid(), row[0])
+                )
+                row = row[:4] + (row[4] + 1,)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return row
+
+    def _finish(self, job_id, attempt, path, result=None, error=None):
+        """
+        Grava o resultado (ou o erro) e remove o payload. Retorna False, sem
+        gravar, se o job deixou de pertencer a esta tentativa (tempo limite).
+        """
+        status = 'failed' if error is not None else 'done'
+        updated = self._connection().execute(
+            'UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, path = NULL'
+            " WHERE id = ? AND status = 'running' AND owner_pid = ? AND attempts = ?",
+            (status, json.dumps(result, ensure_ascii=False) if result is not None else None, error,
+             time.time(), job_id, os.getpid(), attempt)
+        ).rowcount
+        if not updated:
+            return False
+        self._remove_file(path)
+        record_job(status)
+        return True
+
+    def _heartbeat(self):
+        """Laço da thread de heartbeat: marca os jobs deste processo como vivos."""
+        while True:
+            time.sleep(self.HEARTBEAT_INTERVAL)
+            try:
+                self._connection().execute(
+                    "UPDATE jobs SET heartbeat_at = ? WHERE status = 'running' AND owner_pid = ?",
+                    (time.time(), os.getpid())
+                )
+            except sqlite3.Error as e:
+                logger.error(f"Erro ao atualizar o heartbeat dos jobs: {str(e)}")
+
+    def _work(self):
+        """Laço das threads: processa jobs até a fila esvaziar e espera o próximo."""
+        while True:
+            try:
+                self._maybe_purge()
+                job = self._claim()
+            except sqlite3.Error as e:
+                logger.error(f"Erro ao ler a fila de jobs: {str(e)}")
+                job = None
+
+            if job is None:
+                # Jobs enviados a outros processos são vistos no próximo ciclo
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            job_id, filename, path, options, attempt = job
+            started = time.perf_counter()
+            try:
+                result = self.handler(path, filename, json.loads(options), Deadline(self.job_timeout))
+            except DeadlineExceeded:
+                logger.error(f"Job {job_id} interrompido: tempo limite de {self.job_timeout}s excedido.")
+                result, error = None, 'Tempo limite do job excedido.'
+            except Exception as e:
+                logger.error(f"Erro no job {job_id}: {str(e)}")
+                result, error = None, f'Erro no processamento: {str(e)}'
+            else:
+                error = None
+
+            try:
+                if self._finish(job_id, attempt, path, result=result, error=error):
+                    logger.info(f"Job {job_id} concluído em {time.perf_counter() - started:.2f}s "
+                                f"({'falhou' if error else 'ok'})")
+                else:
+                    logger.warning(f"Job {job_id} excedeu o tempo limite; resultado descartado.")
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                logger.error(f"Erro ao gravar o resultado do job {job_id}: {str(e)}")
+
+    def _maybe_purge(self):
+        with self._lock:
+            now = time.time()
+            if now - self._last_purge < self.PURGE_INTERVAL:
+                return
+            self._last_purge = now
+        self.purge()
+
+    @staticmethod
+    def _process_alive(pid):
+        """Se o processo ``pid`` existe nesta máquina."""
+        if not pid:
+            return False
+        if os.name == 'nt':
+            # os.kill(pid, 0) encerraria o processo no Windows: só o heartbeat vale
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            # PermissionError: o processo existe, mas é de outro usuário
+            return True
+        return True
+
+    def purge(self):
+        """
+        Remove jobs concluídos expirados. Jobs em execução cujo dono morreu (ou
+        está sem heartbeat) voltam para a fila (ou falham, esgotadas as
+        tentativas); os que passaram de ``job_timeout`` com o dono vivo falham.
+        """
+        now = time.time()
+        conn = self._connection()
+
+        running = conn.execute(
+            "SELECT id, path, attempts, owner_pid, started_at, heartbeat_at FROM jobs WHERE status = 'running'"
+        ).fetchall()
+        for job_id, path, attempts, owner_pid, started_at, heartbeat_at in running:
+            owner_alive = ((heartbeat_at or 0) >= now - self.HEARTBEAT_TIMEOUT
+                           and self._process_alive(owner_pid))
+            if owner_alive:
+                if (started_at or now) >= now - self.job_timeout:
+                    continue
+                error = 'Tempo limite do job excedido.'
+            elif attempts < self.max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', started_at = NULL, owner_pid = NULL, heartbeat_at = NULL"
+                    " WHERE id = ? AND status = 'running' AND attempts = ?",
+                    (job_id, attempts)
+                )
+                logger.warning(f"Job {job_id} abandonado pelo processo {owner_pid}; de volta à fila.")
+                continue
+            else:
+                error = 'O processamento do job foi interrompido.'
+
+            updated = conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, path = NULL"
+                " WHERE id = ? AND status = 'running' AND attempts = ?",
+                (error, now, job_id, attempts)
+            ).rowcount
+            if updated:
+                self._remove_file(path)
+                record_job('failed')
+
+        conn.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+            (now - self.ttl_seconds,)
+        )
+
+    @staticmethod
+    def _remove_file(path):
+        if not path:
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Erro ao remover payload do job: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Jobs por estado (todos os processos) e limites da fila."""
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        try:
+            for status, count in self._connection().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status'):
+                counts[status] = count
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao ler a fila de jobs: {str(e)}")
+        return {
+            **counts,
+            'max_pending': self.max_pending,
+            'workers': self.max_workers,
+            'workers_started': self._workers_pid == os.getpid(),
+            'pid': os.getpid()
+        }
@@ -0,0 +1,198 @@
+"""
+Pontuação por palavras-chave com um autômato compilado (Aho-Corasick).
+"""
+
+import bisect
+import logging
+from typing import Dict, Any, List
+
+# Importação opcional do pyahocorasick
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+# Importação opcional do NumPy (contagem vetorizada de maiúsculas e palavras)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Flags da tabela de caracteres do plano multilíngue básico
+_UPPER = 1
+_SPACE = 2
+_BMP_SIZE = 0x10000
+_char_table = None
+
+def _get_char_table():
+    """Retorna (criando na primeira chamada) a tabela de flags por code point do BMP."""
+    global _char_table
+    if _char_table is None:
+        table = np.zeros(_BMP_SIZE, dtype=np.uint8)
+        for code in range(_BMP_SIZE):
+            char = chr(code)
+            if char.isupper():
+                table[code] = _UPPER
+            elif char.isspace():
+                table[code] = _SPACE
+        _char_table = table
+    return _char_table
+
+class KeywordScorer:
+    """
+    Extrai as features da classificação local com uma única varredura do texto.
+
+    Todas as palavras-chave são compiladas em um autômato Aho-Corasick, que
+    encontra todas as ocorrências (inclusive sobrepostas) em uma passada, com a
+    mesma semântica de substring do teste ``keyword in text.lower()``. A
+    proporção de maiúsculas e a contagem de palavras saem de uma única consulta
+    vetorizada a uma tabela de flags por caractere.
+
+    Sem pyahocorasick ou NumPy instalados, usa as operações de string padrão.
+    """
+
+    # Separador de lote: é espaço em branco e não aparece em nenhuma palavra-chave
+    BATCH_SEPARATOR = '\n'
+
+    # Tamanho máximo (em caracteres) de cada bloco concatenado no modo em lote
+    BATCH_CHUNK_CHARS = 16384
+
+    def __init__(self, productive_keywords: List[str], unproductive_keywords: List[str]):
+        """Compila o autômato para as duas listas de palavras-chave."""
+        self.productive_keywords = [keyword.lower() for keyword in productive_keywords]
+        self.unproductive_keywords = [keyword.lower() for keyword in unproductive_keywords]
+
+        self._productive = frozenset(self.productive_keywords)
+        self._unproductive = frozenset(self.unproductive_keywords)
+        self._keywords = tuple(self._productive | self._unproductive)
+
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE and all(self.BATCH_SEPARATOR not in keyword for keyword in self._keywords):
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self._keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+        else:
+            logger.info("pyahocorasick não disponível. Usando busca de palavras-chave por substring.")
+
+    def _find_keywords(self, text_lower: str) -> frozenset:
+        """Retorna o conjunto de palavras-chave presentes no texto."""
+        if self._automaton is not None:
+            return frozenset(keyword for _, keyword in self._automaton.iter(text_lower))
+        return frozenset(keyword for keyword in self._keywords if keyword in text_lower)
+
+    def _find_keywords_many(self, lowered: List[str]) -> List[set]:
+        """Busca palavras-chave em um lote inteiro com uma única varredura do autômato."""
+        if self._automaton is None:
+            return [set(self._find_keywords(text)) for text in lowered]
+
+        # Posição final (exclusiva) de cada texto na string concatenada
+        ends = []
+        position = -1
+        for text in lowered:
+            position += len(text) + 1
+            ends.append(position)
+
+        found = [set() for _ in lowered]
+        joined = self.BATCH_SEPARATOR.join(lowered)
+        for end_index, keyword in self._automaton.iter(joined):
+            found[bisect.bisect_right(ends, end_index)].add(keyword)
+        return found
+
+    @staticmethod
+    def _char_counts(text: str):
+        """Retorna (maiúsculas, palavras) com a semântica de str.isupper e str.split."""
+        if NUMPY_AVAILABLE and text:
+            codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+            if int(codes.max()) < _BMP_SIZE:
+                flags = _get_char_table()[codes]
+                non_space = (flags & _SPACE) == 0
+                words = int(non_space[0]) + int(np.count_nonzero(non_space[1:] & ~non_space[:-1]))
+                return int(np.count_nonzero(flags & _UPPER)), words
+        return sum(map(str.isupper, text)), len(text.split())
+
+    def _build_features(self, text: str, found, upper_count: int, word_count: int) -> Dict[str, Any]:
+        return {
+            'productive_score': len(self._productive.intersection(found)),
+            'unproductive_score': len(self._unproductive.intersection(found)),
+            'links_count': text.count('http') + text.count('www.'),
+            'caps_ratio': upper_count / len(text) if text else 0,
+            'word_count': word_count
+        }
+
+    def features(self, text: str) -> Dict[str, Any]:
+        """Retorna as features de um texto: pontuações, links, proporção de maiúsculas e palavras."""
+        found = self._find_keywords(text.lower())
+        upper_count, word_count = self._char_counts(text)
+        return self._build_features(text, found, upper_count, word_count)
+
+    def features_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Extrai as features de uma lista de textos em chamadas vetorizadas.
+
+        Textos curtos são agrupados em blocos de até ``BATCH_CHUNK_CHARS``
+        caracteres, concatenados com um separador de espaço em branco e varridos
+        uma vez pelo autômato e pela tabela de caracteres; as contagens de cada
+        texto saem de somas acumuladas sobre os limites de cada item.
+        """
+        results = []
+        chunk = []
+        chunk_chars = 0
+
+        for text in texts:
+            if chunk and chunk_chars + len(text) > self.BATCH_CHUNK_CHARS:
+                results.extend(self._features_chunk(chunk))
+                chunk = []
+                chunk_chars = 0
+            chunk.append(text)
+            chunk_chars += len(text) + 1
+
+        if chunk:
+            results.extend(self._features_chunk(chunk))
+        return results
+
+    def _features_chunk(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Extrai as features de um bloco de textos concatenados."""
+        if len(texts) == 1:
+            return [self.features(texts[0])]
+
+        found = self._find_keywords_many([text.lower() for text in texts])
+
+        joined = self.BATCH_SEPARATOR.join(texts)
+        codes = None
+        if NUMPY_AVAILABLE and joined:
+            codes = np.frombuffer(joined.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+            if int(codes.max()) >= _BMP_SIZE:
+                codes = None
+
+        if codes is None:
+            counts = [self._char_counts(text) for text in texts]
+        else:
+            flags = _get_char_table()[codes]
+            non_space = (flags & _SPACE) == 0
+            word_starts = non_space.copy()
+            word_starts[1:] &= ~non_space[:-1]
+
+            upper_cumsum = np.concatenate(([0], np.cumsum(flags & _UPPER, dtype=np.int32)))
+            words_cumsum = np.concatenate(([0], np.cumsum(word_starts, dtype=np.int32)))
+
+            counts = []
+            start = 0
+            for text in texts:
+                end = start + len(text)
+                counts.append((
+                    int(upper_cumsum[end] - upper_cumsum[start]),
+                    int(words_cumsum[end] - words_cumsum[start])
+                ))
+                start = end + 1
+
+        return [
+            self._build_features(text, text_found, upper_count, word_count)
+            for text, text_found, (upper_count, word_count) in zip(texts, found, counts)
+        ]
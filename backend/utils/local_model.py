@@ -0,0 +1,237 @@
+"""
+Classificador estatístico local (features hasheadas + regressão logística em NumPy).
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import zlib
+from datetime import datetime
+from typing import Dict, Any, List, Sequence, Tuple
+
+# Importação opcional do NumPy
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Versão do formato do artefato salvo em disco
+MODEL_FORMAT_VERSION = 1
+
+LABELS = ('Improdutivo', 'Produtivo')
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+def normalize_label(label: str):
+    """Normaliza o rótulo de treino para 'Produtivo' ou 'Improdutivo' (None se inválido)."""
+    label = str(label).strip().lower()
+    if label in ('produtivo', 'productive', '1'):
+        return 'Produtivo'
+    if label in ('improdutivo', 'unproductive', '0'):
+        return 'Improdutivo'
+    return None
+
+class HashingFeaturizer:
+    """
+    Converte textos em vetores esparsos via hashing de unigramas e bigramas.
+
+    Usa crc32 (estável entre processos, ao contrário de ``hash()``), sinal
+    derivado de um bit do hash, frequência sublinear e normalização L2.
+    """
+
+    def __init__(self, n_features=2 ** 18, ngram_max=2):
+        """Inicializa o featurizer."""
+        self.n_features = int(n_features)
+        self.ngram_max = int(ngram_max)
+
+    def _hashed_terms(self, text: str) -> Dict[int, float]:
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        counts = {}
+        for n in range(1, self.ngram_max + 1):
+            for i in range(len(tokens) - n + 1):
+                term = ' '.join(tokens[i:i + n])
+                hashed = zlib.crc32(term.encode('utf-8'))
+                index = hashed % self.n_features
+                sign = 1.0 if hashed & 0x80000000 else -1.0
+                counts[index] = counts.get(index, 0.0) + sign
+        return counts
+
+    def transform(self, texts: Sequence[str]) -> Tuple[Any, Any, Any]:
+        """Retorna a matriz esparsa no formato (row_ids, indices, values)."""
+        row_ids = []
+        indices = []
+        values = []
+
+        for row, text in enumerate(texts):
+            terms = [(index, count) for index, count in self._hashed_terms(text).items() if count]
+            if not terms:
+                continue
+            weights = [math.copysign(1.0 + math.log(abs(count)), count) for _, count in terms]
+            norm = math.sqrt(sum(weight * weight for weight in weights))
+            for (index, _), weight in zip(terms, weights):
+                row_ids.append(row)
+                indices.append(index)
+                values.append(weight / norm)
+
+        return (
+            np.asarray(row_ids, dtype=np.int64),
+            np.asarray(indices, dtype=np.int64),
+            np.asarray(values, dtype=np.float32)
+        )
+
+class LocalModel:
+    """
+    Regressão logística linear sobre features hasheadas, com inferência em NumPy puro.
+
+    Os pesos ficam em um arquivo ``.npy`` (float32, bias na última posição) que
+    é carregado com ``mmap_mode='r'``: os workers abrem o modelo quase
+    instantaneamente e compartilham as páginas do arquivo via page cache.
+    Os metadados ficam em um arquivo ``.json`` ao lado dos pesos.
+    """
+
+    def __init__(self, weights, n_features=2 ** 18, ngram_max=2, metadata=None):
+        """Inicializa o modelo a partir de um vetor de pesos (n_features + 1)."""
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy é necessário para o classificador estatístico local.")
+        self.weights = weights
+        self.featurizer = HashingFeaturizer(n_features=n_features, ngram_max=ngram_max)
+        self.metadata = metadata or {}
+
+    @staticmethod
+    def metadata_path(path: str) -> str:
+        """Caminho do arquivo de metadados associado aos pesos."""
+        return os.path.splitext(path)[0] + '.json'
+
+    @classmethod
+    def load(cls, path: str) -> 'LocalModel':
+        """Carrega o modelo mapeando os pesos em memória (somente leitura)."""
+        with open(cls.metadata_path(path), 'r', encoding='utf-8') as file:
+            metadata = json.load(file)
+
+        if metadata.get('format_version') != MODEL_FORMAT_VERSION:
+            raise ValueError(f"Versão de formato do modelo não suportada: {metadata.get('format_version')}")
+
+        weights = np.load(path, mmap_mode='r')
+        if weights.shape != (metadata['n_features'] + 1,):
+            raise ValueError("Dimensão dos pesos não corresponde aos metadados do modelo.")
+
+        return cls(weights, n_features=metadata['n_features'], ngram_max=metadata['ngram_max'], metadata=metadata)
+
+    def save(self, path: str):
+        """Salva os pesos (.npy) e os metadados (.json)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        np.save(path, np.asarray(self.weights, dtype=np.float32))
+
+        metadata = dict(self.metadata)
+        metadata.update({
+            'format_version': MODEL_FORMAT_VERSION,
+            'n_features': self.featurizer.n_features,
+            'ngram_max': self.featurizer.ngram_max,
+            'labels': list(LABELS)
+        })
+        with open(self.metadata_path(path), 'w', encoding='utf-8') as file:
+            json.dump(metadata, file, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def _sigmoid(scores):
+        return 1.0 / (1.0 + np.exp(-np.clip(scores, -30.0, 30.0)))
+
+    def _scores(self, row_ids, indices, values, n_rows):
+        n_features = self.featurizer.n_features
+        contributions = np.asarray(self.weights[indices], dtype=np.float32) * values
+        return np.bincount(row_ids, weights=contributions, minlength=n_rows) + float(self.weights[n_features])
+
+    def predict_proba(self, texts: Sequence[str]):
+        """Retorna a probabilidade de cada texto ser 'Produtivo' (array NumPy)."""
+        texts = list(texts)
+        if not texts:
+            return np.zeros(0, dtype=np.float64)
+        row_ids, indices, values = self.featurizer.transform(texts)
+        return self._sigmoid(self._scores(row_ids, indices, values, len(texts)))
+
+    def classify_many(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """Classifica uma lista de textos em uma única chamada vetorizada."""
+        results = []
+        for probability in self.predict_proba(texts):
+            probability = float(probability)
+            if probability >= 0.5:
+                category, confidence = 'Produtivo', probability
+            else:
+                category, confidence = 'Improdutivo', 1.0 - probability
+            results.append({
+                'category': category,
+                'confidence': confidence,
+                'method': 'local_model',
+                'productive_probability': round(probability, 4)
+            })
+        return results
+
+    @classmethod
+    def train(cls, texts: Sequence[str], labels: Sequence[str], n_features=2 ** 18, ngram_max=2,
+              epochs=30, learning_rate=0.5, l2=1e-5, batch_size=256, seed=42) -> 'LocalModel':
+        """
+        Treina a regressão logística com mini-batch SGD (AdaGrad) em NumPy.
+
+        ``labels`` deve conter 'Produtivo' ou 'Improdutivo' para cada texto.
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy é necessário para treinar o classificador estatístico local.")
+
+        featurizer = HashingFeaturizer(n_features=n_features, ngram_max=ngram_max)
+        targets = np.asarray([1.0 if label == 'Produtivo' else 0.0 for label in labels], dtype=np.float64)
+        n_rows = len(targets)
+
+        row_ids, indices, values = featurizer.transform(texts)
+
+        # Índices das entradas esparsas de cada linha, para montar os mini-batches
+        order = np.argsort(row_ids, kind='stable')
+        row_ids, indices, values = row_ids[order], indices[order], values[order]
+        row_starts = np.searchsorted(row_ids, np.arange(n_rows + 1))
+
+        weights = np.zeros(n_features + 1, dtype=np.float64)
+        grad_squares = np.full(n_features + 1, 1e-8, dtype=np.float64)
+        rng = np.random.default_rng(seed)
+
+        model = cls(weights, n_features=n_features, ngram_max=ngram_max)
+
+        for epoch in range(epochs):
+            permutation = rng.permutation(n_rows)
+            for batch_start in range(0, n_rows, batch_size):
+                batch_rows = permutation[batch_start:batch_start + batch_size]
+                positions = np.concatenate(
+                    [np.arange(row_starts[row], row_starts[row + 1]) for row in batch_rows]
+                ) if len(batch_rows) else np.zeros(0, dtype=np.int64)
+
+                local_rows = np.repeat(np.arange(len(batch_rows)), row_starts[batch_rows + 1] - row_starts[batch_rows])
+                batch_indices = indices[positions]
+                batch_values = values[positions]
+
+                scores = model._scores(local_rows, batch_indices, batch_values, len(batch_rows))
+                errors = model._sigmoid(scores) - targets[batch_rows]
+
+                gradient = np.zeros(n_features + 1, dtype=np.float64)
+                np.add.at(gradient, batch_indices, batch_values * errors[local_rows])
+                gradient[:n_features] /= len(batch_rows)
+                gradient[:n_features] += l2 * weights[:n_features]
+                gradient[n_features] = errors.mean()
+
+                touched = np.unique(np.append(batch_indices, n_features))
+                grad_squares[touched] += gradient[touched] ** 2
+                weights[touched] -= learning_rate * gradient[touched] / np.sqrt(grad_squares[touched])
+
+        model.weights = weights.astype(np.float32)
+        model.metadata = {
+            'trained_at': datetime.now().isoformat(),
+            'training_examples': int(n_rows),
+            'epochs': int(epochs)
+        }
+        return model
@@ -0,0 +1,173 @@
+"""
+Leitura de exportações de caixas de email: arquivos mbox, diretórios de .eml e Maildir.
+
+As mensagens são lidas sob demanda, uma por vez, como bytes; a interpretação
+MIME (corpo em texto ou HTML e anexos .txt/.pdf) fica em ``parse_message``,
+que pode rodar em outro processo.
+"""
+
+import email
+import html
+import io
+import logging
+import mailbox
+import os
+import re
+from email import policy
+
+logger = logging.getLogger(__name__)
+
+MAILBOX_FORMATS = ('mbox', 'maildir', 'eml')
+
+# Conversão simples de HTML para texto: blocos invisíveis, quebras e tags
+HTML_HIDDEN_RE = re.compile(r'<(script|style|head)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+HTML_BREAK_RE = re.compile(r'<(?:br|/p|/div|/tr|/li|/h\d)\b[^>]*>', re.IGNORECASE)
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# Extensões de anexos cujo texto é extraído
+ATTACHMENT_EXTENSIONS = ('txt', 'pdf')
+
+def detect_format(path):
+    """Identifica o formato pela estrutura: Maildir (cur/new/tmp), diretório de .eml ou mbox."""
+    if os.path.isdir(path):
+        if all(os.path.isdir(os.path.join(path, folder)) for folder in ('cur', 'new', 'tmp')):
+            return 'maildir'
+        return 'eml'
+    if path.lower().endswith('.eml'):
+        return 'eml'
+    return 'mbox'
+
+def _iter_eml_files(root):
+    """Arquivos .eml sob ``root`` em ordem alfabética (percurso em profundidade)."""
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for name in sorted(files):
+            if name.lower().endswith('.eml'):
+                yield os.path.join(directory, name)
+
+def iter_messages(path, mailbox_format=None, start=0):
+    """
+    Gera (chave, bytes) para cada mensagem de ``path``, sem carregar a caixa inteira.
+
+    A ordem é determinística (ordem do arquivo no mbox, nomes ordenados no
+    Maildir e nos diretórios de .eml), o que permite retomar a partir da
+    posição ``start``: as mensagens anteriores não são lidas.
+    """
+    mailbox_format = mailbox_format or detect_format(path)
+    if mailbox_format not in MAILBOX_FORMATS:
+        raise ValueError(f"Formato de caixa desconhecido: {mailbox_format}")
+
+    if mailbox_format == 'mbox':
+        box = mailbox.mbox(path, create=False)
+        try:
+            for index, key in enumerate(box.iterkeys()):
+                if index >= start:
+                    yield str(index), box.get_bytes(key)
+        finally:
+            box.close()
+
+    elif mailbox_format == 'maildir':
+        box = mailbox.Maildir(path, factory=None, create=False)
+        for index, key in enumerate(sorted(box.iterkeys())):
+            if index >= start:
+                yield key, box.get_bytes(key)
+
+    elif os.path.isfile(path):
+        if start == 0:
+            with open(path, 'rb') as file:
+                yield os.path.basename(path), file.read()
+
+    else:
+        for index, file_path in enumerate(_iter_eml_files(path)):
+            if index >= start:
+                with open(file_path, 'rb') as file:
+                    yield os.path.relpath(file_path, path), file.read()
+
+def html_to_text(markup):
+    """Converte HTML em texto simples (sem scripts, estilos nem tags)."""
+    markup = HTML_HIDDEN_RE.sub(' ', markup)
+    markup = HTML_BREAK_RE.sub('\n', markup)
+    return html.unescape(HTML_TAG_RE.sub(' ', markup))
+
+def _part_text(part):
+    """Conteúdo textual de uma parte MIME, tolerando charsets inválidos."""
+    try:
+        return part.get_content()
+    except (LookupError, UnicodeError, AssertionError):
+        payload = part.get_payload(decode=True) or b''
+        return payload.decode('utf-8', errors='replace')
+
+def _header(message, name):
+    try:
+        value = message.get(name)
+    except Exception:
+        return ''
+    return str(value).strip() if value is not None else ''
+
+def _attachment(part, filename, text_processor, max_attachment_bytes):
+    """Metadados do anexo e, para .txt/.pdf, o texto extraído."""
+    payload = part.get_payload(decode=True) or b''
+    info = {'filename': filename, 'content_type': part.get_content_type(), 'size': len(payload), 'text': ''}
+
+    extension = filename.rsplit('.', 1)[-1].lower() if filename and '.' in filename else ''
+    if text_processor is None or extension not in ATTACHMENT_EXTENSIONS:
+        return info
+    if len(payload) > max_attachment_bytes:
+        logger.warning(f"Anexo {filename} ignorado: {len(payload)} bytes excede o limite.")
+        return info
+
+    try:
+        info['text'] = text_processor.extract_text_from_upload(io.BytesIO(payload), filename)
+    except Exception as e:
+        logger.error(f"Erro ao extrair texto do anexo {filename}: {str(e)}")
+    return info
+
+def parse_message(raw, text_processor=None, max_attachment_bytes=10 * 1024 * 1024):
+    """
+    Interpreta uma mensagem MIME.
+
+    Retorna cabeçalhos, o corpo em texto (text/plain ou, na falta dele, o HTML
+    convertido) e os anexos; com ``text_processor``, o texto dos anexos .txt e
+    .pdf é extraído e o histórico citado e a assinatura são removidos do corpo
+    (``stripped_bytes``). ``text`` junta assunto, corpo e anexos para a classificação.
+    """
+    message = email.message_from_bytes(raw, policy=policy.default)
+
+    plain_parts, html_parts, attachments = [], [], []
+    for part in message.walk():
+        if part.is_multipart():
+            continue
+        filename = part.get_filename()
+        if filename or part.get_content_disposition() == 'attachment':
+            attachments.append(_attachment(part, filename or '', text_processor, max_attachment_bytes))
+        elif part.get_content_type() == 'text/plain':
+            plain_parts.append(_part_text(part))
+        elif part.get_content_type() == 'text/html':
+            html_parts.append(_part_text(part))
+
+    body = '\n'.join(plain_parts) if plain_parts else html_to_text('\n'.join(html_parts))
+    stripped_bytes = 0
+    if text_processor is not None:
+        # Só o corpo: o histórico citado não pode levar junto o texto dos anexos
+        body, stripped_bytes = text_processor.strip_boilerplate(body)
+    subject = _header(message, 'subject')
+    attachment_text = '\n'.join(attachment['text'] for attachment in attachments if attachment['text'])
+
+    return {
+        'message_id': _header(message, 'message-id'),
+        'subject': subject,
+        'from': _header(message, 'from'),
+        'date': _header(message, 'date'),
+        'body': body,
+        'stripped_bytes': stripped_bytes,
+        'attachments': [
+            {
+                'filename': attachment['filename'],
+                'content_type': attachment['content_type'],
+                'size': attachment['size'],
+                'text_chars': len(attachment['text'])
+            }
+            for attachment in attachments
+        ],
+        'text': '\n\n'.join(part for part in (subject, body.strip(), attachment_text) if part)
+    }
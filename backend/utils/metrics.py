@@ -0,0 +1,146 @@
+"""
+Métricas da aplicação no formato Prometheus.
+
+Latência por etapa do pipeline, tokens da OpenAI, fallbacks para a
+classificação local, contagem por método, bytes removidos na limpeza e jobs assíncronos. Com a variável de ambiente
+PROMETHEUS_MULTIPROC_DIR definida (o gunicorn.conf.py define automaticamente),
+os valores de todos os workers são agregados em /api/metrics.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+# Importação opcional do prometheus_client
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess, REGISTRY
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Buckets de 0,5 ms a 30 s: cobrem desde clean_text até chamadas lentas à OpenAI
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+if PROMETHEUS_AVAILABLE:
+    STAGE_SECONDS = Histogram(
+        'email_classifier_stage_seconds', 'Latência de cada etapa do pipeline', ['stage'], buckets=STAGE_BUCKETS
+    )
+    OPENAI_TOKENS = Counter(
+        'email_classifier_openai_tokens_total', 'Tokens consumidos na API da OpenAI', ['type']
+    )
+    OPENAI_REQUESTS = Counter(
+        'email_classifier_openai_requests_total', 'Chamadas à API da OpenAI por resultado', ['outcome']
+    )
+    OPENAI_EXTRA_CALLS = Counter(
+        'email_classifier_openai_extra_calls_total', 'Novas tentativas e hedges enviados à OpenAI', ['kind']
+    )
+    FALLBACKS = Counter(
+        'email_classifier_local_fallbacks_total', 'Classificações que caíram no classificador local', ['reason']
+    )
+    CLASSIFICATIONS = Counter(
+        'email_classifier_classifications_total', 'Classificações por método e camada', ['method', 'tier']
+    )
+    STRIPPED_BYTES = Counter(
+        'email_classifier_stripped_bytes_total', 'Bytes removidos antes da limpeza (citações, avisos, assinaturas)', ['part']
+    )
+    NEAR_DUPLICATE_LOOKUPS = Counter(
+        'email_classifier_near_duplicate_lookups_total', 'Consultas ao índice de quase duplicatas', ['result']
+    )
+    JOBS = Counter(
+        'email_classifier_jobs_total', 'Jobs assíncronos por evento', ['status']
+    )
+
+def observe_stage(stage, seconds):
+    """Registra a duração de uma etapa."""
+    if PROMETHEUS_AVAILABLE:
+        STAGE_SECONDS.labels(stage).observe(seconds)
+
+@contextmanager
+def track_stage(stage):
+    """Mede a duração do bloco como uma etapa do pipeline (inclusive se houver exceção)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+def record_openai_response(response):
+    """Registra uma chamada bem-sucedida e os tokens de ``response.usage``."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    OPENAI_REQUESTS.labels('success').inc()
+    usage = getattr(response, 'usage', None)
+    if usage is not None:
+        OPENAI_TOKENS.labels('prompt').inc(getattr(usage, 'prompt_tokens', 0) or 0)
+        OPENAI_TOKENS.labels('completion').inc(getattr(usage, 'completion_tokens', 0) or 0)
+
+def record_openai_error():
+    """Registra uma chamada à OpenAI que falhou."""
+    if PROMETHEUS_AVAILABLE:
+        OPENAI_REQUESTS.labels('error').inc()
+
+def record_extra_call(kind):
+    """Registra uma chamada extra à OpenAI (retry ou hedge)."""
+    if PROMETHEUS_AVAILABLE:
+        OPENAI_EXTRA_CALLS.labels(kind).inc()
+
+def record_fallback(reason):
+    """
+    Registra um fallback para ``_classify_local``.
+
+    Motivos: not_configured, error, parse_error, deadline, circuit_open.
+    """
+    if PROMETHEUS_AVAILABLE:
+        FALLBACKS.labels(reason).inc()
+
+def record_classification(method, tier):
+    """Registra uma classificação concluída."""
+    if PROMETHEUS_AVAILABLE:
+        CLASSIFICATIONS.labels(method, tier).inc()
+
+def record_stripped_bytes(part, count):
+    """Registra bytes removidos de um email (quote, disclaimer, signature)."""
+    if PROMETHEUS_AVAILABLE:
+        STRIPPED_BYTES.labels(part).inc(count)
+
+def record_near_duplicate(result):
+    """
+    Registra uma consulta ao índice de quase duplicatas.
+
+    Resultados: hit (rótulo reaproveitado), miss, skipped (texto curto demais).
+    """
+    if PROMETHEUS_AVAILABLE:
+        NEAR_DUPLICATE_LOOKUPS.labels(result).inc()
+
+def record_job(status):
+    """Registra um evento da fila de jobs: queued, rejected (fila cheia), done ou failed."""
+    if PROMETHEUS_AVAILABLE:
+        JOBS.labels(status).inc()
+
+def render_metrics():
+    """
+    Gera o texto de exposição do Prometheus.
+
+    Retorna (corpo, content-type); o corpo é None se o prometheus_client não
+    estiver instalado.
+    """
+    if not PROMETHEUS_AVAILABLE:
+        return None, 'text/plain'
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        # Agrega os arquivos de todos os workers
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def mark_process_dead(pid):
+    """Remove os arquivos de métricas de um worker encerrado (hook child_exit do gunicorn)."""
+    if PROMETHEUS_AVAILABLE and os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,202 @@
+"""
+Índice de quase duplicatas (MinHash + LSH) para reaproveitar classificações.
+
+Campanhas de spam enviam milhares de emails que diferem só no nome, no token
+do link ou no ID de rastreamento: o hash exato do cache não os reconhece. O
+índice compara conjuntos de shingles (n-gramas de palavras) do texto
+pré-processado e reaproveita o rótulo de um email já classificado quando a
+similaridade de Jaccard estimada passa do limiar.
+"""
+
+import logging
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+# Importação opcional do NumPy
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from .metrics import record_near_duplicate
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+# Tokens com dígitos (IDs de rastreamento, códigos, datas) viram um marcador único
+_DIGIT_PATTERN = re.compile(r'\d')
+
+# Primo de Mersenne 2^61 - 1 usado nas permutações (a * h + b) mod p
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+class NearDuplicateIndex:
+    """
+    Índice MinHash com LSH em bandas, limitado a ``max_entries`` (LRU).
+
+    A assinatura tem ``num_perm`` valores divididos em ``bands`` bandas; emails
+    que coincidem em alguma banda são candidatos, confirmados pela fração de
+    valores iguais da assinatura (estimativa da similaridade de Jaccard) contra
+    ``threshold``. Textos com menos de ``min_shingles`` shingles não são indexados.
+    """
+
+    def __init__(self, threshold=0.9, num_perm=128, bands=16, shingle_size=2, max_entries=10000,
+                 min_shingles=5, seed=1):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("NumPy é necessário para o índice de quase duplicatas.")
+        if num_perm % bands:
+            raise ValueError("num_perm deve ser múltiplo de bands.")
+
+        self.threshold = float(threshold)
+        self.num_perm = int(num_perm)
+        self.bands = int(bands)
+        self.rows = self.num_perm // self.bands
+        self.shingle_size = max(1, int(shingle_size))
+        self.max_entries = max(1, int(max_entries))
+        self.min_shingles = max(1, int(min_shingles))
+
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, _MERSENNE_PRIME, size=self.num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, _MERSENNE_PRIME, size=self.num_perm, dtype=np.uint64)
+
+        # id -> (assinatura, chaves das bandas, classificação), em ordem de uso
+        self._entries = OrderedDict()
+        # Uma tabela por banda: chave da banda -> id da entrada mais recente
+        self._buckets = [{} for _ in range(self.bands)]
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'skipped': 0, 'added': 0, 'evictions': 0}
+
+    def _shingles(self, text):
+        tokens = ['#' if _DIGIT_PATTERN.search(token) else token for token in _TOKEN_PATTERN.findall(text.lower())]
+        size = self.shingle_size
+        if len(tokens) < size:
+            return set()
+        return {zlib.crc32(' '.join(tokens[index:index + size]).encode('utf-8')) for index in range(len(tokens) - size + 1)}
+
+    def signature(self, text):
+        """Assinatura MinHash do texto (None se o texto for curto demais)."""
+        shingles = self._shingles(text)
+        if len(shingles) < self.min_shingles:
+            return None
+        hashes = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        # Overflow em uint64 é aritmético módulo 2^64, como no MinHash de referência
+        with np.errstate(over='ignore'):
+            permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [hash(signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def _similarity(self, first, second):
+        return float(np.count_nonzero(first == second)) / self.num_perm
+
+    def lookup(self, text) -> Optional[Dict[str, Any]]:
+        """
+        Retorna a classificação do email indexado mais parecido, se a similaridade
+        estimada for pelo menos ``threshold``; caso contrário, None.
+        """
+        signature = self.signature(text)
+        if signature is None:
+            with self._lock:
+                self._counters['skipped'] += 1
+            record_near_duplicate('skipped')
+            return None
+        band_keys = self._band_keys(signature)
+
+        with self._lock:
+            candidates = {bucket[key] for bucket, key in zip(self._buckets, band_keys) if key in bucket}
+            best_id, best_similarity = None, 0.0
+            for entry_id in candidates:
+                similarity = self._similarity(self._entries[entry_id][0], signature)
+                if similarity > best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+
+            hit = best_id is not None and best_similarity >= self.threshold
+            if hit:
+                self._entries.move_to_end(best_id)
+                self._counters['hits'] += 1
+                classification = dict(self._entries[best_id][2])
+            else:
+                self._counters['misses'] += 1
+
+        record_near_duplicate('hit' if hit else 'miss')
+        if not hit:
+            return None
+        classification['near_duplicate_similarity'] = round(best_similarity, 3)
+        return classification
+
+    def group(self, texts) -> List[Tuple[int, float]]:
+        """
+        Agrupa as quase duplicatas de um lote entre si (sem consultar o índice).
+
+        Retorna, para cada texto, o par (posição do primeiro texto do lote de que
+        ele é quase duplicata, similaridade estimada), ou (própria posição, 1.0).
+        """
+        leaders = [(index, 1.0) for index in range(len(texts))]
+        buckets = [{} for _ in range(self.bands)]
+        signatures = {}
+        for index, text in enumerate(texts):
+            signature = self.signature(text)
+            if signature is None:
+                continue
+            band_keys = self._band_keys(signature)
+            candidates = {bucket[key] for bucket, key in zip(buckets, band_keys) if key in bucket}
+            best_id, best_similarity = None, 0.0
+            for candidate in candidates:
+                similarity = self._similarity(signatures[candidate], signature)
+                if similarity > best_similarity:
+                    best_id, best_similarity = candidate, similarity
+            if best_id is not None and best_similarity >= self.threshold:
+                leaders[index] = (best_id, round(best_similarity, 3))
+                continue
+            signatures[index] = signature
+            for bucket, key in zip(buckets, band_keys):
+                bucket.setdefault(key, index)
+        return leaders
+
+    def record_reuse(self):
+        """Conta um rótulo reaproveitado fora de ``lookup`` (quase duplicata no mesmo lote)."""
+        with self._lock:
+            self._counters['hits'] += 1
+        record_near_duplicate('hit')
+
+    def add(self, text, classification: Dict[str, Any]):
+        """Indexa um email classificado, removendo o menos usado se o limite for atingido."""
+        signature = self.signature(text)
+        if signature is None:
+            return
+        band_keys = self._band_keys(signature)
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (signature, band_keys, dict(classification))
+            for bucket, key in zip(self._buckets, band_keys):
+                bucket[key] = entry_id
+            self._counters['added'] += 1
+
+            while len(self._entries) > self.max_entries:
+                old_id, (_, old_keys, _) = self._entries.popitem(last=False)
+                for bucket, key in zip(self._buckets, old_keys):
+                    if bucket.get(key) == old_id:
+                        del bucket[key]
+                self._counters['evictions'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores e taxa de reaproveitamento (por processo)."""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'threshold': self.threshold,
+                **self._counters,
+                'reuse_rate': round(self._counters['hits'] / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,170 @@
+"""
+Extração de texto de PDFs por página, com modo paralelo para arquivos grandes.
+"""
+
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+def _extract_pages(data: bytes, start: int, end: int, deadline: Optional[float] = None) -> List[str]:
+    """
+    Extrai o texto das páginas [start, end) de um PDF em memória.
+
+    Usa pdfplumber e recorre ao PyPDF2 apenas nas páginas que voltaram vazias.
+    Executada tanto no processo atual quanto nos processos do pool.
+    """
+    # Importados sob demanda para não pesar no boot da aplicação
+    import pdfplumber
+    from PyPDF2 import PdfReader
+
+    texts = []
+    with pdfplumber.open(io.BytesIO(data), pages=list(range(start + 1, end + 1))) as pdf:
+        for page in pdf.pages:
+            if deadline is not None and time.time() > deadline:
+                break
+            texts.append(page.extract_text() or '')
+
+    empty_pages = [offset for offset, text in enumerate(texts) if not text.strip()]
+    if empty_pages:
+        reader = PdfReader(io.BytesIO(data))
+        for offset in empty_pages:
+            if deadline is not None and time.time() > deadline:
+                break
+            try:
+                texts[offset] = reader.pages[start + offset].extract_text() or ''
+            except Exception as e:
+                logger.warning(f"PyPDF2 falhou na página {start + offset + 1}: {str(e)}")
+
+    return texts
+
+class PdfExtractor:
+    """
+    Extrator de texto de PDF com limite de páginas e de tempo.
+
+    PDFs com pelo menos ``parallel_min_pages`` páginas são divididos em uma
+    faixa de páginas por processo do pool (o PDF é enviado uma vez a cada
+    processo); os resultados são unidos na ordem original. Arquivos menores são
+    extraídos no próprio processo. Ao atingir o tempo limite, o texto parcial
+    vai até a última página extraída sem lacunas, como na extração sequencial.
+    """
+
+    # Espera (s) além do prazo pelas faixas, que param sozinhas no prazo e devolvem as páginas já extraídas
+    PARTIAL_RESULT_GRACE = 1.0
+
+    def __init__(self, max_workers=2, max_pages=500, timeout=30.0, parallel_min_pages=16):
+        """Inicializa o extrator."""
+        self.max_workers = max(0, int(max_workers or 0))
+        self.max_pages = int(max_pages) if max_pages else None
+        self.timeout = float(timeout) if timeout else None
+        self.parallel_min_pages = max(1, int(parallel_min_pages))
+
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        """Retorna o pool de processos deste processo (criado sob demanda, recriado após fork)."""
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                # 'spawn' evita herdar threads e locks do worker web no fork
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def shutdown(self):
+        """Encerra o pool de processos, se existir."""
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @staticmethod
+    def _read_bytes(source) -> bytes:
+        """Lê o conteúdo do PDF a partir de um caminho ou stream binário."""
+        if isinstance(source, (bytes, bytearray)):
+            return bytes(source)
+        if hasattr(source, 'read'):
+            source.seek(0)
+            return source.read()
+        with open(source, 'rb') as file:
+            return file.read()
+
+    def extract(self, source, timeout: Optional[float] = None) -> str:
+        """
+        Extrai o texto do PDF respeitando os limites de páginas e de tempo.
+
+        ``timeout`` (s) reduz o tempo limite desta extração (ex.: o que resta do
+        prazo de um job).
+        """
+        from PyPDF2 import PdfReader
+        
+        data = self._read_bytes(source)
+        if timeout is not None:
+            timeout = max(0.0, min(timeout, self.timeout)) if self.timeout else max(0.0, timeout)
+        else:
+            timeout = self.timeout
+        deadline = time.time() + timeout if timeout is not None else None
+
+        page_count = len(PdfReader(io.BytesIO(data)).pages)
+        if self.max_pages and page_count > self.max_pages:
+            logger.warning(f"PDF com {page_count} páginas; extraindo apenas as primeiras {self.max_pages}.")
+            page_count = self.max_pages
+
+        if self.max_workers > 1 and page_count >= self.parallel_min_pages:
+            texts = self._extract_parallel(data, page_count, deadline)
+        else:
+            texts = _extract_pages(data, 0, page_count, deadline)
+
+        if deadline is not None and time.time() > deadline:
+            logger.warning(f"Tempo limite de extração do PDF atingido ({timeout}s); texto parcial.")
+
+        return '\n'.join(text for text in texts if text.strip()).strip()
+
+    def _extract_parallel(self, data: bytes, page_count: int, deadline: Optional[float]) -> List[str]:
+        """Distribui faixas de páginas entre os processos e une os resultados em ordem."""
+        executor = self._get_executor()
+
+        # Uma faixa por processo: cada faixa leva uma cópia do PDF pelo IPC
+        chunks = min(page_count, self.max_workers)
+        bounds = [round(i * page_count / chunks) for i in range(chunks + 1)]
+
+        futures = [
+            executor.submit(_extract_pages, data, bounds[i], bounds[i + 1], deadline)
+            for i in range(chunks)
+        ]
+
+        remaining = (max(0.0, deadline - time.time()) + self.PARTIAL_RESULT_GRACE
+                     if deadline is not None else None)
+        done, not_done = wait(futures, timeout=remaining, return_when=FIRST_EXCEPTION)
+        for future in not_done:
+            future.cancel()
+
+        # Exceções de qualquer faixa são propagadas para o chamador
+        for future in done:
+            error = future.exception()
+            if error is not None:
+                raise error
+
+        # Só as páginas até a primeira faixa incompleta: sem lacunas no meio do texto
+        texts = []
+        for i, future in enumerate(futures):
+            if future not in done:
+                break
+            chunk_texts = future.result()
+            texts.extend(chunk_texts)
+            if len(chunk_texts) < bounds[i + 1] - bounds[i]:
+                break
+
+        if len(texts) < page_count:
+            logger.warning(f"Extração paralela incompleta: páginas 1-{len(texts)} de {page_count}; texto parcial.")
+        return texts
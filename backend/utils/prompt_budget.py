@@ -0,0 +1,143 @@
+"""
+Orçamento de tokens do email enviado à OpenAI.
+
+Os tokens são contados com o tiktoken (opcional) ou, sem ele, estimados pelo
+número de caracteres. O tiktoken baixa o vocabulário no primeiro uso: em
+produção ele é baixado no build, em ``TIKTOKEN_CACHE_DIR`` (ver render.yaml). Emails que excedem o orçamento mantêm o início (assunto
+e abertura) e o fim (pedido, prazos, assinatura), em vez de um prefixo fixo.
+"""
+
+import importlib.util
+import logging
+import math
+import threading
+from typing import Dict, Any
+
+# O tiktoken é importado sob demanda, na primeira contagem
+TIKTOKEN_AVAILABLE = importlib.util.find_spec('tiktoken') is not None
+
+logger = logging.getLogger(__name__)
+
+# Estimativa sem o tiktoken (texto em português, minúsculo e sem pontuação)
+CHARS_PER_TOKEN = 3.5
+
+# Marca o trecho removido entre o início e o fim do email
+SEGMENT_SEPARATOR = ' [...] '
+
+# Codificação usada quando o tiktoken não conhece o modelo
+DEFAULT_ENCODING = 'cl100k_base'
+
+class PromptBudget:
+    """
+    Ajusta textos a ``max_tokens`` tokens do modelo ``model`` (0 desativa).
+
+    ``head_ratio`` é a fração do orçamento reservada ao início do email; o
+    restante fica com o fim. Sem ``lazy_load`` a codificação é carregada na
+    criação (no mestre do gunicorn, com preload), e não no primeiro ``fit()``.
+    """
+
+    def __init__(self, model='gpt-3.5-turbo', max_tokens=512, head_ratio=0.6, lazy_load=False):
+        self.model = model
+        self.max_tokens = max(0, int(max_tokens or 0))
+        self.head_ratio = min(1.0, max(0.0, float(head_ratio)))
+        self._encoding = None
+        self._encoding_ready = not TIKTOKEN_AVAILABLE
+        self._lock = threading.Lock()
+        self._counters = {'fitted': 0, 'truncated': 0, 'tokens_in': 0, 'tokens_out': 0}
+        if not lazy_load:
+            self.encoding
+
+    @property
+    def encoding(self):
+        """Codificação do tiktoken para o modelo, ou None (estimativa por caracteres)."""
+        if not self._encoding_ready:
+            with self._lock:
+                if not self._encoding_ready:
+                    self._encoding = self._load_encoding()
+                    self._encoding_ready = True
+        return self._encoding
+
+    def _load_encoding(self):
+        try:
+            import tiktoken
+        except ImportError:
+            return None
+        try:
+            try:
+                return tiktoken.encoding_for_model(self.model or '')
+            except KeyError:
+                return tiktoken.get_encoding(DEFAULT_ENCODING)
+        except Exception as e:
+            # Vocabulário fora do cache (TIKTOKEN_CACHE_DIR) e sem rede: usa a estimativa
+            logger.warning(f"Codificação do tiktoken indisponível ({str(e)}). Estimando tokens por caracteres. "
+                           f"Baixe o vocabulário no build com TIKTOKEN_CACHE_DIR definido.")
+            return None
+
+    @property
+    def tokenizer(self) -> str:
+        return self.encoding.name if self.encoding is not None else 'estimate'
+
+    def count(self, text: str) -> int:
+        """Número de tokens do texto."""
+        encoding = self.encoding
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    def fit(self, text: str) -> str:
+        """Retorna o texto inteiro, se couber no orçamento, ou o início e o fim unidos por ``[...]``."""
+        if not self.max_tokens:
+            return text
+
+        encoding = self.encoding
+        if encoding is not None:
+            tokens = encoding.encode(text, disallowed_special=())
+            total = len(tokens)
+            if total > self.max_tokens:
+                head_size, tail_size = self._split(len(encoding.encode(SEGMENT_SEPARATOR)))
+                text = self._join(encoding.decode(tokens[:head_size]),
+                                  encoding.decode(tokens[total - tail_size:]) if tail_size else '')
+        else:
+            total = math.ceil(len(text) / CHARS_PER_TOKEN)
+            if total > self.max_tokens:
+                head_size, tail_size = self._split(math.ceil(len(SEGMENT_SEPARATOR) / CHARS_PER_TOKEN))
+                head_chars = int(head_size * CHARS_PER_TOKEN)
+                tail_chars = int(tail_size * CHARS_PER_TOKEN)
+                text = self._join(text[:head_chars], text[len(text) - tail_chars:] if tail_chars else '')
+
+        with self._lock:
+            self._counters['fitted'] += 1
+            self._counters['tokens_in'] += total
+            if total > self.max_tokens:
+                self._counters['truncated'] += 1
+                self._counters['tokens_out'] += self.max_tokens
+            else:
+                self._counters['tokens_out'] += total
+        return text
+
+    def _split(self, separator_tokens):
+        """Tokens do início e do fim, descontando o separador."""
+        available = max(1, self.max_tokens - separator_tokens)
+        head_size = max(1, int(available * self.head_ratio))
+        return head_size, available - head_size
+
+    @staticmethod
+    def _join(head, tail):
+        # Descarta palavras cortadas ao meio nas bordas dos trechos
+        if ' ' in head:
+            head = head.rsplit(' ', 1)[0]
+        if not tail:
+            return head
+        if ' ' in tail:
+            tail = tail.split(' ', 1)[1]
+        return f'{head.rstrip()}{SEGMENT_SEPARATOR}{tail.lstrip()}'
+
+    def stats(self) -> Dict[str, Any]:
+        """Orçamento, tokenizador e contadores (por processo)."""
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            'max_tokens': self.max_tokens,
+            'tokenizer': self.tokenizer if self._encoding_ready else 'not_loaded',
+            **counters
+        }
@@ -0,0 +1,185 @@
+"""
+Primitivas de resiliência para as chamadas à OpenAI.
+
+- ``Deadline``: orçamento de tempo de uma classificação, dividido entre as tentativas.
+- ``CircuitBreaker``: deixa de chamar a OpenAI enquanto a taxa de erros estiver alta.
+- ``RetryBudget``: limita novas tentativas e requisições duplicadas (hedge) a uma
+  fração das chamadas, para que as repetições não multipliquem a carga numa falha.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Any
+
+class CircuitOpenError(Exception):
+    """A chamada foi recusada porque o circuito está aberto."""
+
+class DeadlineExceeded(Exception):
+    """O prazo da classificação terminou antes de a OpenAI responder."""
+
+def is_retryable(error: Exception) -> bool:
+    """Erros transitórios: timeout, falha de conexão, 429 e 5xx."""
+    status_code = getattr(error, 'status_code', None)
+    if status_code is None:
+        return not isinstance(error, (CircuitOpenError, ValueError, TypeError))
+    return status_code == 429 or status_code >= 500
+
+class Deadline:
+    """Prazo absoluto calculado a partir de um orçamento em segundos."""
+
+    def __init__(self, seconds: float):
+        self.seconds = float(seconds)
+        self.expires_at = time.monotonic() + self.seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+class CircuitBreaker:
+    """
+    Disjuntor por taxa de erros em janela deslizante.
+
+    Fechado: todas as chamadas passam. Abre quando, nos últimos ``window``
+    segundos, houve pelo menos ``min_requests`` chamadas e a fração de erros
+    chegou a ``error_rate``. Aberto: recusa chamadas por ``cooldown`` segundos.
+    Depois, meio aberto: deixa passar uma chamada de teste, que fecha o
+    circuito se tiver sucesso ou o reabre se falhar.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, error_rate=0.5, min_requests=10, window=30.0, cooldown=30.0):
+        self.error_rate = float(error_rate)
+        self.min_requests = max(1, int(min_requests))
+        self.window = float(window)
+        self.cooldown = float(cooldown)
+
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._outcomes = deque()
+        self._lock = threading.Lock()
+        self._counters = {'opened': 0, 'rejected': 0}
+
+    def _trim(self, now):
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def allow(self) -> bool:
+        """Indica se uma chamada pode ser feita agora."""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    self._counters['rejected'] += 1
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self._state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    self._counters['rejected'] += 1
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def release_probe(self):
+        """
+        Devolve a chamada de teste reservada por ``allow()`` quando ela não foi
+        feita (prazo, orçamento ou cancelamento): sem isso o circuito ficaria
+        meio aberto e recusando tudo.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._outcomes.clear()
+            self._outcomes.append((now, True))
+            self._trim(now)
+
+    def record_failure(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._state == self.HALF_OPEN:
+                self._open(now)
+                return
+
+            self._outcomes.append((now, False))
+            self._trim(now)
+            if self._state == self.CLOSED and len(self._outcomes) >= self.min_requests:
+                failures = sum(1 for _, ok in self._outcomes if not ok)
+                if failures / len(self._outcomes) >= self.error_rate:
+                    self._open(now)
+
+    def _open(self, now):
+        self._state = self.OPEN
+        self._opened_at = now
+        self._probe_in_flight = False
+        self._outcomes.clear()
+        self._counters['opened'] += 1
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return self.HALF_OPEN
+            return self._state
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado atual e contadores (por processo)."""
+        state = self.state
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            total = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                'state': state,
+                'window_requests': total,
+                'window_error_rate': round(failures / total, 4) if total else 0.0,
+                'retry_in_s': round(max(0.0, self.cooldown - (now - self._opened_at)), 1) if state == self.OPEN else None,
+                **self._counters
+            }
+
+class RetryBudget:
+    """
+    Orçamento global de novas tentativas (token bucket).
+
+    Cada chamada original deposita ``ratio`` fichas e cada nova tentativa ou
+    hedge consome uma; com ``ratio`` 0.1, no máximo ~10% de chamadas extras.
+    ``max_tokens`` limita o acúmulo em períodos tranquilos.
+    """
+
+    def __init__(self, ratio=0.1, max_tokens=10.0):
+        self.ratio = float(ratio)
+        self.max_tokens = float(max_tokens)
+        self._tokens = self.max_tokens
+        self._lock = threading.Lock()
+        self._counters = {'granted': 0, 'denied': 0}
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Consome uma ficha; retorna False se o orçamento estiver esgotado."""
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self._counters['granted'] += 1
+                return True
+            self._counters['denied'] += 1
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'ratio': self.ratio, 'tokens': round(self._tokens, 2), **self._counters}
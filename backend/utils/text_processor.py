@@ -2,157 +2,344 @@
 Utilitários para processamento de texto e NLP.
 """
 
+import importlib.util
 import re
+import threading
+import time
 import logging
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from PyPDF2 import PdfReader
-import pdfplumber
 
-# Importação opcional do spaCy
-try:
-    import spacy
-    SPACY_AVAILABLE = True
-except ImportError:
-    spacy = None
-    SPACY_AVAILABLE = False
+from .email_stripper import strip_email
+from .pdf_extractor import PdfExtractor
+from .metrics import track_stage, record_stripped_bytes
+
+# spaCy e NLTK são importados sob demanda: só a importação do spaCy leva mais de um segundo
+SPACY_AVAILABLE = importlib.util.find_spec('spacy') is not None
+NLTK_AVAILABLE = importlib.util.find_spec('nltk') is not None
 
 logger = logging.getLogger(__name__)
 
+# Rótulos de entidades e classes gramaticais usados na extração de palavras-chave
+KEYWORD_ENTITY_LABELS = {'PERSON', 'ORG', 'GPE', 'PRODUCT'}
+KEYWORD_POS_TAGS = {'NOUN', 'ADJ'}
+
+# Sequências de caracteres que não são letras, dígitos ou '_' (pontuação e espaços).
+# Letras acentuadas pertencem a \w em Unicode, então são preservadas.
+NON_WORD_RE = re.compile(r'\W+')
+
+# Tokenizadores: 'fast' (regex compilada, sem NLTK) ou 'nltk' (word_tokenize com punkt)
+TOKENIZERS = ('fast', 'nltk')
+TOKEN_RE = re.compile(r'\w+')
+
+# Recursos do NLTK usados pelo processador (punkt só no tokenizador 'nltk')
+NLTK_RESOURCES = {'punkt': 'tokenizers/punkt', 'stopwords': 'corpora/stopwords'}
+
 class TextProcessor:
     """Classe para processamento de texto."""
     
-    def __init__(self):
-        """Inicializa o processador de texto."""
-        self.nlp = self._load_spacy_model()
-        self.stop_words = self._load_stopwords()
-        self._ensure_nltk_data()
+    def __init__(self, spacy_model='pt_core_news_sm', spacy_disabled_components=None, pdf_extractor=None,
+                 lazy_load=False, nltk_data_dir=None, nltk_download=False, tokenizer='fast', strip_replies=False):
+        """
+        Inicializa o processador de texto.
+        
+        Com ``lazy_load`` o spaCy e os dados do NLTK só são carregados no primeiro
+        uso. Os dados do NLTK são procurados em ``nltk_data_dir`` e só são baixados
+        se ``nltk_download`` estiver ativo. O tokenizador ``fast`` dispensa o NLTK
+        (as stopwords do spaCy são usadas se o NLTK não estiver disponível).
+        Com ``strip_replies``, histórico citado, avisos legais e assinaturas são
+        removidos antes da limpeza.
+        """
+        self.pdf_extractor = pdf_extractor or PdfExtractor(max_workers=0)
+        self.spacy_model = spacy_model
+        self.spacy_disabled_components = list(spacy_disabled_components or [])
+        self.nltk_data_dir = nltk_data_dir
+        self.nltk_download = nltk_download
+        self.lazy_load = lazy_load
+        self.strip_replies = strip_replies
+        
+        if tokenizer not in TOKENIZERS:
+            logger.warning(f"Tokenizador desconhecido '{tokenizer}'. Usando 'fast'.")
+            tokenizer = 'fast'
+        self.tokenizer = tokenizer
+        
+        self._nlp = None
+        self._nlp_loaded = False
+        self._stop_words = None
+        self._load_lock = threading.RLock()
+        self.spacy_load_ms = None
+        
+        if not lazy_load:
+            # Carregamento imediato: com o gunicorn --preload os modelos ficam no processo mestre
+            self.nlp
+            self.stop_words
+    
+    @property
+    def nlp(self):
+        """Pipeline do spaCy (carregado no primeiro acesso; None se indisponível)."""
+        if not self._nlp_loaded:
+            with self._load_lock:
+                if not self._nlp_loaded:
+                    started = time.perf_counter()
+                    self._nlp = self._load_spacy_model()
+                    self.spacy_load_ms = round((time.perf_counter() - started) * 1000, 1)
+                    self._nlp_loaded = True
+        return self._nlp
+    
+    @property
+    def spacy_model_loaded(self):
+        """Indica se o modelo do spaCy já está carregado (sem disparar o carregamento)."""
+        return self._nlp_loaded and self._nlp is not None
+    
+    @property
+    def stop_words(self):
+        """Stopwords em português (carregadas no primeiro acesso)."""
+        if self._stop_words is None:
+            with self._load_lock:
+                if self._stop_words is None:
+                    self._ensure_nltk_data()
+                    self._stop_words = self._load_stopwords()
+        return self._stop_words
     
     def _load_spacy_model(self):
         """Carrega o modelo do spaCy."""
         if not SPACY_AVAILABLE:
             logger.info("spaCy não disponível. Funcionalidade de lemmatização desabilitada.")
             return None
-            
+        
+        import spacy
+        
         try:
-            return spacy.load("pt_core_news_sm")
+            # Componentes excluídos não são nem carregados (ex.: o parser de dependências)
+            return spacy.load(self.spacy_model, exclude=self.spacy_disabled_components)
         except OSError:
-            logger.warning("Modelo pt_core_news_sm não encontrado. Funcionalidade de lemmatização desabilitada.")
+            logger.warning(f"Modelo {self.spacy_model} não encontrado. Funcionalidade de lemmatização desabilitada.")
             return None
     
     def _load_stopwords(self):
-        """Carrega stopwords em português."""
-        try:
-            return set(stopwords.words('portuguese'))
-        except LookupError:
-            logger.warning("Stopwords em português não encontradas.")
-            return set()
+        """Carrega stopwords em português (NLTK; lista do spaCy como alternativa)."""
+        if NLTK_AVAILABLE:
+            from nltk.corpus import stopwords
+            
+            try:
+                return frozenset(stopwords.words('portuguese'))
+            except LookupError:
+                logger.warning("Stopwords em português do NLTK não encontradas.")
+        
+        if SPACY_AVAILABLE:
+            from spacy.lang.pt.stop_words import STOP_WORDS
+            
+            logger.info("Usando a lista de stopwords em português do spaCy.")
+            return frozenset(STOP_WORDS)
+        
+        logger.warning("Stopwords em português não encontradas.")
+        return frozenset()
     
     def _ensure_nltk_data(self):
-        """Garante que os dados necessários do NLTK estão disponíveis."""
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt', quiet=True)
+        """
+        Verifica se os dados do NLTK estão disponíveis, sem acesso à rede por padrão.
         
-        try:
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            nltk.download('stopwords', quiet=True)
+        Os dados devem vir prontos do build (``python -m nltk.downloader -d
+        nltk_data punkt stopwords``); o download no boot só ocorre se habilitado.
+        """
+        if not NLTK_AVAILABLE:
+            if self.tokenizer == 'nltk':
+                logger.warning("NLTK não está instalado. Usando o tokenizador 'fast'.")
+                self.tokenizer = 'fast'
+            return
+        
+        import nltk
+        
+        if self.nltk_data_dir and self.nltk_data_dir not in nltk.data.path:
+            nltk.data.path.insert(0, self.nltk_data_dir)
+        
+        for name, resource in NLTK_RESOURCES.items():
+            if name == 'punkt' and self.tokenizer != 'nltk':
+                continue
+            try:
+                nltk.data.find(resource)
+            except LookupError:
+                if self.nltk_download:
+                    nltk.download(name, download_dir=self.nltk_data_dir, quiet=True)
+                else:
+                    logger.warning(
+                        f"Dados '{name}' do NLTK não encontrados. Execute: "
+                        f"python -m nltk.downloader -d {self.nltk_data_dir or 'nltk_data'} {name}"
+                    )
+    
+    def _tokenize(self, text):
+        """
+        Tokeniza o texto.
+        
+        O modo ``fast`` extrai as sequências de caracteres de palavra com uma regex
+        compilada: após ``clean_text`` não há pontuação, e o resultado coincide com
+        o do ``word_tokenize`` sem carregar o punkt nem dividir sentenças
+        (ver benchmarks/tokenizer_parity.py).
+        """
+        if self.tokenizer == 'fast':
+            return TOKEN_RE.findall(text)
+        
+        from nltk.tokenize import word_tokenize
+        
+        return word_tokenize(text, language='portuguese')
     
-    def extract_text_from_pdf(self, file_path):
-        """Extrai texto de arquivo PDF."""
+    def extract_text_from_pdf(self, source, timeout=None):
+        """
+        Extrai texto de arquivo PDF.
+        
+        ``source`` pode ser um caminho ou um stream binário (BytesIO, arquivo
+        spooled de upload); streams são lidos sem gravar nada em disco. Páginas
+        sem texto no pdfplumber são extraídas novamente com o PyPDF2.
+        ``timeout`` (s) reduz o tempo limite configurado no extrator.
+        """
         try:
-            text = ""
-            
-            # Tentar com pdfplumber primeiro (melhor para layout complexo)
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            
-            # Se pdfplumber não funcionou, tentar PyPDF2
-            if not text.strip():
-                with open(file_path, 'rb') as file:
-                    reader = PdfReader(file)
-                    for page in reader.pages:
-                        text += page.extract_text() + "\n"
-            
-            return text.strip()
-            
+            with track_stage('pdf_extraction'):
+                return self.pdf_extractor.extract(source, timeout=timeout)
         except Exception as e:
             logger.error(f"Erro ao extrair texto do PDF: {str(e)}")
             raise
     
-    def extract_text_from_txt(self, file_path):
-        """Extrai texto de arquivo TXT."""
+    def extract_text_from_txt(self, source):
+        """Extrai texto de arquivo TXT (caminho ou stream binário)."""
+        with track_stage('txt_extraction'):
+            return self._read_txt(source)
+    
+    def _read_txt(self, source):
+        """Lê e decodifica o TXT."""
+        if hasattr(source, 'read'):
+            return self._decode_text(source.read())
+        
         try:
             # Tentar UTF-8 primeiro
-            with open(file_path, 'r', encoding='utf-8') as file:
+            with open(source, 'r', encoding='utf-8') as file:
                 return file.read()
         except UnicodeDecodeError:
             # Fallback para latin-1
             try:
-                with open(file_path, 'r', encoding='latin-1') as file:
+                with open(source, 'r', encoding='latin-1') as file:
                     return file.read()
             except Exception as e:
                 logger.error(f"Erro ao ler arquivo TXT: {str(e)}")
                 raise
     
-    def clean_text(self, text):
-        """Limpa o texto removendo caracteres especiais e normalizando."""
-        # Remover caracteres especiais mantendo acentos
-        text = re.sub(r'[^\w\sáàâãéèêíìîóòôõúùûç]', ' ', text, flags=re.IGNORECASE)
+    def _decode_text(self, data):
+        """Decodifica bytes de um TXT (UTF-8 com fallback para latin-1)."""
+        try:
+            return data.decode('utf-8')
+        except UnicodeDecodeError:
+            return data.decode('latin-1')
+    
+    def extract_text_from_upload(self, stream, filename, timeout=None):
+        """
+        Extrai texto de um upload diretamente do stream em memória ou spooled.
+        
+        Retorna string vazia para extensões não suportadas. ``timeout`` limita
+        a extração de PDFs.
+        """
+        stream.seek(0)
+        extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
         
-        # Remover espaços extras
-        text = re.sub(r'\s+', ' ', text)
+        if extension == 'pdf':
+            return self.extract_text_from_pdf(stream, timeout=timeout)
+        elif extension == 'txt':
+            return self.extract_text_from_txt(stream)
+        return ""
+    
+    def strip_boilerplate(self, text):
+        """
+        Remove histórico citado, avisos legais e assinatura (ver ``email_stripper``).
         
-        # Remover quebras de linha e tabs
-        text = re.sub(r'[\r\n\t]+', ' ', text)
+        Retorna (texto restante, bytes removidos); sem ``strip_replies`` o texto não muda.
+        """
+        if not self.strip_replies:
+            return text, 0
+        try:
+            body, dropped = strip_email(text)
+        except Exception as e:
+            logger.error(f"Erro ao remover citações e assinatura: {str(e)}")
+            return text, 0
+        for part, count in dropped.items():
+            record_stripped_bytes(part, count)
+        return body, sum(dropped.values())
+    
+    def clean_text(self, text):
+        """
+        Limpa o texto removendo caracteres especiais e normalizando.
         
-        return text.strip().lower()
+        Uma única substituição troca cada sequência de pontuação e espaços
+        (inclusive quebras de linha e tabs) por um espaço, mantendo acentos.
+        """
+        return NON_WORD_RE.sub(' ', text).strip().lower()
+    
+    def clean_many(self, texts):
+        """Versão de ``clean_text`` para uma lista de textos."""
+        sub = NON_WORD_RE.sub
+        return [sub(' ', text).strip().lower() for text in texts]
     
     def remove_stopwords(self, text):
         """Remove stopwords do texto."""
         try:
-            words = word_tokenize(text, language='portuguese')
+            stop_words = self.stop_words
+            words = self._tokenize(text)
             filtered_words = [
                 word for word in words 
-                if word not in self.stop_words and len(word) > 2
+                if len(word) > 2 and word not in stop_words
             ]
             return ' '.join(filtered_words)
         except Exception as e:
             logger.error(f"Erro na remoção de stopwords: {str(e)}")
             return text
     
+    def remove_stopwords_many(self, texts):
+        """Remove stopwords de uma lista de textos com um único filtro compartilhado."""
+        stop_words = self.stop_words
+        results = []
+        for text in texts:
+            try:
+                words = self._tokenize(text)
+            except Exception as e:
+                logger.error(f"Erro na remoção de stopwords: {str(e)}")
+                results.append(text)
+                continue
+            results.append(' '.join([word for word in words if len(word) > 2 and word not in stop_words]))
+        return results
+    
     def lemmatize_text(self, text):
         """Realiza lemmatização do texto usando spaCy."""
         if not self.nlp:
             return text
         
         try:
-            doc = self.nlp(text)
-            lemmatized_words = [
-                token.lemma_ for token in doc 
-                if not token.is_stop and not token.is_punct and not token.is_space
-            ]
-            return ' '.join(lemmatized_words)
+            with track_stage('spacy_parse'):
+                doc = self.nlp(text)
+            with track_stage('lemmatize'):
+                return self._lemmas_from_doc(doc)
         except Exception as e:
             logger.error(f"Erro na lemmatização: {str(e)}")
             return text
     
+    def _lemmas_from_doc(self, doc):
+        """Monta o texto lematizado a partir de um Doc já processado."""
+        lemmatized_words = [
+            token.lemma_ for token in doc 
+            if not token.is_stop and not token.is_punct and not token.is_space
+        ]
+        return ' '.join(lemmatized_words)
+    
     def preprocess_text(self, text):
         """Pipeline completo de pré-processamento de texto."""
         try:
-            # 1. Limpeza básica
-            cleaned_text = self.clean_text(text)
+            # 1. Histórico citado, avisos legais e assinatura
+            with track_stage('strip_boilerplate'):
+                text, _ = self.strip_boilerplate(text)
             
-            # 2. Remoção de stopwords
-            no_stopwords = self.remove_stopwords(cleaned_text)
+            # 2. Limpeza básica
+            with track_stage('clean_text'):
+                cleaned_text = self.clean_text(text)
+            
+            # 3. Remoção de stopwords
+            with track_stage('remove_stopwords'):
+                no_stopwords = self.remove_stopwords(cleaned_text)
             
-            # 3. Lemmatização
+            # 4. Lemmatização (etapas spacy_parse e lemmatize)
             lemmatized = self.lemmatize_text(no_stopwords)
             
             return lemmatized
@@ -165,42 +352,174 @@ class TextProcessor:
         """Extrai palavras-chave mais relevantes do texto."""
         try:
             if not self.nlp:
-                # Fallback simples sem spaCy
-                words = text.split()
-                word_freq = {}
-                for word in words:
-                    if len(word) > 3:
-                        word_freq[word] = word_freq.get(word, 0) + 1
-                
-                sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-                return [word for word, freq in sorted_words[:max_keywords]]
+                return self._keywords_by_frequency(text, max_keywords)
             
-            doc = self.nlp(text)
+            return self._keywords_from_doc(self.nlp(text), max_keywords)
             
-            # Extrair entidades nomeadas e tokens importantes
-            keywords = []
-            
-            # Adicionar entidades nomeadas
-            for ent in doc.ents:
-                if ent.label_ in ['PERSON', 'ORG', 'GPE', 'PRODUCT']:
-                    keywords.append(ent.text.lower())
+        except Exception as e:
+            logger.error(f"Erro na extração de palavras-chave: {str(e)}")
+            return []
+    
+    def _keywords_by_frequency(self, text, max_keywords):
+        """Fallback simples sem spaCy: palavras mais frequentes."""
+        words = text.split()
+        word_freq = {}
+        for word in words:
+            if len(word) > 3:
+                word_freq[word] = word_freq.get(word, 0) + 1
+        
+        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
+        return [word for word, freq in sorted_words[:max_keywords]]
+    
+    def _keywords_from_doc(self, doc, max_keywords):
+        """Extrai palavras-chave de um Doc já processado (entidades, substantivos e adjetivos)."""
+        keywords = []
+        
+        # Adicionar entidades nomeadas
+        for ent in doc.ents:
+            if ent.label_ in KEYWORD_ENTITY_LABELS:
+                keywords.append(ent.text.lower())
+        
+        # Adicionar substantivos e adjetivos importantes
+        for token in doc:
+            if (token.pos_ in KEYWORD_POS_TAGS and 
+                not token.is_stop and 
+                not token.is_punct and 
+                len(token.text) > 3):
+                keywords.append(token.lemma_.lower())
+        
+        # Remover duplicatas e retornar as mais frequentes
+        keyword_freq = {}
+        for keyword in keywords:
+            keyword_freq[keyword] = keyword_freq.get(keyword, 0) + 1
+        
+        sorted_keywords = sorted(keyword_freq.items(), key=lambda x: x[1], reverse=True)
+        return [keyword for keyword, freq in sorted_keywords[:max_keywords]]
+    
+    def analyze(self, text, max_keywords=10, strip=True):
+        """
+        Pré-processa o texto e extrai palavras-chave com um único parse do spaCy.
+        
+        O mesmo Doc fornece os lemas, as palavras-chave por classe gramatical e
+        as entidades, evitando o segundo parse sobre o texto lematizado que
+        ``preprocess_text`` seguido de ``extract_keywords`` fazia. Por isso as
+        palavras-chave diferem das de ``extract_keywords(preprocess_text(...))``:
+        classe gramatical e entidades vêm do texto sem stopwords (e não do texto
+        lematizado), e cada palavra-chave é o lema da palavra original.
+        
+        Com ``max_keywords=0`` as palavras-chave não são extraídas; com
+        ``strip=False`` o texto já chega sem histórico e assinatura.
+        
+        Retorna um dicionário com ``processed_text``, ``keywords``, o tempo de
+        CPU gasto no spaCy (``spacy_cpu_ms``), a estimativa do CPU economizado
+        com o segundo parse evitado (``spacy_cpu_saved_ms``: CPU do parse
+        proporcional ao número de lemas, que seriam os tokens do segundo parse)
+        e os bytes de histórico, avisos e assinatura removidos (``stripped_bytes``).
+        """
+        spacy_cpu_ms = 0.0
+        spacy_cpu_saved_ms = 0.0
+        stripped_bytes = 0
+        try:
+            # 0. Histórico citado, avisos legais e assinatura
+            if strip:
+                with track_stage('strip_boilerplate'):
+                    text, stripped_bytes = self.strip_boilerplate(text)
             
-            # Adicionar substantivos e adjetivos importantes
-            for token in doc:
-                if (token.pos_ in ['NOUN', 'ADJ'] and 
-                    not token.is_stop and 
-                    not token.is_punct and 
-                    len(token.text) > 3):
-                    keywords.append(token.lemma_.lower())
+            # 1. Limpeza básica
+            with track_stage('clean_text'):
+                cleaned_text = self.clean_text(text)
             
-            # Remover duplicatas e retornar as mais frequentes
-            keyword_freq = {}
-            for keyword in keywords:
-                keyword_freq[keyword] = keyword_freq.get(keyword, 0) + 1
+            # 2. Remoção de stopwords
+            with track_stage('remove_stopwords'):
+                no_stopwords = self.remove_stopwords(cleaned_text)
             
-            sorted_keywords = sorted(keyword_freq.items(), key=lambda x: x[1], reverse=True)
-            return [keyword for keyword, freq in sorted_keywords[:max_keywords]]
+            if not self.nlp:
+                processed_text = no_stopwords
+                with track_stage('extract_keywords'):
+                    keywords = self._keywords_by_frequency(processed_text, max_keywords) if max_keywords else []
+            else:
+                # 3. Parse único: lemas, palavras-chave e entidades do mesmo Doc
+                started = time.process_time()
+                with track_stage('spacy_parse'):
+                    doc = self.nlp(no_stopwords)
+                parse_cpu_ms = (time.process_time() - started) * 1000
+                with track_stage('lemmatize'):
+                    processed_text = self._lemmas_from_doc(doc)
+                with track_stage('extract_keywords'):
+                    keywords = self._keywords_from_doc(doc, max_keywords) if max_keywords else []
+                spacy_cpu_ms = (time.process_time() - started) * 1000
+                
+                # O parse é aproximadamente linear no número de tokens
+                if len(doc):
+                    spacy_cpu_saved_ms = parse_cpu_ms * len(processed_text.split()) / len(doc)
             
         except Exception as e:
-            logger.error(f"Erro na extração de palavras-chave: {str(e)}")
+            logger.error(f"Erro na análise do texto: {str(e)}")
+            processed_text = text.lower()
+            keywords = []
+        
+        return {
+            'processed_text': processed_text,
+            'keywords': keywords,
+            'spacy_cpu_ms': round(spacy_cpu_ms, 2),
+            'spacy_cpu_saved_ms': round(spacy_cpu_saved_ms, 2),
+            'spacy_parses': 1 if self.nlp else 0,
+            'stripped_bytes': stripped_bytes
+        }
+    
+    def preprocess_many(self, texts, batch_size=64, n_process=1, max_keywords=10, strip=True):
+        """
+        Versão em lote de ``analyze`` baseada em ``nlp.pipe``.
+        
+        Retorna, para cada texto de entrada e na mesma ordem, um dicionário com
+        ``processed_text``, ``keywords`` e ``stripped_bytes`` idênticos aos da versão por texto.
+        ``n_process > 1`` distribui o spaCy entre vários processos. Com
+        ``strip=False`` os textos não passam por ``strip_boilerplate`` (já
+        foram limpos antes, como o corpo em ``parse_message``).
+        """
+        texts = list(texts)
+        if not texts:
             return []
+        
+        try:
+            # Etapas medidas para o lote inteiro
+            with track_stage('batch_strip_boilerplate'):
+                stripped = [self.strip_boilerplate(text) if strip else (text, 0) for text in texts]
+            with track_stage('batch_clean_text'):
+                cleaned_texts = self.clean_many([text for text, _ in stripped])
+            with track_stage('batch_remove_stopwords'):
+                no_stopwords = self.remove_stopwords_many(cleaned_texts)
+            
+            if not self.nlp:
+                with track_stage('batch_extract_keywords'):
+                    return [
+                        {
+                            'processed_text': text,
+                            'keywords': self._keywords_by_frequency(text, max_keywords) if max_keywords else [],
+                            'stripped_bytes': stripped_bytes
+                        }
+                        for text, (_, stripped_bytes) in zip(no_stopwords, stripped)
+                    ]
+            
+            # nlp.pipe é um gerador: parse, lemas e palavras-chave são intercalados
+            results = []
+            with track_stage('batch_spacy'):
+                docs = self.nlp.pipe(no_stopwords, batch_size=batch_size, n_process=n_process)
+                for doc, (_, stripped_bytes) in zip(docs, stripped):
+                    results.append({
+                        'processed_text': self._lemmas_from_doc(doc),
+                        'keywords': self._keywords_from_doc(doc, max_keywords) if max_keywords else [],
+                        'stripped_bytes': stripped_bytes
+                    })
+            return results
+            
+        except Exception as e:
+            # Um item problemático não deve derrubar o lote: processar um a um
+            logger.error(f"Erro no pré-processamento em lote: {str(e)}. Processando individualmente.")
+            return [
+                {
+                    key: value for key, value in self.analyze(text, max_keywords, strip).items()
+                    if key in ('processed_text', 'keywords', 'stripped_bytes')
+                }
+                for text in texts
+            ]
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Gerador determinístico de um corpus sintético de emails em português.
+
+Tipos de entrada: ``short`` (poucas frases), ``long`` (dezenas de parágrafos),
+``html`` (marcação pesada), ``links`` (muitas URLs) e ``pdf`` (PDF de várias
+páginas gerado sem dependências externas). Cada email tem um rótulo esperado
+(Produtivo/Improdutivo) para testes de acurácia.
+
+Exemplo:
+    python benchmarks/corpus.py --output /tmp/corpus --per-kind 50
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+KINDS = ('short', 'long', 'html', 'links', 'pdf')
+
+PRODUCTIVE_SENTENCES = (
+    'Segue em anexo o relatório de andamento do projeto com os indicadores da semana.',
+    'Precisamos marcar uma reunião para revisar o cronograma de entrega com o cliente.',
+    'A proposta comercial foi aprovada e o contrato deve ser assinado até sexta-feira.',
+    'Identificamos um bug na funcionalidade de exportação; a correção já está em teste.',
+    'Por favor, revise a especificação dos requisitos antes da apresentação de amanhã.',
+    'O orçamento do segundo trimestre precisa de aprovação da diretoria até o prazo.',
+    'Enviei o feedback sobre a documentação técnica e as melhorias sugeridas.',
+    'A análise de desempenho do sistema mostrou gargalos na camada de banco de dados.',
+    'Confirmo a implementação da nova integração no ambiente de homologação.',
+    'O deadline do desenvolvimento foi ajustado para acomodar a revisão de segurança.',
+)
+
+UNPRODUCTIVE_SENTENCES = (
+    'PROMOÇÃO IMPERDÍVEL! Ganhe 70% de desconto em todos os produtos só hoje.',
+    'Você foi sorteado! Clique aqui para resgatar seu prêmio grátis agora mesmo.',
+    'Oferta exclusiva de liquidação: compre agora e receba frete grátis.',
+    'Assine nossa newsletter e receba as melhores ofertas de marketing da semana.',
+    'Parabéns, seu cupom de desconto está esperando por você na loja online.',
+    'Últimas horas da mega liquidação com preços que você nunca viu.',
+    'Ganhe dinheiro fácil trabalhando de casa, sem experiência necessária.',
+    'Sua conta será bloqueada, confirme seus dados clicando no link abaixo.',
+    'Loteria acumulada! Aposte agora e concorra ao maior prêmio do ano.',
+    'Propaganda especial: conheça os lançamentos da nossa coleção de verão.',
+)
+
+GREETINGS = ('Olá equipe,', 'Bom dia,', 'Prezados,', 'Oi pessoal,', 'Boa tarde a todos,')
+SIGNATURES = ('Atenciosamente,\nMaria Silva', 'Abraços,\nJoão Souza', 'Obrigado,\nAna Costa', 'Att.,\nCarlos Lima')
+DOMAINS = ('exemplo.com.br', 'loja-ofertas.com', 'empresa.com', 'promo.net', 'projetos.org')
+
+def _sentences(rng, label, count):
+    pool = PRODUCTIVE_SENTENCES if label == 'Produtivo' else UNPRODUCTIVE_SENTENCES
+    return [rng.choice(pool) for _ in range(count)]
+
+def _url(rng):
+    path = '/'.join(rng.choice(('promo', 'oferta', 'docs', 'relatorio', 'click', 'id')) for _ in range(rng.randint(1, 3)))
+    return f'https://www.{rng.choice(DOMAINS)}/{path}?utm_source=email&ref={rng.randint(1000, 99999)}'
+
+def make_short(rng, label):
+    return f"{rng.choice(GREETINGS)}\n{' '.join(_sentences(rng, label, rng.randint(1, 3)))}\n{rng.choice(SIGNATURES)}"
+
+def make_long(rng, label):
+    paragraphs = [' '.join(_sentences(rng, label, rng.randint(4, 8))) for _ in range(rng.randint(30, 60))]
+    return f"{rng.choice(GREETINGS)}\n\n" + '\n\n'.join(paragraphs) + f"\n\n{rng.choice(SIGNATURES)}"
+
+def make_html(rng, label):
+    blocks = []
+    for sentence in _sentences(rng, label, rng.randint(5, 12)):
+        blocks.append(
+            f'<tr><td style="font-family:Arial,sans-serif;font-size:14px;color:#333333;padding:8px 16px">'
+            f'<p class="content">{sentence} &nbsp;&amp;&nbsp;</p></td></tr>'
+        )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><style>body{margin:0}.content{line-height:1.5}</style>'
+        f'</head><body><table width="100%" cellpadding="0" cellspacing="0">{"".join(blocks)}</table>'
+        f'<div style="font-size:10px">{rng.choice(SIGNATURES)}</div></body></html>'
+    )
+
+def make_links(rng, label):
+    lines = []
+    for sentence in _sentences(rng, label, rng.randint(3, 6)):
+        lines.append(sentence)
+        lines.extend(f'Acesse: {_url(rng)}' for _ in range(rng.randint(2, 5)))
+    return f"{rng.choice(GREETINGS)}\n" + '\n'.join(lines) + f"\n{rng.choice(SIGNATURES)}"
+
+def make_pdf_pages(rng, label):
+    pages = []
+    for _ in range(rng.randint(2, 6)):
+        lines = []
+        for sentence in _sentences(rng, label, rng.randint(15, 25)):
+            # Quebrar frases longas para caber na largura da página
+            words = sentence.split()
+            for start in range(0, len(words), 10):
+                lines.append(' '.join(words[start:start + 10]))
+        pages.append('\n'.join(lines[:50]))
+    return pages
+
+def _pdf_escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def make_pdf(pages):
+    """Gera um PDF mínimo (Helvetica, WinAnsi) com uma página por texto."""
+    objects = []
+    count = len(pages)
+    kids = ' '.join(f'{3 + 2 * i} 0 R' for i in range(count))
+    font = 3 + 2 * count
+    objects.append(b'<< /Type /Catalog /Pages 2 0 R >>')
+    objects.append(f'<< /Type /Pages /Kids [{kids}] /Count {count} >>'.encode())
+
+    for index, text in enumerate(pages):
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * index} 0 R '
+            f'/Resources << /Font << /F1 {font} 0 R >> >> >>'.encode()
+        )
+        body = ''.join(
+            f'BT /F1 11 Tf 50 {750 - 14 * line_number} Td ({_pdf_escape(line)}) Tj ET\n'
+            for line_number, line in enumerate(text.split('\n'))
+        ).encode('cp1252', errors='replace')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(body) + body + b'endstream')
+
+    objects.append(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+
+    output = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+
+    xref = len(output)
+    output += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    output += b''.join(f'{offset:010d} 00000 n \n'.encode() for offset in offsets)
+    output += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return output
+
+GENERATORS = {'short': make_short, 'long': make_long, 'html': make_html, 'links': make_links}
+
+def generate_corpus(per_kind=20, seed=42, kinds=KINDS):
+    """
+    Gera o corpus como lista de dicionários {id, kind, label, text}.
+
+    Itens ``pdf`` também trazem ``pdf`` (bytes); ``text`` é o texto das páginas.
+    """
+    rng = random.Random(seed)
+    items = []
+    for kind in kinds:
+        for index in range(per_kind):
+            label = 'Produtivo' if index % 2 == 0 else 'Improdutivo'
+            item = {'id': f'{kind}-{index}', 'kind': kind, 'label': label}
+            if kind == 'pdf':
+                pages = make_pdf_pages(rng, label)
+                item['text'] = '\n'.join(pages)
+                item['pdf'] = make_pdf(pages)
+            else:
+                item['text'] = GENERATORS[kind](rng, label)
+            items.append(item)
+    return items
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera um corpus sintético de emails em português.')
+    parser.add_argument('--output', required=True, help='Pasta de saída (corpus.jsonl e PDFs)')
+    parser.add_argument('--per-kind', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output, exist_ok=True)
+    with open(os.path.join(args.output, 'corpus.jsonl'), 'w', encoding='utf-8') as file:
+        for item in generate_corpus(args.per_kind, args.seed):
+            record = {key: value for key, value in item.items() if key != 'pdf'}
+            if 'pdf' in item:
+                record['pdf_path'] = f"{item['id']}.pdf"
+                with open(os.path.join(args.output, record['pdf_path']), 'wb') as pdf_file:
+                    pdf_file.write(item['pdf'])
+            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    print(f"Corpus gravado em {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
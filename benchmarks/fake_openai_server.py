@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita o endpoint de chat completions da OpenAI.
+
+Responde no mesmo formato da API real, sem custo e sem limite de taxa, com
+distribuição de latência, tempo de geração por token, taxa de erros HTTP e
+taxa de respostas malformadas configuráveis. Pedidos com ``logprobs`` recebem
+um rótulo de uma letra (P/I) com os logprobs; a justificativa só é gerada se
+o prompt ou o JSON Schema a pedir. Aponte o classificador para ele com
+OPENAI_BASE_URL=http://127.0.0.1:<porta>/v1 e qualquer OPENAI_API_KEY.
+
+Exemplo:
+    python benchmarks/fake_openai_server.py --port 8081 --latency 0.5 --latency-dist lognormal \\
+        --token-latency 0.01 --error-rate 0.02 --malformed-rate 0.05
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+# Blocos de email do prompt em pacote: <email id="N">...</email>
+PACKED_EMAIL_RE = re.compile(r'<email id="(\d+)">\n(.*?)\n</email>', re.DOTALL)
+
+UNPRODUCTIVE_HINTS = ('promoção', 'promocao', 'desconto', 'grátis', 'gratis', 'ganhe', 'oferta', 'sorteio', 'spam')
+
+def classify_fake(text):
+    """Classificação determinística usada nas respostas simuladas."""
+    lowered = text.lower()
+    if any(hint in lowered for hint in UNPRODUCTIVE_HINTS):
+        return 'Improdutivo', 0.92
+    return 'Produtivo', 0.88
+
+def label_logprobs(category, confidence):
+    """Bloco ``logprobs`` de uma resposta de um token (P ou I), no formato da API."""
+    chosen, other = ('P', 'I') if category == 'Produtivo' else ('I', 'P')
+    top_logprobs = [
+        {'token': chosen, 'logprob': math.log(confidence), 'bytes': list(chosen.encode())},
+        {'token': other, 'logprob': math.log(1 - confidence), 'bytes': list(other.encode())}
+    ]
+    return {'content': [dict(top_logprobs[0], top_logprobs=top_logprobs)], 'refusal': None}
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Handler HTTP/1.1 (keep-alive) para POST .../chat/completions."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._send_json(400, {'error': {'message': 'JSON inválido', 'type': 'invalid_request_error'}})
+
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            return self._send_json(404, {'error': {'message': 'Rota não encontrada', 'type': 'invalid_request_error'}})
+
+        server = self.server
+        messages = request.get('messages') or []
+        prompt_chars = sum(len(str(message.get('content', ''))) for message in messages)
+        server.stats_increment('requests')
+        server.stats_increment('prompt_chars', prompt_chars)
+
+        latency, outcome = server.draw()
+
+        if outcome == 'error':
+            time.sleep(latency)
+            server.stats_increment('errors')
+            return self._send_json(server.error_status, {
+                'error': {'message': 'Erro simulado pelo servidor fake.', 'type': 'server_error'}
+            })
+
+        user_text = messages[-1].get('content', '') if messages else ''
+        system_text = str(messages[0].get('content', '')) if messages else ''
+        logprobs = None
+        packed_emails = PACKED_EMAIL_RE.findall(user_text)
+        if packed_emails:
+            # Modo em pacote: um objeto por email, sem justificativa
+            items = []
+            for email_id, email_text in packed_emails:
+                category, confidence = classify_fake(email_text)
+                items.append({'id': int(email_id), 'category': category, 'confidence': confidence})
+            content = json.dumps(items, ensure_ascii=False)
+            server.stats_increment('packed_emails', len(items))
+        elif request.get('logprobs'):
+            # Rótulo de um token, confiança nos logprobs
+            category, confidence = classify_fake(user_text)
+            content = 'P' if category == 'Produtivo' else 'I'
+            logprobs = label_logprobs(category, confidence)
+        else:
+            category, confidence = classify_fake(user_text)
+            result = {'category': category, 'confidence': confidence}
+            if 'reasoning' in system_text or 'reasoning' in json.dumps(request.get('response_format') or {}):
+                result['reasoning'] = 'Resposta simulada pelo servidor fake: o email trata de assuntos de trabalho.'
+            content = json.dumps(result, ensure_ascii=False)
+
+        if outcome == 'malformed':
+            # JSON truncado, como uma resposta cortada por max_tokens
+            server.stats_increment('malformed')
+            content = content[:len(content) // 2]
+
+        prompt_tokens = prompt_chars // 4
+        completion_tokens = max(1, len(content) // 4)
+        server.stats_increment('completion_tokens', completion_tokens)
+        # A geração cresce com os tokens de saída
+        time.sleep(latency + server.token_latency * completion_tokens)
+
+        choice = {
+            'index': 0,
+            'message': {'role': 'assistant', 'content': content},
+            'logprobs': logprobs,
+            'finish_reason': 'length' if outcome == 'malformed' else 'stop'
+        }
+        self._send_json(200, {
+            'id': f'chatcmpl-{uuid.uuid4().hex}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'fake-model'),
+            'choices': [choice],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        })
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """
+    Servidor com uma thread por conexão, para suportar muitas chamadas simultâneas.
+
+    ``latency`` é a média (fixed, uniform, exponential) ou a mediana (lognormal)
+    em segundos; ``jitter`` é a meia largura da uniforme e ``sigma`` o desvio do
+    logaritmo na lognormal. ``token_latency`` (s) é somado por token gerado.
+    """
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, latency=0.5, latency_dist='fixed', jitter=0.1, sigma=0.5,
+                 token_latency=0.0, error_rate=0.0, error_status=500, malformed_rate=0.0, seed=None):
+        if latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f'Distribuição de latência desconhecida: {latency_dist}')
+        super().__init__(address, FakeOpenAIHandler)
+        self.latency = latency
+        self.latency_dist = latency_dist
+        self.jitter = jitter
+        self.sigma = sigma
+        self.token_latency = token_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.malformed_rate = malformed_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._stats = {'requests': 0, 'errors': 0, 'malformed': 0}
+        self._stats_lock = threading.Lock()
+
+    def draw(self):
+        """Sorteia a latência e o resultado ('ok', 'error' ou 'malformed') de uma chamada."""
+        with self._random_lock:
+            rng = self._random
+            if self.latency <= 0:
+                latency = 0.0
+            elif self.latency_dist == 'uniform':
+                latency = rng.uniform(max(0.0, self.latency - self.jitter), self.latency + self.jitter)
+            elif self.latency_dist == 'exponential':
+                latency = rng.expovariate(1 / self.latency)
+            elif self.latency_dist == 'lognormal':
+                latency = rng.lognormvariate(math.log(self.latency), self.sigma)
+            else:
+                latency = self.latency
+
+            roll = rng.random()
+            if roll < self.error_rate:
+                outcome = 'error'
+            elif roll < self.error_rate + self.malformed_rate:
+                outcome = 'malformed'
+            else:
+                outcome = 'ok'
+        return latency, outcome
+
+    def handle_error(self, request, client_address):
+        # Clientes que desistem (prazo esgotado, hedge cancelado) fecham a conexão antes da resposta
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def stats_increment(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] = self._stats.get(key, 0) + amount
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+def start_in_thread(host='127.0.0.1', port=0, **kwargs):
+    """Inicia o servidor em uma thread daemon e o retorna (porta 0 = livre)."""
+    server = FakeOpenAIServer((host, port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def add_server_arguments(parser):
+    """Opções do servidor fake, compartilhadas com o teste de carga."""
+    parser.add_argument('--latency', type=float, default=0.5, help='Latência média (mediana na lognormal) em segundos')
+    parser.add_argument('--latency-dist', choices=LATENCY_DISTRIBUTIONS, default='fixed')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Meia largura da distribuição uniforme em segundos')
+    parser.add_argument('--sigma', type=float, default=0.5, help='Desvio do logaritmo na distribuição lognormal')
+    parser.add_argument('--token-latency', type=float, default=0.0, help='Segundos de geração por token de saída')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fração de respostas com erro HTTP')
+    parser.add_argument('--error-status', type=int, default=500, help='Status HTTP dos erros simulados (ex.: 429, 503)')
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='Fração de respostas com JSON truncado')
+    parser.add_argument('--seed', type=int, default=None, help='Semente do sorteio de latência e falhas')
+
+def server_options(args):
+    """Argumentos de FakeOpenAIServer a partir das opções da linha de comando."""
+    return {
+        'latency': args.latency,
+        'latency_dist': args.latency_dist,
+        'jitter': args.jitter,
+        'sigma': args.sigma,
+        'token_latency': args.token_latency,
+        'error_rate': args.error_rate,
+        'error_status': args.error_status,
+        'malformed_rate': args.malformed_rate,
+        'seed': args.seed
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor fake do endpoint de chat completions da OpenAI.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer((args.host, args.port), **server_options(args))
+    print(f"Servidor fake da OpenAI em {server.base_url} (latência {args.latency}s {args.latency_dist}, "
+          f"erros {args.error_rate:.0%}, malformadas {args.malformed_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(json.dumps(server.stats()))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Teste de carga de /api/classify contra o servidor fake da OpenAI.
+
+Para cada modo (sync: gunicorn + Flask, async: uvicorn + asgi.py) e cada número
+de workers, inicia a aplicação e mede vazão e latência p50/p95/p99 em cada
+nível de concorrência. A latência, os erros e as respostas malformadas da
+OpenAI simulada são configuráveis (ver fake_openai_server.py).
+
+Cada requisição usa um texto único, para que o cache não interfira.
+
+Exemplos:
+    python benchmarks/loadtest.py --workers 1 2 4 --concurrency 8 32 64 --requests 256
+    python benchmarks/loadtest.py --modes sync async --latency 0.4 --latency-dist lognormal \\
+        --error-rate 0.05 --malformed-rate 0.05
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_openai_server import add_server_arguments, server_options, start_in_thread  # noqa: E402
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+SAMPLE_TEXTS = (
+    'Olá, preciso de suporte com o sistema de faturamento, o relatório {n} não abre.',
+    'Promoção imperdível! Ganhe {n}% de desconto em todos os produtos.',
+    'Bom dia, segue o status do chamado {n}; aguardo retorno sobre o prazo.',
+    'Feliz natal e um próspero ano novo para toda a equipe! Mensagem {n}.'
+)
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def server_command(mode, port, workers):
+    """Comando que inicia a aplicação no modo pedido."""
+    if mode == 'sync':
+        return [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers),
+                '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'app:app']
+    return [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', str(port),
+            '--workers', str(workers), '--log-level', 'warning']
+
+def wait_healthy(base_url, timeout=60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f'{base_url}/api/health', timeout=2) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.25)
+    return False
+
+def post_classify(base_url, text, timeout):
+    """Envia uma classificação e retorna (latência em segundos, sucesso, camada da resposta)."""
+    body = json.dumps({'text': text}).encode('utf-8')
+    request = urllib.request.Request(f'{base_url}/api/classify', data=body,
+                                     headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            payload = json.loads(response.read())
+            ok = response.status == 200 and payload.get('success', False)
+            tier = payload.get('metadata', {}).get('tier', 'unknown')
+    except (urllib.error.URLError, ConnectionError, OSError, ValueError):
+        ok, tier = False, 'http_error'
+    return time.perf_counter() - started, ok, tier
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+def run_load(base_url, total_requests, concurrency, timeout, offset=0):
+    texts = [SAMPLE_TEXTS[n % len(SAMPLE_TEXTS)].format(n=n) for n in range(offset, offset + total_requests)]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(lambda text: post_classify(base_url, text, timeout), texts))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, _, _ in outcomes]
+    return {
+        'requests': total_requests,
+        'concurrency': concurrency,
+        'errors': sum(1 for _, ok, _ in outcomes if not ok),
+        'tiers': dict(Counter(tier for _, _, tier in outcomes)),
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(total_requests / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 1)
+    }
+
+def benchmark_server(mode, workers, args, fake_server):
+    """Inicia a aplicação com ``workers`` processos e mede cada nível de concorrência."""
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    env = dict(os.environ,
+               OPENAI_API_KEY='fake-key',
+               OPENAI_BASE_URL=fake_server.base_url,
+               CACHE_ENABLED='false')
+
+    process = subprocess.Popen(server_command(mode, port, workers), cwd=BACKEND_DIR, env=env)
+    results = []
+    try:
+        if not wait_healthy(base_url):
+            raise RuntimeError(f'O servidor no modo {mode} não respondeu ao health check.')
+        # Aquecimento: abre conexões e carrega modelos em todos os workers
+        run_load(base_url, workers * 4, workers * 2, args.timeout)
+
+        offset = workers * 4
+        for concurrency in args.concurrency:
+            before = fake_server.stats()
+            result = run_load(base_url, args.requests, concurrency, args.timeout, offset)
+            after = fake_server.stats()
+            offset += args.requests
+
+            result.update({'mode': mode, 'workers': workers})
+            result['openai'] = {key: after.get(key, 0) - before.get(key, 0)
+                                for key in ('requests', 'errors', 'malformed')}
+            results.append(result)
+            print(json.dumps(result, ensure_ascii=False))
+        return results
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def print_table(results):
+    print(f"\n{'modo':<6} {'workers':>7} {'conc.':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'erros':>6} {'fallback':>9}")
+    for result in results:
+        print(f"{result['mode']:<6} {result['workers']:>7} {result['concurrency']:>6} "
+              f"{result['throughput_rps']:>9.1f} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} "
+              f"{result['p99_ms']:>9.1f} {result['errors']:>6} {result['tiers'].get('fallback', 0):>9}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Teste de carga de /api/classify com a OpenAI simulada.')
+    parser.add_argument('--modes', nargs='+', choices=['sync', 'async'], default=['sync'])
+    parser.add_argument('--workers', type=int, nargs='+', default=[2], help='Números de workers a testar')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[64], help='Níveis de concorrência a testar')
+    parser.add_argument('--requests', type=int, default=256, help='Requisições por nível de concorrência')
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--output', help='Arquivo JSON para salvar os resultados')
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+
+    fake_server = start_in_thread(**server_options(args))
+    results = []
+    try:
+        for mode in args.modes:
+            for workers in args.workers:
+                results.extend(benchmark_server(mode, workers, args, fake_server))
+    finally:
+        fake_server.shutdown()
+
+    print_table(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2, ensure_ascii=False)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
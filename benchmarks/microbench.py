@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks do pipeline de texto e classificação.
+
+Mede cada etapa sobre o corpus sintético (benchmarks/corpus.py), com a OpenAI
+simulada em memória, e grava os resultados em JSON. O comando ``compare``
+compara dois resultados e termina com código 1 se houver regressão.
+
+Exemplos:
+    python benchmarks/microbench.py run --output benchmarks/results/base.json
+    python benchmarks/microbench.py run --output /tmp/new.json --filter clean_text
+    python benchmarks/microbench.py compare benchmarks/results/base.json /tmp/new.json --threshold 0.1
+"""
+
+import argparse
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(BENCHMARKS_DIR, '..', 'backend')
+sys.path.insert(0, BENCHMARKS_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from corpus import generate_corpus  # noqa: E402
+
+TEXT_KINDS = ('short', 'long', 'html', 'links')
+
+STUB_CONTENT = json.dumps({'category': 'Produtivo', 'confidence': 0.9, 'reasoning': 'Resposta simulada.'})
+
+class StubCompletions:
+    """Imita ``client.chat.completions`` respondendo imediatamente, sem rede."""
+
+    def create(self, **kwargs):
+        message = SimpleNamespace(content=STUB_CONTENT)
+        usage = SimpleNamespace(prompt_tokens=len(str(kwargs.get('messages'))) // 4, completion_tokens=20)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+class StubOpenAI:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=StubCompletions())
+
+def build_pipeline():
+    """Cria o TextProcessor e um EmailClassifier com a OpenAI simulada."""
+    from utils.text_processor import TextProcessor
+    from utils.email_classifier import EmailClassifier
+
+    class StubbedEmailClassifier(EmailClassifier):
+        openai_client = StubOpenAI()
+
+    text_processor = TextProcessor(nltk_data_dir=os.path.join(BACKEND_DIR, 'nltk_data'))
+    email_classifier = StubbedEmailClassifier(openai_model='stub')
+    return text_processor, email_classifier
+
+def define_benchmarks(text_processor, email_classifier, corpus):
+    """
+    Retorna {nome: (função, entradas)}; cada entrada é processada uma vez por rodada.
+
+    As entradas de cada etapa são as saídas da etapa anterior, como no pipeline real.
+    """
+    by_kind = {}
+    for item in corpus:
+        by_kind.setdefault(item['kind'], []).append(item)
+
+    benchmarks = {}
+    for kind in TEXT_KINDS:
+        texts = [item['text'] for item in by_kind.get(kind, [])]
+        if not texts:
+            continue
+        cleaned = [text_processor.clean_text(text) for text in texts]
+        no_stopwords = [text_processor.remove_stopwords(text) for text in cleaned]
+        processed = [text_processor.analyze(text)['processed_text'] for text in texts]
+
+        benchmarks[f'clean_text[{kind}]'] = (text_processor.clean_text, texts)
+        benchmarks[f'remove_stopwords[{kind}]'] = (text_processor.remove_stopwords, cleaned)
+        benchmarks[f'lemmatize_text[{kind}]'] = (text_processor.lemmatize_text, no_stopwords)
+        benchmarks[f'extract_keywords[{kind}]'] = (text_processor.extract_keywords, texts)
+        benchmarks[f'analyze[{kind}]'] = (text_processor.analyze, texts)
+        benchmarks[f'classify_local[{kind}]'] = (email_classifier._classify_local, processed)
+        benchmarks[f'classify_email[{kind}]'] = (email_classifier.classify_email, processed)
+
+    pdfs = [item['pdf'] for item in by_kind.get('pdf', [])]
+    if pdfs:
+        benchmarks['extract_text_from_pdf[pdf]'] = (
+            lambda data: text_processor.extract_text_from_pdf(io.BytesIO(data)), pdfs
+        )
+
+    return benchmarks
+
+def time_benchmark(function, inputs, repeat):
+    """Tempo por item (µs) em ``repeat`` rodadas sobre todas as entradas, após um aquecimento."""
+    for value in inputs:
+        function(value)
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter_ns()
+            for value in inputs:
+                function(value)
+            samples.append((time.perf_counter_ns() - started) / 1000 / len(inputs))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        'median_us': round(statistics.median(samples), 3),
+        'min_us': round(min(samples), 3),
+        'mean_us': round(statistics.mean(samples), 3),
+        'stdev_us': round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        'items': len(inputs),
+        'repeat': repeat
+    }
+
+def environment_info(text_processor):
+    """Dados do ambiente gravados junto dos resultados (comparações só fazem sentido no mesmo ambiente)."""
+    try:
+        import nltk
+        nltk.data.find('tokenizers/punkt')
+        punkt = True
+    except (ImportError, LookupError):
+        punkt = False
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'spacy_model_loaded': text_processor.spacy_model_loaded,
+        'nltk_punkt': punkt,
+        'nltk_stopwords': bool(text_processor.stop_words)
+    }
+
+def run(args):
+    logging.disable(logging.CRITICAL)
+    corpus = generate_corpus(per_kind=args.per_kind, seed=args.seed)
+    text_processor, email_classifier = build_pipeline()
+    benchmarks = define_benchmarks(text_processor, email_classifier, corpus)
+
+    pattern = re.compile(args.filter) if args.filter else None
+    results = {}
+    for name, (function, inputs) in benchmarks.items():
+        if pattern and not pattern.search(name):
+            continue
+        results[name] = time_benchmark(function, inputs, args.repeat)
+        print(f"{name:<34} {results[name]['median_us']:>12.1f} µs/item  (min {results[name]['min_us']:.1f})")
+
+    output = {
+        'meta': {
+            'created_at': datetime.now().isoformat(),
+            'per_kind': args.per_kind,
+            'seed': args.seed,
+            **environment_info(text_processor)
+        },
+        'results': results
+    }
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(output, file, indent=2, ensure_ascii=False)
+        print(f"Resultados gravados em {args.output}")
+    return 0
+
+def compare(args):
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)
+    with open(args.current, encoding='utf-8') as file:
+        current = json.load(file)
+
+    # Diferenças de ambiente invalidam a comparação
+    for key in ('python', 'cpu_count', 'spacy_model_loaded', 'nltk_punkt', 'nltk_stopwords', 'per_kind', 'seed'):
+        if baseline['meta'].get(key) != current['meta'].get(key):
+            print(f"AVISO: '{key}' difere ({baseline['meta'].get(key)} -> {current['meta'].get(key)})")
+
+    stat = f'{args.stat}_us'
+    regressions = 0
+    print(f"{'benchmark':<34} {'base µs':>12} {'atual µs':>12} {'razão':>8}")
+    for name in sorted(set(baseline['results']) | set(current['results'])):
+        before = baseline['results'].get(name)
+        after = current['results'].get(name)
+        if before is None or after is None:
+            before_text = '-' if before is None else f"{before[stat]:.1f}"
+            after_text = '-' if after is None else f"{after[stat]:.1f}"
+            print(f"{name:<34} {before_text:>12} {after_text:>12}")
+            continue
+
+        ratio = after[stat] / before[stat] if before[stat] else float('inf')
+        flag = ''
+        if ratio > 1 + args.threshold:
+            flag = 'REGRESSÃO'
+            regressions += 1
+        elif ratio < 1 - args.threshold:
+            flag = 'melhoria'
+        print(f"{name:<34} {before[stat]:>12.1f} {after[stat]:>12.1f} {ratio:>7.2f}x {flag}")
+
+    if regressions:
+        print(f"{regressions} regressão(ões) acima de {args.threshold:.0%}.")
+        return 1
+    print("Nenhuma regressão.")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Microbenchmarks do pipeline de classificação.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Executa os benchmarks')
+    run_parser.add_argument('--output', help='Arquivo JSON de resultados')
+    run_parser.add_argument('--per-kind', type=int, default=20, help='Emails por tipo no corpus')
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--repeat', type=int, default=5, help='Rodadas por benchmark')
+    run_parser.add_argument('--filter', help='Expressão regular para selecionar benchmarks')
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subparsers.add_parser('compare', help='Compara dois resultados')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10, help='Variação tolerada (0.10 = 10%%)')
+    compare_parser.add_argument('--stat', choices=['median', 'min'], default='median',
+                                help='Estatística comparada (min é menos sensível a ruído)')
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Mede o tempo de inicialização da aplicação.
+
+- ``import``: importação de app.py em um processo novo (com e sem LAZY_LOAD_MODELS)
+  e latência da primeira classificação, que paga o carregamento adiado.
+- ``gunicorn``: tempo até o primeiro /api/health respondido, com e sem --preload.
+
+Exemplo:
+    python benchmarks/startup_time.py --runs 5 --workers 4
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+IMPORT_PROBE = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+client.post('/api/classify', json={'text': 'Reunião do projeto amanhã às 10h para revisar o cronograma.'})
+first_request = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_request_ms': (first_request - imported) * 1000
+}))
+"""
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def base_env(**overrides):
+    env = dict(os.environ, CACHE_ENABLED='false', OPENAI_API_KEY='')
+    env.update(overrides)
+    return env
+
+def measure_import(lazy, runs):
+    """Mediana do tempo de importação e da primeira requisição em processos novos."""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, '-c', IMPORT_PROBE], cwd=BACKEND_DIR, capture_output=True, text=True,
+            env=base_env(LAZY_LOAD_MODELS='true' if lazy else 'false'), check=True
+        ).stdout
+        sample = json.loads(output.strip().splitlines()[-1])
+        sample['process_ms'] = (time.perf_counter() - started) * 1000
+        samples.append(sample)
+
+    return {
+        key: round(statistics.median(sample[key] for sample in samples), 1)
+        for key in ('import_ms', 'first_request_ms', 'process_ms')
+    }
+
+def measure_gunicorn(preload, workers, runs):
+    """Mediana do tempo entre iniciar o gunicorn e o primeiro /api/health com sucesso."""
+    samples = []
+    for _ in range(runs):
+        port = free_port()
+        env = base_env(PORT=str(port), WEB_CONCURRENCY=str(workers),
+                       GUNICORN_PRELOAD='true' if preload else 'false')
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-b', f'127.0.0.1:{port}',
+             '--log-level', 'warning', 'app:app'],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            while True:
+                try:
+                    with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/health', timeout=1):
+                        break
+                except (urllib.error.URLError, ConnectionError, OSError):
+                    if time.perf_counter() - started > 120:
+                        raise RuntimeError('O gunicorn não respondeu ao health check.')
+                    time.sleep(0.02)
+            samples.append((time.perf_counter() - started) * 1000)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    return {'ready_ms': round(statistics.median(samples), 1)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tempo de inicialização da aplicação.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--skip-gunicorn', action='store_true')
+    args = parser.parse_args(argv)
+
+    results = {
+        'import_eager': measure_import(False, args.runs),
+        'import_lazy': measure_import(True, args.runs)
+    }
+    if not args.skip_gunicorn:
+        results['gunicorn_preload'] = measure_gunicorn(True, args.workers, args.runs)
+        results['gunicorn_no_preload'] = measure_gunicorn(False, args.workers, args.runs)
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Confere se o tokenizador 'fast' produz os mesmos tokens que o word_tokenize do NLTK.
+
+A comparação é feita sobre a saída de ``clean_text`` (a entrada real de
+``remove_stopwords``) do corpus sintético ou de um corpus.jsonl próprio. Termina
+com código 1 se houver divergência e mostra o tempo de cada tokenizador.
+
+A referência é o próprio ``TextProcessor(tokenizer='nltk')``, o caminho usado
+antes em produção; sem os dados do punkt o script termina com código 2. O
+mesmo teste roda no pytest (backend/tests/test_tokenizer_parity.py).
+
+Exemplos:
+    python benchmarks/tokenizer_parity.py
+    python benchmarks/tokenizer_parity.py --corpus /tmp/corpus/corpus.jsonl
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(BENCHMARKS_DIR, '..', 'backend')
+sys.path.insert(0, BENCHMARKS_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from corpus import generate_corpus  # noqa: E402
+
+def load_texts(args):
+    if args.corpus:
+        with open(args.corpus, encoding='utf-8') as file:
+            return [json.loads(line)['text'] for line in file if line.strip()]
+    return [item['text'] for item in generate_corpus(per_kind=args.per_kind, seed=args.seed)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Paridade do tokenizador 'fast' com o NLTK.")
+    parser.add_argument('--corpus', help='corpus.jsonl (campo text); padrão: corpus sintético')
+    parser.add_argument('--per-kind', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--show', type=int, default=5, help='Divergências exibidas')
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    from utils.text_processor import TextProcessor
+
+    nltk_data_dir = os.path.join(BACKEND_DIR, 'nltk_data')
+    processor = TextProcessor(lazy_load=True, tokenizer='fast', nltk_data_dir=nltk_data_dir)
+    baseline = TextProcessor(lazy_load=True, tokenizer='nltk', nltk_data_dir=nltk_data_dir)
+    baseline.stop_words
+    try:
+        if baseline.tokenizer != 'nltk':
+            raise LookupError
+        baseline._tokenize('teste')
+    except LookupError:
+        print("Tokenizador de referência (NLTK com punkt) indisponível.\n"
+              "Instale os dados: python -m nltk.downloader -d backend/nltk_data punkt")
+        return 2
+    cleaned = processor.clean_many(load_texts(args))
+
+    started = time.perf_counter()
+    fast_tokens = [processor._tokenize(text) for text in cleaned]
+    fast_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    reference_tokens = [baseline._tokenize(text) for text in cleaned]
+    reference_ms = (time.perf_counter() - started) * 1000
+
+    mismatches = [
+        (index, fast, expected)
+        for index, (fast, expected) in enumerate(zip(fast_tokens, reference_tokens))
+        if fast != expected
+    ]
+
+    print(f"Textos: {len(cleaned)}  tokens: {sum(len(tokens) for tokens in reference_tokens)}")
+    print(f"fast: {fast_ms:.1f} ms   word_tokenize: {reference_ms:.1f} ms   "
+          f"({reference_ms / fast_ms if fast_ms else float('inf'):.1f}x)")
+
+    for index, fast, expected in mismatches[:args.show]:
+        diff = sorted(set(fast) ^ set(expected))[:10]
+        print(f"  texto {index}: {len(fast)} vs {len(expected)} tokens; diferenças: {diff}")
+
+    if mismatches:
+        print(f"{len(mismatches)} texto(s) com tokens diferentes.")
+        return 1
+    print("Tokens idênticos em todos os textos.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
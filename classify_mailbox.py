@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Classifica exportações de caixas de email: arquivo mbox, diretório de .eml ou Maildir.
+
+As mensagens são lidas uma a uma, interpretadas (MIME, HTML, anexos .txt/.pdf)
+e classificadas em lotes por um pool de processos, com o mesmo TextProcessor e
+EmailClassifier da API. Os resultados são gravados em JSONL à medida que ficam
+prontos; um checkpoint permite retomar com --resume após uma interrupção.
+
+Exemplos:
+    python classify_mailbox.py caixa.mbox --output resultados.jsonl
+    python classify_mailbox.py ~/Maildir --output resultados.jsonl --workers 4 --resume
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from itertools import islice
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+from utils.mailbox_reader import MAILBOX_FORMATS, detect_format, iter_messages, parse_message  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('classify_mailbox')
+
+# Serviços do processo (criados uma vez por worker em init_worker)
+_text_processor = None
+_email_classifier = None
+_max_attachment_bytes = None
+
+def init_worker(config_name, max_attachment_bytes, log_level):
+    """
+    Cria o TextProcessor e o EmailClassifier do processo.
+
+    Nos processos do Pool (daemônicos, que não podem criar processos filhos)
+    a extração de PDF é sequencial: o paralelismo já vem do próprio Pool.
+    """
+    global _text_processor, _email_classifier, _max_attachment_bytes
+    logging.getLogger().setLevel(log_level)
+
+    from services import load_settings, create_services
+
+    settings = load_settings(config_name)
+    if multiprocessing.current_process().daemon:
+        settings['PDF_PARALLEL_WORKERS'] = 0
+    _text_processor, _email_classifier = create_services(settings)
+    _max_attachment_bytes = max_attachment_bytes
+
+def classify_chunk(chunk):
+    """Interpreta e classifica um lote [(chave, bytes)]; retorna um registro por mensagem, na ordem."""
+    records = []
+    texts, positions = [], []
+    for key, raw in chunk:
+        try:
+            message = parse_message(raw, _text_processor, _max_attachment_bytes)
+        except Exception as e:
+            records.append({'key': key, 'error': f'Mensagem inválida: {str(e)}'})
+            continue
+
+        record = {
+            'key': key,
+            'message_id': message['message_id'],
+            'subject': message['subject'],
+            'from': message['from'],
+            'date': message['date'],
+            'attachments': message['attachments'],
+            'stripped_bytes': message['stripped_bytes']
+        }
+        if message['text'].strip():
+            positions.append(len(records))
+            texts.append(message['text'])
+        else:
+            record['error'] = 'Mensagem sem texto.'
+        records.append(record)
+
+    if not texts:
+        return records
+
+    try:
+        # O corpo já saiu de parse_message sem histórico e assinatura; assunto e anexos não são cortados
+        analyses = _text_processor.preprocess_many(texts, max_keywords=5, strip=False)
+        classifications = _email_classifier.classify_batch([analysis['processed_text'] for analysis in analyses])
+    except Exception as e:
+        logger.error(f"Erro ao classificar o lote: {str(e)}")
+        for position in positions:
+            records[position]['error'] = f'Erro na classificação: {str(e)}'
+        return records
+
+    for position, analysis, classification in zip(positions, analyses, classifications):
+        records[position].update({
+            'classification': classification['category'],
+            'confidence': classification['confidence'],
+            'method': classification.get('method'),
+            'tier': classification.get('metadata', {}).get('tier'),
+            'suggested_response': classification['suggested_response'],
+            'keywords': analysis['keywords']
+        })
+    return records
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def load_checkpoint(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+def save_checkpoint(path, state):
+    """Grava o checkpoint de forma atômica (arquivo temporário + rename)."""
+    state['updated_at'] = datetime.now().isoformat()
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump(state, file, ensure_ascii=False)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+def main(argv=None):
+    """Função principal."""
+    parser = argparse.ArgumentParser(description='Classifica emails de arquivos mbox, diretórios de .eml ou Maildir.')
+    parser.add_argument('source', help='Arquivo mbox, diretório de .eml, arquivo .eml ou pasta Maildir')
+    parser.add_argument('--output', required=True, help='Arquivo JSONL de resultados')
+    parser.add_argument('--format', choices=MAILBOX_FORMATS, help='Formato da origem (padrão: detectado)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processos de classificação (0 = no processo atual)')
+    parser.add_argument('--batch-size', type=int, default=16, help='Mensagens por lote enviado a cada worker')
+    parser.add_argument('--config', default=os.environ.get('FLASK_CONFIG', 'default'), help='Configuração (config.py)')
+    parser.add_argument('--checkpoint', help='Arquivo de checkpoint (padrão: <output>.checkpoint)')
+    parser.add_argument('--resume', action='store_true', help='Continua a partir do checkpoint existente')
+    parser.add_argument('--max-attachment-mb', type=float, default=10.0, help='Anexos maiores não são extraídos')
+    args = parser.parse_args(argv)
+
+    source = os.path.abspath(args.source)
+    mailbox_format = args.format or detect_format(source)
+    checkpoint_path = args.checkpoint or f'{args.output}.checkpoint'
+    max_attachment_bytes = int(args.max_attachment_mb * 1024 * 1024)
+
+    state = load_checkpoint(checkpoint_path) if args.resume else None
+    if state is not None:
+        if state.get('source') != source:
+            logger.error(f"O checkpoint {checkpoint_path} pertence a outra origem: {state.get('source')}")
+            return 1
+        if state.get('completed'):
+            logger.info(f"Classificação já concluída ({state['processed']} mensagens em {args.output}).")
+            return 0
+        logger.info(f"Retomando após {state['processed']} mensagens.")
+    else:
+        state = {'source': source, 'format': mailbox_format, 'processed': 0, 'offset': 0, 'completed': False}
+
+    # Linhas gravadas depois do último checkpoint são descartadas e refeitas
+    output = open(args.output, 'r+b' if state['offset'] else 'wb')
+    output.truncate(state['offset'])
+    output.seek(state['offset'])
+
+    messages = iter_messages(source, mailbox_format, start=state['processed'])
+
+    # Limita os lotes em andamento: a leitura acompanha a gravação e a memória fica constante
+    in_flight = threading.BoundedSemaphore(max(1, args.workers) * 2)
+
+    def chunks():
+        for chunk in batched(messages, args.batch_size):
+            in_flight.acquire()
+            yield chunk
+
+    log_level = logging.getLogger().level if args.workers == 0 else logging.WARNING
+    if args.workers > 0:
+        pool = multiprocessing.Pool(args.workers, initializer=init_worker,
+                                    initargs=(args.config, max_attachment_bytes, log_level))
+        results = pool.imap(classify_chunk, chunks())
+    else:
+        pool = None
+        init_worker(args.config, max_attachment_bytes, log_level)
+        results = map(classify_chunk, chunks())
+
+    started = time.perf_counter()
+    processed_now = chunks_done = 0
+    try:
+        for records in results:
+            output.write(b''.join(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n' for record in records))
+            output.flush()
+            os.fsync(output.fileno())
+            in_flight.release()
+
+            state['processed'] += len(records)
+            state['offset'] = output.tell()
+            save_checkpoint(checkpoint_path, state)
+
+            processed_now += len(records)
+            chunks_done += 1
+            if chunks_done % 10 == 0:
+                rate = processed_now / (time.perf_counter() - started)
+                logger.info(f"{state['processed']} mensagens classificadas ({rate:.1f}/s)")
+
+        state['completed'] = True
+        save_checkpoint(checkpoint_path, state)
+    finally:
+        output.close()
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Concluído: {state['processed']} mensagens em {args.output} "
+                f"({processed_now} nesta execução, {elapsed:.1f}s)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
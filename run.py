@@ -211,16 +211,20 @@ def setup_nltk_data():
         import nltk
         print("📥 Configurando dados NLTK...")
         
+        # Dados ficam em backend/nltk_data (NLTK_DATA_DIR): a aplicação não baixa nada no boot
+        nltk_data_dir = str(Path(__file__).parent / "backend" / "nltk_data")
+        nltk.data.path.insert(0, nltk_data_dir)
+        
         # Download silencioso dos dados necessários
         try:
             nltk.data.find('tokenizers/punkt')
         except LookupError:
-            nltk.download('punkt', quiet=True)
+            nltk.download('punkt', download_dir=nltk_data_dir, quiet=True)
             
         try:
             nltk.data.find('corpora/stopwords')
         except LookupError:
-            nltk.download('stopwords', quiet=True)
+            nltk.download('stopwords', download_dir=nltk_data_dir, quiet=True)
             
         print("✅ Dados NLTK configurados!")
         return True